@@ -0,0 +1,68 @@
+"""
+In( criteria ) lookups for growing criteria.
+
+Compares a plain list scan with the hashed index In builds for lists,
+SortedCriteria and MappedCriteria, per lookup ( half of the probes miss ),
+and the build time, memory and pickle size of a million criteria.
+
+    python benchmarks/criteria.py
+"""
+
+from kanone import *
+
+import os, pickle, random, tempfile, time, tracemalloc
+
+
+def perLookup( contains, probes ):
+    start = time.perf_counter()
+    for probe in probes:
+        contains( probe )
+    return ( time.perf_counter() - start ) / len( probes )
+
+
+def main():
+    rand = random.Random( 1 )
+    path = os.path.join( tempfile.mkdtemp(), 'criteria.txt' )
+
+    for size in ( 10, 1000, 100000, 1000000 ):
+        criteria = [ 'sku%07i' % pos for pos in range( size ) ]
+        probes = [ 'sku%07i' % rand.randrange( 2*size ) for pos in range( 2000 ) ]
+
+        line = [ '%8i' % size ]
+        if size <= 100000:
+            line.append( 'list %.2fus' % ( perLookup( criteria.__contains__, probes )*1e6 ) )
+        else:
+            line.append( 'list -' )
+
+        for ( name, validator ) in \
+            ( ( 'hashed', In( criteria ) )
+            , ( 'sorted', In( SortedCriteria( criteria ) ) )
+            , ( 'mapped', In( MappedCriteria.write( path, criteria ) ) )
+            ):
+            line.append( '%s %.2fus' % ( name, perLookup( validator._contains, probes )*1e6 ) )
+
+        print( ' '.join( line ) )
+
+    criteria = [ 'sku%07i' % pos for pos in range( 1000000 ) ]
+    for ( name, build ) in \
+        ( ( 'hashed', lambda: In( criteria ) )
+        , ( 'sorted', lambda: In( SortedCriteria( criteria ) ) )
+        , ( 'mapped', lambda: In( MappedCriteria( path ) ) )
+        ):
+        tracemalloc.start()
+        start = time.perf_counter()
+        validator = build()
+        took = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        print\
+            ( '%s: build %.2fs, extra memory %.1fMB, pickled %.1fMB'
+            % ( name, took, size/1e6, len( pickle.dumps( validator ) )/1e6 )
+            )
+
+    os.remove( path )
+
+
+if __name__ == '__main__':
+    main()
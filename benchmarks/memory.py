@@ -0,0 +1,60 @@
+"""
+Memory retained by validated contexts.
+
+Validates a ForEach over 50000 ints and 1000 contexts of a 50 field Schema,
+and reports the memory the contexts keep afterwards and the peak during
+validation, measured with tracemalloc. The input values are made before.
+
+    python benchmarks/memory.py
+"""
+
+from kanone import *
+
+import time, tracemalloc
+
+
+numbers = list( range( 50000 ) )
+
+fields = []
+for pos in range( 50 ):
+    fields += [ 'f%i' % pos, Integer() ]
+rows = [ dict( ( 'f%i' % pos, pos ) for pos in range( 50 ) ) for run in range( 1000 ) ]
+
+
+def forEach():
+    context = ForEach( Integer() ).context( numbers )
+    context.result
+    return context
+
+def schemas():
+    validator = Schema( *fields )
+
+    contexts = []
+    for row in rows:
+        context = validator.context( row )
+        context.result
+        contexts.append( context )
+    return contexts
+
+
+def main():
+    for ( name, build ) in \
+        ( ( 'ForEach( Integer() ) over 50000 ints', forEach )
+        , ( '50 field Schema, 1000 contexts', schemas )
+        ):
+        tracemalloc.start()
+        start = time.perf_counter()
+        kept = build()
+        took = time.perf_counter() - start
+        ( retained, peak ) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+
+        print\
+            ( '%s: retained %.1fMB, peak %.1fMB, %.2fs'
+            % ( name, retained/1e6, peak/1e6, took )
+            )
+
+
+if __name__ == '__main__':
+    main()
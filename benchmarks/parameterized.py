@@ -0,0 +1,45 @@
+"""
+Building and cloning validators.
+
+Times the import of kanone.validator.web ( in fresh interpreters ), clones
+of plain and composed validators and building the validator graphs of
+kanone.validator.web, best of several runs per call.
+
+    python benchmarks/parameterized.py
+"""
+
+import subprocess, sys, timeit
+
+
+def importTime( runs=9 ):
+    code = 'import time; start = time.perf_counter(); import kanone.validator.web; print( time.perf_counter() - start )'
+    times = sorted\
+        ( float( subprocess.check_output( [ sys.executable, '-c', code ] ) )
+            for run in range( runs )
+        )
+    return times[ runs // 2 ]
+
+
+def main():
+    print( 'import kanone.validator.web: %.1fms' % ( importTime()*1e3 ) )
+
+    from kanone import String, Len, Integer, Schema
+    from kanone.validator import web
+
+    email = web.Email()
+
+    for ( name, function ) in \
+        ( ( 'String()', String )
+        , ( 'Len( max=5 )', lambda: Len( max=5 ) )
+        , ( 'Integer()', Integer )
+        , ( 'Schema of 2 fields', lambda: Schema( 'a', String(), 'b', Integer() ) )
+        , ( 'email clone', email )
+        , ( 'email clone with a parameter', lambda: email( domainPart_restrictToTLD=[ 'com' ] ) )
+        , ( 'Email(), Domain(), DateField()', lambda: ( web.Email(), web.Domain(), web.DateField() ) )
+        ):
+        best = min( timeit.repeat( function, number=2000, repeat=10 ) ) / 2000
+        print( '%s: %.2fus' % ( name, best*1e6 ) )
+
+
+if __name__ == '__main__':
+    main()
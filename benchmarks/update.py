@@ -0,0 +1,64 @@
+"""
+Single-field updates against full validation.
+
+A form of 300 ( and 1000 ) integer fields, where some fields read the first
+one by Field. The first field is set and the result read again, which
+validates only that field, its ancestors and the fields reading it. The time
+of an update should grow with the number of dependents, not with the form.
+
+    python benchmarks/update.py
+"""
+
+from kanone import *
+
+import time
+
+
+def form( size, dependents ):
+    fields = []
+    for pos in range( size ):
+        fields += [ 'f%i' % pos, Integer.convert() & Min(0) & Max(10**6) ]
+
+    for pos in range( 1, dependents+1 ):
+        fields[ 2*pos+1 ] = fields[ 2*pos+1 ] & Field( '.f0', Integer(), useResult=True )
+
+    return Schema( *fields )
+
+def data( size ):
+    return dict( ( 'f%i' % pos, str( pos ) ) for pos in range( size ) )
+
+def best( function, number=200, repeat=5 ):
+    times = []
+    for run in range( repeat ):
+        start = time.perf_counter()
+        for pos in range( number ):
+            function( pos )
+        times.append( ( time.perf_counter() - start ) / number )
+    return min( times )
+
+
+def main():
+    for ( size, dependents ) in \
+        ( ( 300, ( 0, 10, 50, 150 ) )
+        , ( 1000, ( 0, 10, 100 ) )
+        ):
+        for count in dependents:
+            validator = form( size, count )
+            context = validator.context( data( size ) )
+            context.result
+
+            def update( pos ):
+                context( 'f0' ).value = str( pos )
+                context.result
+
+            def full( pos ):
+                validator.context( data( size ) ).result
+
+            print\
+                ( 'fields %4i dependents %3i: update %.2fms full %.2fms'
+                % ( size, count, best( update )*1e3, best( full )*1e3 )
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Wide schemas and inputs with many extra keys.
+
+Validates Schemas of 500 and 5000 fields, with and without context children,
+once with exactly their fields and once with 50000 extra keys after ( and
+before ) the fields. Finding the extra fields should take one pass over the
+input keys.
+
+    python benchmarks/wide_schema.py
+"""
+
+from kanone import *
+
+import time
+
+
+def perRun( validator, value, runs ):
+    start = time.perf_counter()
+    for run in range( runs ):
+        validator.context( dict( value ) ).check()
+    return ( time.perf_counter() - start ) / runs
+
+
+def main():
+    for size in ( 500, 5000 ):
+        fields = []
+        for pos in range( size ):
+            fields += [ 'f%i' % pos, Pass() ]
+        value = dict( ( 'f%i' % pos, pos ) for pos in range( size ) )
+
+        extraAfter = dict( value )
+        extraAfter.update( ( 'x%i' % pos, pos ) for pos in range( 50000 ) )
+        extraBefore = dict( ( 'x%i' % pos, pos ) for pos in range( 50000 ) )
+        extraBefore.update( value )
+
+        for createContextChildren in ( True, False ):
+            validator = Schema( *fields, createContextChildren=createContextChildren )
+            print\
+                ( 'fields %4i children %-5s: %.4fs, 50000 extra keys after %.4fs, before %.4fs'
+                % ( size
+                  , createContextChildren
+                  , perRun( validator, value, 3 )
+                  , perRun( validator, extraAfter, 1 )
+                  , perRun( validator, extraBefore, 1 )
+                  )
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,7 @@ setup\
     , packages = find_packages('src')
     , package_dir = {'':'src'}
     , install_requires = [ ]
+    , extras_require = { 'vectorize': [ 'numpy' ] }
     , namespace_packages = [ ]
     , include_package_data = True
     )
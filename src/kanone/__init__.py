@@ -1,6 +1,17 @@
 from .validator import *
 from .lib import MISSING, Context
 
-import pkg_resources as __pkg_resources__
-__pkg_resources__.declare_namespace(__name__)
-__version__ = __pkg_resources__.require("kanone")[0].version
+import sys as _sys
+
+__path__ = __import__('pkgutil').extend_path(__path__, __name__)
+
+if _sys.version_info >= (3, 8):
+    # looked up when read, importlib.metadata takes long to import
+    def __getattr__(name):
+        if name == '__version__':
+            from importlib.metadata import version
+            return version("kanone")
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+else:
+    import pkg_resources as __pkg_resources__
+    __version__ = __pkg_resources__.require("kanone")[0].version
@@ -0,0 +1,736 @@
+"""
+Validation with native coroutines.
+
+Validators with asynchronous hooks ( on_value, on_blank, on_missing, check
+or validate defined with async def ), Call with a coroutine function and
+MXLookup are awaited, everything else runs on the compiled synchronous path.
+Schema and ForEach children are validated concurrently.
+
+    >>> from kanone.adapter import asyncio as kasyncio
+    >>> result = await kasyncio.check( validator.context( value ) )
+
+Validators are not modified, so kanone.adapter.tx and the synchronous API
+keep working next to this module.
+"""
+
+from __future__ import absolute_import
+
+from ..lib import PASS, MISSING
+from ..error import Invalid
+from ..validator.core import Tag, Compose, Tmp, Item, If, Not, And, Or, Call, _tagError, _composeError
+from ..validator.check import Match
+from ..validator.schema import Schema, ForEach, Field
+from ..validator.web import MXLookup, PrefetchMX
+from .native import argumentMapping
+
+from functools import wraps
+from inspect import isawaitable, iscoroutinefunction
+from contextvars import ContextVar
+import asyncio
+import weakref
+
+import logging
+log = logging.getLogger(__name__)
+
+# futures of the contexts being validated, by id( context )
+_pending = ContextVar( 'kanone_pending', default=None )
+
+class _Plans( list ):
+    """ the plans of a validator, ( tags, ( check, isAsync ) ) pairs.
+
+    Kept on the validator, so they go with it - the plans refer to their
+    validator, a module level mapping would keep it alive. Copies of the
+    validator do not use them, pickles are empty.
+    """
+
+    def __init__( self, validator ):
+        self.owner = weakref.ref( validator )
+
+    def __reduce__( self ):
+        return _unpickledPlans, ()
+
+def _unpickledPlans():
+    plans = _Plans.__new__( _Plans )
+    plans.owner = lambda: None
+    return plans
+
+_hooks = ( 'check', 'validate', 'on_value', 'on_blank', 'on_missing' )
+
+
+async def check( context ):
+    """ like context.check(), but awaits asynchronous validators """
+    token = None
+    if _pending.get() is None:
+        token = _pending.set( {} )
+
+    try:
+        return await _checkContext( context, context.root.taggedValidators )
+    finally:
+        if token is not None:
+            _pending.reset( token )
+
+async def result( context ):
+    """ like context.result, raises Invalid """
+    result = await check( context )
+    if isinstance( result, Invalid ):
+        raise result
+    return result
+
+
+async def _checkContext( context, tags ):
+    if context.isValidated:
+        if context.__error__ is not MISSING:
+            return context.__error__
+        return context.__result__
+
+    pending = _pending.get()
+    if pending is None:
+        pending = {}
+        _pending.set( pending )
+
+    # validated concurrently, e.g. by a Field of a sibling
+    future = pending.get( id( context ) )
+    if future is not None:
+        await future
+        return await _checkContext( context, tags )
+
+    context.isValidating = True
+    future = None
+
+    try:
+        parent = context.parent
+        if parent is not None:
+            if not parent.isValidated and not parent.isValidating:
+                result = await _checkContext( parent, tags )
+                if isinstance( result, Invalid ):
+                    return result
+
+                # the parent validated this context already
+                if context.isValidated:
+                    if context.__error__ is not MISSING:
+                        return context.__error__
+                    return context.__result__
+
+        if context.__validator__ is None:
+            raise AttributeError("No validator set for context '%s'" % context.path )
+
+        future = pending[ id( context ) ] = asyncio.get_running_loop().create_future()
+
+        ( check, isAsync ) = _plan( context.__validator__, tags )
+        result = check( context, context.__value__ )
+        if isAsync:
+            result = await result
+
+        if isinstance( result, Invalid ):
+            context.error = result
+            return result
+
+        if result is not PASS:
+            context.__result__ = result
+        else:
+            context.__result__ = context.__value__
+
+        return context.__result__
+    finally:
+        context.isValidated = True
+        context.isValidating = False
+
+        if future is not None:
+            del pending[ id( context ) ]
+            future.set_result( None )
+
+
+# returns ( check, isAsync ) for validator, check( context, value ) returns
+# an awaitable if isAsync is True
+def _plan( validator, tags ):
+    if not tags:
+        tags = None
+
+    try:
+        entries = validator.__dict__.get( '_asyncPlans' )
+        if entries is None or entries.owner() is not validator:
+            entries = validator.__dict__[ '_asyncPlans' ] = _Plans( validator )
+    except ( AttributeError, TypeError ):
+        # no attributes or not weakly referencable
+        entries = []
+
+    for ( entryTags, plan ) in entries:
+        if entryTags is tags:
+            return plan
+
+    plan = _build( validator, tags )
+    entries.append( ( tags, plan ) )
+    return plan
+
+def _build( validator, tags ):
+    if _isAsync( validator ):
+        return _asyncValidator( validator ), True
+
+    for klass in validator.__class__.__mro__:
+        builder = _builders.get( klass )
+        if builder is not None:
+            check = builder( validator, tags )
+            if check is not None:
+                return check, True
+            break
+
+    return _syncCheck( validator, tags ), False
+
+def _isAsync( validator ):
+    for name in _hooks:
+        if iscoroutinefunction( getattr( validator, name, None ) ):
+            return True
+    return False
+
+# the compiled plan, with the tags of the enclosing Compose for the
+# validators which read them from the context
+def _syncCheck( validator, tags ):
+    opaque = []
+    check = validator._compile( tags or {}, opaque )
+    if not opaque or tags is None:
+        return check
+
+    def syncCheck( context, value ):
+        root = context.root
+        tmpTags = root.taggedValidators
+        root.taggedValidators = tags
+        try:
+            return check( context, value )
+        finally:
+            root.taggedValidators = tmpTags
+
+    return syncCheck
+
+# returns an async function for a plan
+def _asAsync( plan ):
+    ( check, isAsync ) = plan
+    if isAsync:
+        return check
+
+    async def asyncCheck( context, value ):
+        return check( context, value )
+
+    return asyncCheck
+
+def _anyAsync( plans ):
+    for ( check, isAsync ) in plans:
+        if isAsync:
+            return True
+    return False
+
+# validators with asynchronous hooks, the validator's own check does the
+# dispatching and might return a coroutine or raise from it
+def _asyncValidator( validator ):
+    async def asyncCheck( context, value ):
+        try:
+            result = validator.check( context, value )
+            if isawaitable( result ):
+                result = await result
+        except Invalid as e:
+            return e
+        return result
+
+    return asyncCheck
+
+# like Validator._dispatch, with an async on_value
+def _dispatch( validator, on_value ):
+    on_missing = validator.on_missing
+    on_blank = validator.on_blank
+    paramWrapper = validator.__paramWrapper__
+
+    async def dispatchCheck( context, value ):
+        if paramWrapper is not None:
+            context.params = paramWrapper( context, value )
+
+        try:
+            if value is MISSING:
+                return on_missing( context )
+            elif value is None or (value == ''):
+                return on_blank( context, value )
+
+            return await on_value( context, value )
+        except Invalid as e:
+            return e
+
+    return dispatchCheck
+
+
+def _buildTag( validator, tags ):
+    tagged = None
+    if tags is not None:
+        tagged = tags.get( validator.tagID, None )
+    if tagged is None:
+        tagged = validator.enabled and validator.validator
+
+    if not tagged:
+        return None
+
+    plan = _plan( tagged, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+    tagName = validator.tagName
+
+    async def tagCheck( context, value ):
+        result = await check( context, value )
+        if isinstance( result, Invalid ):
+            _tagError( result, tagged, tagName )
+        return result
+
+    return tagCheck
+
+def _buildCompose( composer, tags ):
+    plan = _plan( composer.validator, composer.currentTaggedValidators )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+
+    async def composeCheck( context, value ):
+        result = await check( context, value )
+        if isinstance( result, Invalid ):
+            _composeError( result, composer )
+        return result
+
+    return composeCheck
+
+def _buildTmp( validator, tags ):
+    plan = _plan( validator.validator, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+    raiseError = validator.raiseError
+
+    async def tmpCheck( context, value ):
+        result = await check( context, value )
+        if raiseError and isinstance( result, Invalid ):
+            return result
+        return value
+
+    return tmpCheck
+
+def _buildItem( validator, tags ):
+    if validator.validator is None:
+        return None
+
+    plan = _plan( validator.validator, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+
+    async def itemCheck( context, value ):
+        key = validator.key
+        try:
+            val = value[ key ]
+        except TypeError:
+            return Invalid( value, validator, 'type' )
+        except (KeyError, IndexError):
+            return Invalid( value, validator, 'notFound', key=key )
+
+        val = await check( context, val )
+        if isinstance( val, Invalid ):
+            return val
+
+        if validator.alter:
+            value[ key ] = val
+        return value
+
+    return itemCheck
+
+def _buildIf( validator, tags ):
+    plans = [ _plan( validator.criterion, tags ), _plan( validator._then, tags ) ]
+    if validator._else:
+        plans.append( _plan( validator._else, tags ) )
+
+    if not _anyAsync( plans ):
+        return None
+
+    checks = [ _asAsync( plan ) for plan in plans ]
+    criterion = checks[0]
+    _then = checks[1]
+    _else = len( checks ) > 2 and checks[2] or None
+
+    async def ifCheck( context, value ):
+        result = await criterion( context, value )
+        if isinstance( result, Invalid ):
+            if not _else:
+                return result
+            return await _else( context, value )
+
+        return await _then( context, result )
+
+    return ifCheck
+
+def _buildNot( validator, tags ):
+    plan = _plan( validator.validator, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+
+    async def notCheck( context, value ):
+        if isinstance( await check( context, value ), Invalid ):
+            return value
+
+        return Invalid( value, validator )
+
+    return notCheck
+
+def _buildAnd( validator, tags ):
+    plans = [ _plan( sub, tags ) for sub in validator.validators ]
+    if not _anyAsync( plans ):
+        return None
+
+    async def andCheck( context, value ):
+        for ( check, isAsync ) in plans:
+            value = check( context, value )
+            if isAsync:
+                value = await value
+            if isinstance( value, Invalid ):
+                break
+
+        return value
+
+    return andCheck
+
+def _buildOr( validator, tags ):
+    plans = [ _plan( sub, tags ) for sub in validator.validators ]
+    if not _anyAsync( plans ):
+        return None
+
+    async def orCheck( context, value ):
+        for ( check, isAsync ) in plans:
+            result = check( context, value )
+            if isAsync:
+                result = await result
+            if not isinstance( result, Invalid ):
+                break
+
+        return result
+
+    return orCheck
+
+def _buildCall( validator, tags ):
+    func = validator.__func__
+    if not iscoroutinefunction( func ):
+        return None
+
+    async def callCheck( context, value ):
+        try:
+            result = await func( context, value )
+        except Invalid as e:
+            result = e
+
+        if isinstance( result, Invalid ):
+            result.validator = validator
+        return result
+
+    return callCheck
+
+def _buildMatch( validator, tags ):
+    if validator.type is not Match.VALIDATOR:
+        return None
+
+    plan = _plan( validator.criterion, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+
+    # missing and blank values are compared as well
+    async def matchCheck( context, value ):
+        compare = await check( context, value )
+        if isinstance( compare, Invalid ):
+            return Invalid( value, validator, matchType=validator.type, criterion=compare )
+
+        val = value
+        if validator.ignoreCase:
+            compare = str(compare).lower()
+            val = str(value).lower()
+
+        if val != compare:
+            return Invalid( value, validator, matchType=validator.type, criterion=compare )
+
+        return value
+
+    return matchCheck
+
+# validates the children concurrently. They add to errorlist and updates as
+# they finish, so the entries are put back in the order of the children,
+# like a synchronous run has them
+async def _gatherChildren( context, children, tags ):
+    marks = context._entryMarks()
+    results = await asyncio.gather\
+        ( *[ _checkContext( childContext, tags ) for childContext in children ]
+        )
+    context._regroup( marks, children )
+    return results
+
+def _buildSchema( schema, tags ):
+    plans = dict\
+        ( ( key, _plan( validator, tags ) )
+            for ( key, validator ) in schema.validators.items()
+        )
+    if not _anyAsync( plans.values() ):
+        return None
+
+    if schema.createContextChildren:
+        async def on_value( context, value ):
+            invalid = schema._populate( context, value )
+            if invalid is not None:
+                return invalid
+
+            children = [ context( key ) for key in schema.index ]
+            results = await _gatherChildren( context, children, tags )
+            return schema._collect( value, children, results )
+
+        return _dispatch( schema, on_value )
+
+    checks = dict( ( key, _asAsync( plan ) ) for ( key, plan ) in plans.items() )
+
+    # the fields share the context, so one after another
+    async def on_value( context, value ):
+        isList = isinstance(value, list) or isinstance(value,tuple) or isinstance(value,set)
+        if not isList and not isinstance( value, dict ):
+            return Invalid( value, schema, 'type')
+
+        extraFields = None
+        if not schema.allowExtraFields:
+            if isList:
+                extraFields = max( len(value), len(schema.index) )
+            else:
+                extraFields = schema._extraKeys( value )
+
+        if schema.returnList:
+            result = []
+        else:
+            result = {}
+
+        numValues = len(value)
+
+        for pos in range(len(schema.index)):
+            key = schema.index[pos]
+            if isList:
+                if numValues>pos:
+                    val = value[ pos ]
+                    if not schema.allowExtraFields:
+                        extraFields-=1
+                else:
+                    val = MISSING
+            else:
+                val = value.get( key, MISSING)
+
+            res = await checks[ key ]( context, val )
+            if isinstance( res, Invalid ):
+                return res
+
+            if schema.returnList:
+                result.append( res )
+            else:
+                result[ key ] = res
+
+        if extraFields:
+            return Invalid( value, schema, 'extraFields',extraFields=extraFields)
+
+        return result
+
+    return _dispatch( schema, on_value )
+
+def _buildForEach( validator, tags ):
+    plan = _plan( validator.validator, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    if validator.createContextChildren:
+        async def on_value( context, value ):
+            children = validator._populate( context, value )
+            if isinstance( children, Invalid ):
+                return children
+
+            results = await _gatherChildren( context, children, tags )
+            return validator._collect( value, children, results )
+
+        return _dispatch( validator, on_value )
+
+    check = plan[0]
+
+    # the items share the context, so one after another
+    async def on_value( context, value ):
+        if validator.returnList:
+            result = []
+        else:
+            result = {}
+
+        isList = isinstance( value, list) or isinstance(value, tuple) or isinstance(value, set)
+        if not isList:
+            if not isinstance(value, dict ):
+                return Invalid( value, validator,'type' )
+
+        if isList or validator.numericKeys:
+            for pos in range( len( value ) ):
+                if not isList:
+                    val = value.get(str(pos),MISSING)
+                    if val is MISSING:
+                        return Invalid( value, validator, 'numericKeys', keys=list(value.keys()) )
+                else:
+                    val = value[pos]
+
+                res = await check( context, val )
+                if isinstance( res, Invalid ):
+                    return res
+
+                if validator.returnList:
+                    result.append( res )
+                else:
+                    result[pos] = res
+        else:
+            for (key, val) in value.items():
+
+                res = await check( context, val )
+                if isinstance( res, Invalid ):
+                    return res
+
+                if validator.returnList:
+                    result.append( res )
+                else:
+                    result[key] = res
+
+        return result
+
+    return _dispatch( validator, on_value )
+
+def _buildField( field, tags ):
+    criterion = None
+    isAsync = field.useResult
+    if field.validator is not None:
+        plan = _plan( field.validator, tags )
+        isAsync = isAsync or plan[1]
+        criterion = _asAsync( plan )
+
+    # without useResult, the field is just read
+    if not isAsync:
+        return None
+
+    async def fieldCheck( context, value ):
+        fieldcontext = field.getField( context, field.path )
+
+        if not field.useResult:
+            result = fieldcontext.value
+
+        else:
+            result = await _checkContext( fieldcontext, tags )
+            if isinstance( result, Invalid ):
+                result = PASS
+
+        if criterion is not None:
+            if result is not PASS:
+                result = await criterion( fieldcontext, result )
+                if isinstance( result, Invalid ):
+                    return result
+
+        if field.writeToContext:
+            fieldcontext.__result__ = result
+
+        if field.copy:
+            if result is PASS:
+                return value
+
+            return result
+
+        return value
+
+    return fieldCheck
+
+def _buildMXLookup( validator, tags ):
+    # dns lookups are disabled
+    if 'on_value' in validator.__dict__:
+        return None
+
+    # the resolver blocks, so it runs in the default executor
+    async def on_value( context, value ):
+        cache = validator.cache
+        if cache is not None and cache.get( value ) is not None:
+            return validator.on_value( context, value )
+
+        return await asyncio.get_running_loop().run_in_executor\
+            ( None, validator.on_value, context, value )
+
+    return _dispatch( validator, on_value )
+
+def _buildPrefetchMX( validator, tags ):
+    plan = _plan( validator.validator, tags )
+    if not _anyAsync( [ plan ] ):
+        return None
+
+    check = plan[0]
+
+    async def prefetchCheck( context, value ):
+        await asyncio.get_running_loop().run_in_executor\
+            ( None, validator.prefetch, value )
+        return await check( context, value )
+
+    return prefetchCheck
+
+_builders =\
+    { Tag: _buildTag
+    , Compose: _buildCompose
+    , Tmp: _buildTmp
+    , Item: _buildItem
+    , If: _buildIf
+    , Not: _buildNot
+    , And: _buildAnd
+    , Or: _buildOr
+    , Call: _buildCall
+    , Match: _buildMatch
+    , Schema: _buildSchema
+    , ForEach: _buildForEach
+    , Field: _buildField
+    , MXLookup: _buildMXLookup
+    , PrefetchMX: _buildPrefetchMX
+    }
+
+
+def validateDecorator( validator, method, include, exclude, onInvalid, createContext ):
+
+    ( toKwargs, fromKwargs ) = argumentMapping( method, include, exclude )
+    createContext = createContext or (lambda _validator, _data, **kwargs: _validator.context(_data))
+
+    @wraps(method)
+    async def __wrap( *fargs, **fkwargs):
+
+        ( data, fkwargs, state ) = toKwargs( fargs, fkwargs )
+
+        try:
+            resultKwargs = await result\
+                ( createContext
+                    ( validator
+                    , data
+                    , **fkwargs )
+                )
+
+        except Invalid as e:
+            if onInvalid is not None:
+                invalidResult = onInvalid( e )
+                if isawaitable( invalidResult ):
+                    invalidResult = await invalidResult
+                return invalidResult
+            else:
+                raise
+
+        ( resultArgs, resultKwargs ) = fromKwargs( state, resultKwargs )
+
+        methodResult = method( *resultArgs, **resultKwargs )
+        if isawaitable( methodResult ):
+            methodResult = await methodResult
+        return methodResult
+
+    return __wrap
+
+def validate( validator, include=None, exclude=None, onInvalid=None, createContext=None ):
+    """ like kanone.adapter.native.validate, the decorated method returns a coroutine """
+    def __createDecorator( method ):
+        return validateDecorator( validator, method, include, exclude, onInvalid, createContext)
+    return __createDecorator
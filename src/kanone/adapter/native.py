@@ -7,8 +7,13 @@ import logging
 
 log = logging.getLogger(__name__)
 
-def validateDecorator( validator, method, include, exclude, onInvalid, createContext ):
+def argumentMapping( method, include, exclude ):
+    """ returns ( toKwargs, fromKwargs ) for validating the arguments of method
 
+    toKwargs( fargs, fkwargs ) returns ( data, fkwargs, state ), data is the
+    dict to validate. fromKwargs( state, resultKwargs ) returns the
+    ( args, kwargs ) to call method with.
+    """
     if include and exclude:
         raise SyntaxError("'include' and 'exclude' cannot be used at the same time")
 
@@ -16,7 +21,6 @@ def validateDecorator( validator, method, include, exclude, onInvalid, createCon
     hasVarargs = spec.varargs is not None
     varargs =  spec.varargs or '*varargs'
     keywords = spec.keywords or False
-    createContext = createContext or (lambda _validator, _data, **kwargs: _validator.context(_data))
 
     methodParameterNames = getParameterNames( method, skipSelf=False )
 
@@ -32,9 +36,7 @@ def validateDecorator( validator, method, include, exclude, onInvalid, createCon
 
     keywords   = keywords not in skip and keywords
 
-    @wraps(method)
-    def __wrap( *fargs, **fkwargs):
-
+    def toKwargs( fargs, fkwargs ):
         (fargs, fkwargs, shifted ) = varargs2kwargs( method, fargs, fkwargs, skipSelf=False )
         origKwargs = dict(fkwargs)
 
@@ -48,10 +50,38 @@ def validateDecorator( validator, method, include, exclude, onInvalid, createCon
         if fargs or hasVarargs:
             fkwargs[ varargs ] = list(fargs)
 
+        data = dict( ( key, fkwargs[ key] ) for key in fkwargs if key not in skip )
+        return data, fkwargs, ( fargs, origKwargs, shifted )
+
+    def fromKwargs( state, resultKwargs ):
+        ( fargs, origKwargs, shifted ) = state
+
+        origKwargs.update( resultKwargs )
+
+        resultArgs = origKwargs.pop( varargs, fargs )
+        resultArgs = [ origKwargs.pop(key) for key in shifted  ] + resultArgs
+
+        if keywords is not False:
+            origKwargs.update( origKwargs.pop( keywords ) )
+
+        return resultArgs, origKwargs
+
+    return toKwargs, fromKwargs
+
+def validateDecorator( validator, method, include, exclude, onInvalid, createContext ):
+
+    ( toKwargs, fromKwargs ) = argumentMapping( method, include, exclude )
+    createContext = createContext or (lambda _validator, _data, **kwargs: _validator.context(_data))
+
+    @wraps(method)
+    def __wrap( *fargs, **fkwargs):
+
+        ( data, fkwargs, state ) = toKwargs( fargs, fkwargs )
+
         try:
             resultKwargs = createContext\
                 ( validator
-                , dict( ( key, fkwargs[ key] ) for key in fkwargs if key not in skip )
+                , data
                 , **fkwargs ).result
 
         except Invalid as e:
@@ -60,15 +90,9 @@ def validateDecorator( validator, method, include, exclude, onInvalid, createCon
             else:
                 raise
 
-        origKwargs.update( resultKwargs )
-
-        resultArgs = origKwargs.pop( varargs, fargs )
-        resultArgs = [ origKwargs.pop(key) for key in shifted  ] + resultArgs
+        ( resultArgs, resultKwargs ) = fromKwargs( state, resultKwargs )
 
-        if keywords is not False:
-            origKwargs.update( origKwargs.pop( keywords ) )
-
-        return method( *resultArgs, **origKwargs )
+        return method( *resultArgs, **resultKwargs )
 
     return __wrap
 
@@ -76,4 +100,3 @@ def validate( validator, include=None, exclude=None, onInvalid=None, createConte
     def __createDecorator( method ):
         return validateDecorator( validator, method, include, exclude, onInvalid, createContext)
     return __createDecorator
-
@@ -1,11 +1,11 @@
 """ Twisted adapter for Kanone """
 
 from twisted.python.failure import Failure
-from twisted.internet import defer
+from twisted.internet import defer, task
 from ..lib import Invalid
 from ..util import varargs2kwargs
 
-import logging, sys
+import logging, sys, weakref
 log = logging.getLogger( __name__ )
 
 # hacky and redundant, but it'll do for now ..
@@ -14,12 +14,173 @@ log = logging.getLogger( __name__ )
 
 _python3 = sys.version_info[0]>=3
 
-def monkeyPatch():
+_package = __name__.split('.')[0] + '.'
+
+# ( window, chunkSize ) if large collections are validated cooperatively
+_cooperation = None
+
+# results of isSync by validator, a list of ( tags, sync )
+_syncValidators = weakref.WeakKeyDictionary()
+
+def isAsync( validator ):
+    """
+    Whether validator itself might return a Deferred.
+    Set __async__ on a validator or its class to say so, otherwise MXLookup,
+    Field using results and validators or Call functions not defined by
+    Kanone are expected to.
+    """
+    flag = getattr( validator, '__async__', None )
+    if flag is not None:
+        return flag
+
+    from ..validator.core import Call
+    from ..validator.schema import Field
+    from ..validator.web import MXLookup
+
+    if isinstance( validator, MXLookup ):
+        return True
+    if isinstance( validator, Field ):
+        return validator.useResult
+
+    module = validator.__class__.__module__
+    if isinstance( validator, Call ):
+        module = getattr( validator.__func__, '__module__', None ) or ''
+
+    return not module.startswith( _package )
+
+def isSync( validator, tags=None ):
+    """
+    Whether validator and the validators it uses never return a Deferred,
+    tags are the tagged validators of the enclosing Compose.
+    Those are validated without Deferreds by the patched validators.
+    """
+    if not tags:
+        tags = None
+
+    try:
+        entries = _syncValidators.setdefault( validator, [] )
+    except TypeError:
+        # not weakly referencable
+        entries = []
+
+    for ( entryTags, sync ) in entries:
+        if entryTags is tags:
+            return sync
+
+    sync = _isSync( validator, tags )
+    entries.append( ( tags, sync ) )
+    return sync
+
+def _isSync( validator, tags ):
+    from ..validator.core import Tag, Compose
+
+    subValidators = [ validator ]
+    validator.appendSubValidators( subValidators )
+
+    for subValidator in subValidators:
+        if isAsync( subValidator ):
+            return False
+
+        # Compose does not list its validators
+        if isinstance( subValidator, Compose ):
+            if not isSync( subValidator.validator, subValidator.currentTaggedValidators ):
+                return False
+
+        elif isinstance( subValidator, Tag ) and tags is not None:
+            tagged = tags.get( subValidator.tagID, None )
+            if tagged and tagged is not subValidator.validator\
+            and not isSync( tagged, tags ):
+                return False
+
+    return True
+
+def _syncValidate( validate ):
+    # validators which are sync for the current tags run unpatched
+    def syncValidate( self, context, value ):
+        if not isSync( self, context.root.taggedValidators ):
+            return validate( self, context, value )
+
+        result = self.check( context, value )
+        if isinstance( result, Invalid ):
+            raise result
+        return result
+
+    return syncValidate
+
+def _syncOnValue( on_value, original ):
+    def syncOnValue( self, context, value ):
+        if not isSync( self, context.root.taggedValidators ):
+            return on_value( self, context, value )
+        return original( self, context, value )
+
+    return syncOnValue
+
+class TwistedResolver( object ):
+    """
+    Looks up MX records with twisted.names, the resolver MXLookup uses
+    under Twisted if it has none of its own.
+
+    lookup( domain ) returns a Deferred firing like the lookup of
+    kanone.validator.web.DNSResolver: ( found, ttl ), or None if the domain
+    could not be looked up for now. The resolvers of MXLookup may also
+    return their answer right away.
+    """
+
+    def __init__( self, resolv='/etc/resolv.conf', servers=None, timeout=( 2, 4, 6, 8, 10 ) ):
+        from twisted.names import client
+
+        self._resolver = client.Resolver( resolv, servers=servers )
+        self.timeout = timeout
+
+    def lookup( self, domain ):
+        return self._resolver.lookupMailExchange( domain, self.timeout )\
+            .addCallbacks( self._gotAnswer, self._failed )
+
+    def _gotAnswer( self, result ):
+        from twisted.names.dns import Record_MX
+
+        ( answers, auth, add ) = result
+        records = [ record for record in answers if isinstance( record.payload, Record_MX ) ]
+        if not records:
+            return False, None
+        return True, min( record.ttl for record in records )
+
+    def _failed( self, failure ):
+        from twisted.names import error
+
+        if failure.check( error.DNSNameError ):
+            return False, None
+        if failure.check( defer.TimeoutError, error.DNSServerError, error.DNSQueryRefusedError ):
+            return None
+        return failure
+
+_defaultResolver = None
+
+# the shared TwistedResolver
+def defaultResolver():
+    global _defaultResolver
+    if _defaultResolver is None:
+        _defaultResolver = TwistedResolver()
+    return _defaultResolver
+
+
+def monkeyPatch( cooperate=False, window=100, chunkSize=1000 ):
     """
     Patches Kanone so that any validation returns a Deferred, thus
     one can write asynchronous validators using Twisted's non-blocking API.
-    Schema and ForEach fields are validated concurrently.
+    Schema and ForEach fields are validated concurrently, one after another
+    if they share the context ( createContextChildren=False ).
+
+    With cooperate=True, Schema and ForEach with more than chunkSize fields
+    are validated by twisted's cooperator: up to window asynchronous fields
+    at a time ( one if they share the context ) and synchronous ones in
+    chunks of chunkSize, so the reactor keeps running in between. Results,
+    errorlist and updates keep the order of the input. Collections inside a
+    Compose are not split up.
     """
+    global _cooperation
+    _cooperation = cooperate and ( window, chunkSize ) or None
+
     if getattr( monkeyPatch,'_isMonkeyPatched',False):
         return
 
@@ -28,7 +189,7 @@ def monkeyPatch():
     from ..validator.core import Tag, Compose, Tmp, Item, Not, And, Or, Call, If
     from ..validator.check import Match
     from ..validator.schema import Schema, ForEach, Field
-    from ..validator.web import MXLookup
+    from ..validator.web import MXLookup, PrefetchMX
 
     @defer.inlineCallbacks
     def context_validate( self ):
@@ -75,6 +236,21 @@ def monkeyPatch():
         defer.returnValue( result )
 
 
+    def context_syncValidate( validate, original ):
+        def syncValidate( self ):
+            if self.isValidated or self.__validator__ is None\
+            or not isSync( self.__validator__, self.root.taggedValidators ):
+                return validate( self )
+
+            parent = self.parent
+            if parent is not None\
+            and not parent.isValidated and not parent.isValidating:
+                return validate( self )
+
+            return defer.maybeDeferred( original, self )
+
+        return syncValidate
+
     def context_gotError( error, self ):
 
         e = error.value 
@@ -83,34 +259,7 @@ def monkeyPatch():
             self.__error__ = error
             return
 
-        self.__error__ = e
-        e.context = self
-        message = e.validator.__messages__[e.key]
-
-        if message is not None:
-            extra = e.data['extra']
-            value = e.value
-            data = e.data
-
-            data['message'] = message
-            if hasattr(e,'realkey'):
-                data['key'] = e.realkey
-
-            extra['value.type'] = getattr(value, '__class__', None) is not None \
-                and getattr(value.__class__,'__name__', False) or 'unknown'
-
-            if isinstance(value,str) or not _python3 and isinstance(value,basestring):
-                extra['value'] = value
-            else:
-                extra['value'] = str(value)
-
-            cache = getattr( self, 'cache', None)
-            if cache is not None:
-                extra.update( cache )
-
-            self['error'] = self.__error__.data
-
-            self.root.errorlist.append( self.__error__.context.path )
+        self.error = e
 
 
     def tag_gotResult( result, d, validator, tagName ):
@@ -420,13 +569,124 @@ def monkeyPatch():
 
         errorset.append( error )
 
-    def schema__on_value_done( waste, d, schema, value, result, errors ):
-        if not errors:
-            d.callback( result )
-        else:
-            d.errback( errors.pop(0) )
+    def cooperate_gotError( failure, results, pos ):
+        failure.trap( Invalid )
+        results[ pos ] = failure.value
+
+    def cooperate_gotResult( result, results, pos ):
+        results[ pos ] = result
+
+    def cooperate_work( count, validateItem, results, chunkSize, shared ):
+        steps = 0
+        for pos in range( count ):
+            result = validateItem( pos )
+            if isinstance( result, defer.Deferred ):
+                steps = 0
+                yield result.addCallbacks\
+                    ( cooperate_gotResult
+                    , cooperate_gotError
+                    , callbackArgs=( results, pos )
+                    , errbackArgs=( results, pos )
+                    )
+            else:
+                results[ pos ] = result
+                steps += 1
+                if steps >= chunkSize:
+                    steps = 0
+                    yield None
+
+            # a shared context keeps the state of the first error
+            if shared and isinstance( results[ pos ], Invalid ):
+                del results[ pos+1: ]
+                return
+
+    def cooperate( count, validateItem, shared=False ):
+        """
+        calls validateItem( pos ) for pos in range( count ) in the
+        cooperator, it returns a result, Invalid or a Deferred.
+        Returns a Deferred firing with the list of results.
+
+        With shared the items are validated one after another up to the
+        first Invalid.
+        """
+        ( window, chunkSize ) = _cooperation
+        if shared:
+            window = 1
+        results = [ None ] * count
+        work = cooperate_work( count, validateItem, results, chunkSize, shared )
+
+        # the tasks share the iterator, each waits for its own Deferred
+        jobs = [ task.cooperate( work ).whenDone()\
+            for i in range( max( 1, min( window, count ) ) ) ]
+
+        return defer.gatherResults( jobs, consumeErrors=True )\
+            .addCallback( lambda waste: results )\
+            .addErrback( lambda failure: failure.value.subFailure )
+
+    def cooperate_validate( validator, context, value ):
+        try:
+            return validator.validate( context, value )
+        except Invalid as e:
+            return e
+
+    # not below a Compose, its tags are set on the root until it is done and
+    # would reach the items of others validated meanwhile
+    def isCooperative( count, context ):
+        return _cooperation is not None and count > _cooperation[1]\
+            and not context.root.taggedValidators
+
+    # fields sharing the context are validated one after another and up to
+    # the first error, like without Twisted. Returns a Deferred firing with
+    # the results
+    def shared( count, validateItem, context ):
+        if isCooperative( count, context ):
+            return cooperate( count, validateItem, shared=True )
+        return shared_validate( count, validateItem )
 
-    def schema__createContextChildren_on_value_done( waste, d, schema, value, result, errors ):
+    @defer.inlineCallbacks
+    def shared_validate( count, validateItem ):
+        results = []
+        for pos in range( count ):
+            result = validateItem( pos )
+            if isinstance( result, defer.Deferred ):
+                result = yield result.addErrback( shared_gotError )
+            results.append( result )
+            if isinstance( result, Invalid ):
+                break
+
+        defer.returnValue( results )
+
+    def shared_gotError( failure ):
+        failure.trap( Invalid )
+        return failure.value
+
+    # results of fields sharing the context, fails with the first error or
+    # invalid after that
+    def cooperate_sharedResult( results, keys, returnList, invalid=None ):
+        for res in results:
+            if isinstance( res, Invalid ):
+                raise res
+        if invalid is not None:
+            raise invalid
+
+        if returnList:
+            return results
+        return dict( zip( keys, results ) )
+
+    # children added to errorlist and updates as they finished, see
+    # Context._regroup
+    def cooperate_childrenResult( results, schema, context, marks, value, children, returnList ):
+        context._regroup( marks, children )
+        for res in results:
+            if isinstance( res, Invalid ):
+                raise Invalid( value, schema )
+
+        if returnList:
+            return results
+        return dict( ( child.key, res ) for ( child, res ) in zip( children, results ) )
+
+    def schema__createContextChildren_on_value_done( waste, d, schema, context, marks, children, value, result, errors ):
+        context._regroup( marks, children )
         if not errors:
             d.callback( result )
         else:
@@ -442,17 +702,11 @@ def monkeyPatch():
             if isList:
                 extraFields = max( len(value), len(self.index) )
             else:
-                extraFields = list(value.keys())
-
-        if self.returnList:
-            result = []
-        else:
-            result = {}
+                extraFields = self._extraKeys( value )
 
         numValues = len(value)
-        jobs = []
+        items = []
 
-        errorset = []
         for pos in range(len(self.index)):
             key = self.index[pos]
             if isList:
@@ -464,36 +718,25 @@ def monkeyPatch():
                     val = MISSING
             else:
                 val = value.get( key, MISSING)
-                if not self.allowExtraFields and val is not MISSING:
-                    try: extraFields.remove(key)
-                    except: pass
 
-            job = defer.maybeDeferred\
-                ( self.validators[ key ].validate
-                , context
-                , val
-                )
-
-            jobs.append\
-                ( job.addCallback( schema_gotResult, result, key, isList, self.returnList )\
-                    .addErrback( schema_gotError, errorset, key )
-                )
+            items.append( ( key, val ) )
 
+        invalid = None
         if extraFields:
-            raise Invalid( value, self, 'extraFields',extraFields=extraFields)
-
-        d = defer.Deferred()
-        jobs =defer.DeferredList( jobs )
-        jobs.addCallback\
-            ( schema__on_value_done
-            , d
-            , self
-            , value
-            , result
-            , errorset
-            )
+            invalid = Invalid( value, self, 'extraFields',extraFields=extraFields)
 
-        return d
+        validators = self.validators
+        return shared\
+            ( len( items )
+            , lambda pos: cooperate_validate\
+                ( validators[ items[pos][0] ], context, items[pos][1] )
+            , context
+            ).addCallback\
+                ( cooperate_sharedResult
+                , [ key for ( key, val ) in items ]
+                , self.returnList
+                , invalid
+                )
 
     def schema__createContextChildren_on_value( self, context, value ):
         isList = isinstance(value, list) or isinstance(value,tuple) or isinstance(value,set)
@@ -506,7 +749,7 @@ def monkeyPatch():
             if isList:
                 extraFields = max( len(value), len(self.index) )
             else:
-                extraFields = list(value.keys())
+                extraFields = self._extraKeys( value )
 
         errors = []
 
@@ -535,12 +778,8 @@ def monkeyPatch():
             else:
                 childContext.__value__ = value.get( key, MISSING )
 
-            if not self.allowExtraFields:
-                if isList:
-                    extraFields-=1
-                else:
-                    try: extraFields.remove(key)
-                    except: pass
+            if isList and not self.allowExtraFields:
+                extraFields-=1
 
         if extraFields:
             raise Invalid( value, self, 'extraFields',extraFields=extraFields)
@@ -549,11 +788,38 @@ def monkeyPatch():
 
         jobs = []
 
-        # validate
-        for key in self.index:
+        tags = context.root.taggedValidators
+        children = [ context( key ) for key in self.index ]
+        marks = context._entryMarks()
+
+        if isCooperative( len( self.index ), context ):
+            return cooperate\
+                ( len( children )
+                , lambda pos: children[pos].check()\
+                    if isSync( children[pos].validator, tags )\
+                    else children[pos].result
+                ).addCallback\
+                    ( cooperate_childrenResult
+                    , self
+                    , context
+                    , marks
+                    , value
+                    , children
+                    , self.returnList
+                    )
+
+        # validate, sync fields right away
+        for ( key, childContext ) in zip( self.index, children ):
+            if isSync( childContext.validator, tags ):
+                res = childContext.check()
+                if isinstance( res, Invalid ):
+                    errors.append( res )
+                else:
+                    schema_gotResult( res, result, key, isList, self.returnList )
+                continue
 
             jobs.append\
-                ( context( key ).result\
+                ( childContext.result\
                     .addCallback( schema_gotResult, result, key, isList, self.returnList )\
                     .addErrback( schema_gotError, errors, key )
                 )
@@ -564,6 +830,9 @@ def monkeyPatch():
             ( schema__createContextChildren_on_value_done
             , d
             , self
+            , context
+            , marks
+            , children
             , value
             , result
             , errors
@@ -572,74 +841,39 @@ def monkeyPatch():
         return d
 
     def forEach__on_value( self, context, value ):
-        if self.returnList:
-            result = []
-        else:
-            result = {}
-
         isList = isinstance( value, list) or isinstance(value, tuple) or isinstance(value, set)
-        errorset = []
-        jobs = []
+        if not isList:
+            if not isinstance(value, dict ):
+                raise Invalid( value, self,'type' )
+
         if isList or self.numericKeys:
-            for pos in range( len( value ) ):
-                if not isList:
-                    val = value.get(str(pos),MISSING)
-                    if val is MISSING:
+            if not isList:
+                for pos in range( len( value ) ):
+                    if str( pos ) not in value:
                         raise Invalid( value, self, 'numericKeys', keys=list(value.keys()) )
-                else:
-                    val = value[pos]
-                key = str(pos)
-                jobs.append\
-                    ( defer.maybeDeferred\
-                        ( self.validator.validate
-                        , context, val
-                        ).addCallback\
-                            ( schema_gotResult
-                            , result
-                            , key
-                            , isList
-                            , self.returnList
-                            )\
-                        .addErrback\
-                            ( schema_gotError
-                            , errorset
-                            , key
-                            )
-                    )
+                values = [ value[ str( pos ) ] for pos in range( len( value ) ) ]
+            else:
+                values = value
+            keys = list( range( len( values ) ) )
         else:
-            for (key, val) in value.items():
-
-                jobs.append\
-                    ( defer.maybeDeferred\
-                        ( self.validator.validate
-                        , context, val
-                        ).addCallback\
-                            ( schema_gotResult
-                            , result
-                            , key
-                            , isList
-                            , self.returnList
-                            )\
-                        .addErrback\
-                            ( schema_gotError
-                            , errorset
-                            , key
-                            )
-                    )
+            keys = list( value.keys() )
+            values = list( value.values() )
 
-        d = defer.Deferred()
-        jobs = defer.DeferredList( jobs )
-        jobs.addCallback\
-            ( schema__on_value_done
-            , d
-            , self
-            , value
-            , result
-            , errorset
-            )
+        validator = self.validator
+        return shared\
+            ( len( values )
+            , lambda pos: cooperate_validate( validator, context, values[pos] )
+            , context
+            ).addCallback\
+                ( cooperate_sharedResult
+                , keys
+                , self.returnList
+                )
 
-        return d
 
+    def forEach_cooperateDone( results, forEach, context, marks, value, children ):
+        return cooperate_childrenResult\
+            ( results, forEach, context, marks, value, children, forEach.returnList )
 
     def forEach__createContextChildren_on_value( self, context, value ):
         isList = isinstance( value, list) or isinstance(value, tuple) or isinstance(value, set)
@@ -648,6 +882,30 @@ def monkeyPatch():
             if not isinstance(value, dict ):
                 raise Invalid( value, self,'type' )
 
+        # children are created while validating
+        if isList and not isinstance( value, set ) and isCooperative( len( value ), context ):
+            context.setIndexFunc( lambda index: str(index) )
+            children = []
+            validator = self.validator
+
+            # before validating, Fields may add children meanwhile
+            keys = set( str( pos ) for pos in range( len( value ) ) )
+            context._pruneChildren\
+                ( [ child for child in ( context._children or {} ).values()\
+                    if child.key in keys ]
+                )
+            marks = context._entryMarks()
+
+            def validateChild( pos ):
+                childContext = context( str( pos ) )
+                childContext.validator = validator
+                childContext.__value__ = value[ pos ]
+                children.append( childContext )
+                return childContext.result
+
+            return cooperate( len( value ), validateChild )\
+                .addCallback( forEach_cooperateDone, self, context, marks, value, children )
+
         if self.returnList:
             result = []
         else:
@@ -685,6 +943,9 @@ def monkeyPatch():
                 contextChild.__value__ = val
                 children.append( contextChild )
 
+        context._pruneChildren( children )
+
+        marks = context._entryMarks()
         jobs = []
         #validate
         for childContext in children:
@@ -710,6 +971,9 @@ def monkeyPatch():
             ( schema__createContextChildren_on_value_done
             , d
             , self
+            , context
+            , marks
+            , children
             , value
             , result
             , errors
@@ -750,58 +1014,47 @@ def monkeyPatch():
 
         defer.returnValue( value )
 
-    from twisted.names import client
-    from twisted.names.dns import Record_MX
-    from twisted.names.error import DNSNameError
-    from twisted.internet.defer import TimeoutError
-
-    def mxLookup_gotResult(result, d, value, validator, context ):
-        if isinstance( result, Failure ):
-            if isinstance(result.value, TimeoutError):
-                d.errback( Invalid( value, validator ) )
-            elif not isinstance(result.value, DNSNameError):
-                d.errback( result )
-            else:
-                d.errback( Invalid( value, validator ) )
-            return
-
-        (answers, auth, add) = result
-        if not len(answers):
-            d.errback( Invalid( value, validator ) )
-        else:
-            for record in answers:
-                if isinstance(record.payload,Record_MX):
-                    d.callback( value )
-                    return
-
-            d.errback( Invalid( value, validator ) )
+    def mxLookup_gotAnswer( answer, value, validator ):
+        result = validator._outcome( value, validator._answered( value, answer ) )
+        if isinstance( result, Invalid ):
+            raise result
+        return result
 
-    mxLookup_resolver = client.Resolver('/etc/resolv.conf')
     def mxLookup_on_value( self, context, value ):
-        d = defer.Deferred()
-        mxLookup_resolver.lookupMailExchange( value, [2,4,6,8,10] )\
-            .addBoth( mxLookup_gotResult, d, value, self, context )
-
-        return d
-
-
-    Context.validate = context_validate
-    Tag.validate = tag_validate
-    Compose.valdate = compose_validate
-    Tmp.validate = tmp_validate
-    Item.validate = item_validate
-    Not.validate = not_validate
-    And.validate = and_validate
-    Or.validate = or_validate
-    Call.validate = call_validate
-    Match.on_value = match_on_value
-    If.validate = if_validate
-    Schema._on_value = schema__on_value
-    Schema._createContextChildren_on_value = schema__createContextChildren_on_value
-    ForEach._on_value = forEach__on_value
-    ForEach._createContextChildren_on_value = forEach__createContextChildren_on_value
-    Field.validate = field_validate
+        if self.cache is not None:
+            found = self.cache.get( value )
+            if found is not None:
+                return self._outcome( value, found )
+
+        return defer.maybeDeferred( ( self.resolver or defaultResolver() ).lookup, value )\
+            .addCallback( mxLookup_gotAnswer, value, self )
+
+
+    Context.validate = context_syncValidate( context_validate, Context.validate )
+    Tag.validate = _syncValidate( tag_validate )
+    Compose.validate = _syncValidate( compose_validate )
+    Tmp.validate = _syncValidate( tmp_validate )
+    Item.validate = _syncValidate( item_validate )
+    Not.validate = _syncValidate( not_validate )
+    And.validate = _syncValidate( and_validate )
+    Or.validate = _syncValidate( or_validate )
+    Call.validate = _syncValidate( call_validate )
+    Match.on_value = _syncOnValue( match_on_value, Match.on_value )
+    If.validate = _syncValidate( if_validate )
+    Schema._on_value = _syncOnValue( schema__on_value, Schema._on_value )
+    Schema._createContextChildren_on_value = _syncOnValue\
+        ( schema__createContextChildren_on_value
+        , Schema._createContextChildren_on_value
+        )
+    ForEach._on_value = _syncOnValue( forEach__on_value, ForEach._on_value )
+    ForEach._createContextChildren_on_value = _syncOnValue\
+        ( forEach__createContextChildren_on_value
+        , ForEach._createContextChildren_on_value
+        )
+    Field.validate = _syncValidate( field_validate )
     MXLookup.on_value = mxLookup_on_value
+    # lookups run concurrently anyway
+    PrefetchMX.prefetch = lambda self, value: None
 
     monkeyPatch._isMonkeyPatched = True
 
@@ -1,31 +1,128 @@
 import sys
 _python3 = sys.version_info[0]>=3
 
+try:
+    from reprlib import Repr
+except ImportError:
+    from repr import Repr
+
+# containers with more items are abbreviated in error messages, so are
+# values nested deeper and longer texts
+MAX_VALUE_ITEMS = 16
+MAX_VALUE_LEVEL = 3
+MAX_VALUE_LENGTH = 1000
+
+class _ValueRepr( Repr ):
+    """ like reprlib's, but the value itself is rendered by str() """
+
+    def repr_instance( self, x, level ):
+        if level != self.maxlevel:
+            return Repr.repr_instance( self, x, level )
+        try:
+            return str( x )
+        except:
+            return ''
+
+_valueRepr = _ValueRepr()
+_valueRepr.maxlevel = MAX_VALUE_LEVEL
+_valueRepr.maxlist = _valueRepr.maxtuple = _valueRepr.maxdict\
+    = _valueRepr.maxset = _valueRepr.maxfrozenset = _valueRepr.maxdeque\
+    = _valueRepr.maxarray = MAX_VALUE_ITEMS
+_valueRepr.maxstring = _valueRepr.maxother = 80
+
+def _cut( text ):
+    if len( text ) > MAX_VALUE_LENGTH:
+        return text[ :MAX_VALUE_LENGTH ] + '...'
+    return text
+
+def valueToString( value ):
+    """ returns value as text for error messages, abbreviated by reprlib
+    and cut after MAX_VALUE_LENGTH characters ( marked by '...' ) """
+    decode_utf8 = False
+
+    if isinstance(value, str):
+        if _python3:
+            return _cut( value )
+        decode_utf8 = True
+
+    elif _python3 and isinstance( value, bytes ):
+        decode_utf8 = True
+
+    if decode_utf8:
+        try:
+            return _cut( value.decode('utf-8') )
+        except UnicodeDecodeError:
+            return ''
+
+    try:
+        return _cut( _valueRepr.repr( value ) )
+    except:
+        return ''
+
+
 class Invalid(Exception):
     context = None
 
+    # cache snapshot, set while value and value.type are not rendered yet
+    _pending = None
+
     def __init__(self, value, _validator=None, _key='fail', **kwargs):
         if _validator is not None:
             self.validator = _validator
         self.value = value
-        self.data = {'key': _key, 'extra': kwargs}
+        self._data = {'key': _key, 'extra': kwargs}
+
+    @property
+    def data(self):
+        if self._pending is not None:
+            self._render()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._pending = None
+        self._data = value
 
     @property
     def key(self):
-        return self.data['key']
+        return self._data['key']
 
     @key.setter
     def key(self, value):
-        self.data['key'] = value
+        self._data['key'] = value
 
     @property
     def message(self):
-        return self.data.get('message',None)
+        return self._data.get('message',None)
 
     @property
     def extra(self):
         return self.data['extra']
 
+    # called by the context this error is set to, the rest of the error
+    # details are rendered on first access of data or extra
+    def _setMessage(self, message, cache=None):
+        data = self._data
+        data['message'] = message
+        if hasattr(self,'realkey'):
+            data['key'] = self.realkey
+
+        self._pending = cache and dict(cache) or ()
+
+    def _render(self):
+        cache = self._pending
+        self._pending = None
+
+        extra = self._data['extra']
+        value = self.value
+
+        extra['value.type'] = getattr(value, '__class__', None) is not None \
+            and getattr(value.__class__,'__name__', False) or 'unknown'
+        extra['value'] = valueToString( value )
+
+        if cache:
+            extra.update( cache )
+
     def __repr__(self):
         return 'Invalid(%s, %s)' % (self.value, self.key)
 
@@ -40,4 +137,3 @@ class Invalid(Exception):
             return self.context.root.errorFormatter( self.context, self )
         else:
             return self.__repr__()
-
@@ -5,7 +5,8 @@ import sys
 from .error import  Invalid
 
 import warnings
-import logging, inspect
+import logging
+import pprint
 log = logging.getLogger(__name__)
 
 _python3 = sys.version_info[0]>=3
@@ -19,6 +20,10 @@ class __MISSING__( str ):
 
     __unicode__ = __str__
 
+    # unpickles as the MISSING singleton
+    def __reduce__(self):
+        return 'MISSING'
+
 MISSING = __MISSING__()
 
 def _append_list(klass, key, data):
@@ -94,48 +99,133 @@ def _callback(klass):
 
     return klass
 
+# parsed paths, dropped as a whole when full
+_pathCache = {}
+_pathCacheSize = 10000
+
+def _cachePath( key, parsed ):
+    if len( _pathCache ) >= _pathCacheSize:
+        _pathCache.clear()
+    _pathCache[ key ] = parsed
+    return parsed
+
+def splitPath( path ):
+    """ returns the keys of the dotted path ( 'a.b' ) as a tuple """
+    keys = _pathCache.get( path )
+    if keys is None:
+        keys = _cachePath( path, tuple( path.split('.') ) )
+    return keys
+
+def parseFieldPath( path ):
+    """ returns ( absolute, ups, keys ) for a Field path
+
+    '/a.b' is absolute, '..a' goes up two times ( to the parent ) and keys
+    written as '(n)' are returned as int indexes.
+    """
+    parsed = _pathCache.get( ( 'field', path ) )
+    if parsed is not None:
+        return parsed
+
+    keys = list( path.split('.') )
+    absolute = keys[0].startswith('/')
+    ups = 0
+    if absolute:
+        keys[0] = keys[0][1:]
+    else:
+        while ups < len( keys ) and keys[ ups ] == '':
+            ups += 1
+        del keys[ :ups ]
+
+    for ( pos, key ) in enumerate( keys ):
+        if key.startswith('(') and key.endswith(')'):
+            keys[ pos ] = int( key[1:-1] )
+
+    return _cachePath( ( 'field', path ), ( absolute, ups, tuple( keys ) ) )
+
+def renderPath( rootKey, location ):
+    """ returns the string of a path given as a tuple of keys """
+    if not location:
+        return rootKey
+    return rootKey + '.'.join( location )
+
 def defaultErrorFormatter( context, error ):
     return error.message % error.extra
 
 
 # TODO: don't set context.value to None when in fact "" is given
 class Context( dict ):
-
-    __value__ = MISSING
-    __error__ = MISSING
-    __result__ = MISSING
-
-    parent = None
-    root = None
-    key = '/'
-
-    isValidated = False
-    isValidating = False
-
-    taggedValidators = {}
-    indexKeyRelation = {}
-    numValues = 0
+    """ A node in the validation tree.
+
+    State is kept in slots; the dict itself is a JSON-able view ( path,
+    value, error, children, errorlist, updates ) which is only written
+    when it is read.
+    """
+
+    __slots__ = \
+        ( '__validator__', '__value__', '__result__', '__error__'
+        , 'parent', 'root', 'key', 'isValidated', 'isValidating'
+        , '_path', '_location', '_children', '_errorlist', '_updates', '_updatedValue'
+        , '_error', '_errorpaths', 'cache', 'params', 'indexFunc', 'indexKeyRelation'
+        , 'childFactory', '_lastOutcome', '_keptChildren'
+        # set on demand
+        , 'errorFormatter', 'taggedValidators', 'numValues'
+        )
 
     def __init__(self, validator=None, value=MISSING, key='/', parent=None):
         if parent is not None:
             self.parent = parent
             self.root = parent.root
             self.key = key
-
-            sep = self.root is not parent and '.' or ''
-
-            self['path'] = '%s%s%s' % (parent.path,sep,key)
+            self._path = None
+            self._location = None
         else:
+            self.parent = None
             self.root = self
+            self.key = key
+            self._path = key
+            self._location = ()
             self.errorFormatter = defaultErrorFormatter
-            self['path'] = key
+            self.taggedValidators = {}
+            # keeps the view non-empty, json's C encoder skips empty dicts
+            dict.__setitem__( self, 'path', key )
 
-        self.validator = validator
-        self.value = value
+        if value is not MISSING and value == '':
+            value = None
+
+        self.__validator__ = validator
+        self.__value__ = value
+        self.__result__ = MISSING
+        self.__error__ = MISSING
+        self.isValidated = False
+        self.isValidating = False
+        self._children = None
+        self._errorlist = None
+        self._errorpaths = None
+        self._updates = None
+        self._updatedValue = MISSING
+        self._error = None
+        self.cache = None
+        self.params = None
+        self.indexFunc = None
+        self.indexKeyRelation = None
+        self.childFactory = None
+        self._lastOutcome = None
+        self._keptChildren = None
 
     @property
     def path(self):
-        return self['path']
+        path = self._path
+        if path is None:
+            path = self._path = renderPath( self.root.key, self.location )
+        return path
+
+    @property
+    def location(self):
+        """ the keys from the root to this context, as a tuple """
+        location = self._location
+        if location is None:
+            location = self._location = self.parent.location + ( self.key, )
+        return location
 
     @property
     def childs(self):
@@ -144,37 +234,45 @@ class Context( dict ):
 
     @property
     def children(self):
-        children = self.get('children',None)
+        children = self._children
         if children is None:
-            children = self[ 'children' ] = {}
+            children = self._children = {}
+        elif not self.root.isValidating:
+            for child in children.values():
+                child._updateView( False )
         return children
 
+    # errorlist and updates keep locations, the paths are rendered on read
     @property
     def errorlist(self):
-        errorlist = self.get('errorlist',None)
-        if errorlist is None:
-            errorlist = self[ 'errorlist' ] = []
-        return errorlist
+        if self._errorlist is None:
+            self._errorlist = []
+        return self._renderPaths( self._errorlist )
 
     @property
     def updates(self):
-        updates = self.get('updates',None)
-        if updates is None:
-            updates = self[ 'updates' ] = []
-        return updates
+        if self._updates is None:
+            self._updates = []
+        return self._renderPaths( self._updates )
+
+    def _renderPaths( self, locations ):
+        rootKey = self.root.key
+        return [ renderPath( rootKey, location ) for location in locations ]
 
     @property
     def value(self):
-        return self.get('value',self.__value__)
+        value = self._updatedValue
+        if value is MISSING:
+            return self.__value__
+        return value
 
     @value.setter
     def value( self, value):
         if value is self.value:
             return
 
-        if self.root.isValidating:
-            self['value'] = value
-            self.root.updates.append( self.path )
+        if self._inValidation():
+            self._update( value )
             return
 
         if (value == '') or value is [] or value is {}:
@@ -183,6 +281,83 @@ class Context( dict ):
         self.__value__ = value
         self.clear()
 
+        if self.parent is not None:
+            self.parent._childChanged( self.key, value )
+
+    # keeps value as the updated value and records it in the updates
+    def _update( self, value ):
+        self._updatedValue = value
+        root = self.root
+        if root._updates is None:
+            root._updates = []
+        root._updates.append( self.location )
+
+    # whether this context or one above it is being validated, values set
+    # then are updates and must not forget any results
+    def _inValidation( self ):
+        context = self
+        while context is not None:
+            if context.isValidating:
+                return True
+            context = context.parent
+        return False
+
+    # takes the new value of a child into the values up to the root and
+    # forgets their results, the other children keep theirs. A validator
+    # which kept its outcome ( validator, state, changed keys ) in
+    # _lastOutcome learns which children to validate again
+    def _childChanged( self, key, value ):
+        context = self
+        while context is not None:
+            context._setChildValue( key, value )
+            context._forgetResult()
+            context._forgetErrors( False )
+
+            outcome = context._lastOutcome
+            if outcome is not None:
+                outcome[2].add( key )
+
+            key = context.key
+            value = context.__value__
+            context = context.parent
+
+    # copies the own value with the child's new value in it
+    def _setChildValue( self, key, value ):
+        container = self.__value__
+        if isinstance( container, dict ):
+            container = dict( container )
+            container[ key ] = value
+        elif isinstance( container, list ) or isinstance( container, tuple ):
+            pos = self._positionOf( key, len( container ) )
+            if pos is None:
+                return
+            changed = list( container )
+            changed[ pos ] = value
+            if isinstance( container, tuple ):
+                changed = tuple( changed )
+            container = changed
+        else:
+            return
+
+        self.__value__ = container
+
+    # the position of the child key in a list value, by the index func
+    def _positionOf( self, key, numValues ):
+        indexFunc = self.indexFunc
+        if indexFunc is None:
+            return None
+
+        if key.isdigit() and int( key ) < numValues and indexFunc( int( key ) ) == key:
+            return int( key )
+
+        for pos in range( numValues ):
+            try:
+                if indexFunc( pos ) == key:
+                    return pos
+            except IndexError:
+                break
+        return None
+
     @property
     def result(self):
         return self.validate()
@@ -199,53 +374,25 @@ class Context( dict ):
         message = error.validator.__messages__[error.key]
 
         if message is not None:
-            extra = error.data['extra']
-            value = error.value
-            data = error.data
-
-            data['message'] = message
-            if hasattr(error,'realkey'):
-                data['key'] = error.realkey
-
-            extra['value.type'] = getattr(value, '__class__', None) is not None \
-                and getattr(value.__class__,'__name__', False) or 'unknown'
-
-            value_str = value
-            decode_utf8 = False
-
-            if not isinstance(value, str):
-                if _python3 and isinstance( value, bytes ):
-                    decode_utf8 = True
-                else:
-                    try:
-                        value_str = str(value)
-                    except:
-                        value_str = ''
-
-            elif not _python3:
-                decode_utf8 = True
-
-            if decode_utf8:
-                try:
-                    value_str = value.decode('utf-8')
-                except UnicodeDecodeError:
-                    value_str = ''
-
-            extra['value'] = value_str
-
-            cache = getattr( self, 'cache', None)
-            if cache is not None:
-                extra.update( cache )
-
-            self['error'] = self.__error__.data
-
-            if self.__error__.context.path not in self.root.errorlist:
-                self.root.errorlist.append( self.__error__.context.path )
+            error._setMessage( message, self.cache )
+            self._reportError( error )
+
+    # puts the error into the view and the root's errorlist
+    def _reportError( self, error ):
+        self._error = error
+
+        location = self.location
+        root = self.root
+        errorpaths = root._errorpaths
+        if errorpaths is None:
+            errorpaths = root._errorpaths = set()
+            root._errorlist = []
+        if location not in errorpaths:
+            errorpaths.add( location )
+            root._errorlist.append( location )
 
     @property
     def validator(self):
-        if not hasattr(self, '__validator__'):
-            return None
         return self.__validator__
 
     @validator.setter
@@ -257,21 +404,19 @@ class Context( dict ):
         self.__result__ = MISSING
         self.__error__ = MISSING
         self.indexKeyRelation = {}
-
-        if func is not None:
-            self.indexFunc = func
-        elif hasattr( self, 'indexFunc'):
-            del self.indexFunc
+        self.indexFunc = func
 
     def getKeyByIndex( self, index ):
-        key = self.indexKeyRelation.get( index, None )
-        if key is not None:
-            return key
+        indexKeyRelation = self.indexKeyRelation
+        if indexKeyRelation:
+            key = indexKeyRelation.get( index, None )
+            if key is not None:
+                return key
 
-        indexFunc = getattr(self,'indexFunc',None)
+        indexFunc = self.indexFunc
         if indexFunc:
-            if not self.indexKeyRelation:
-                self.numValues = len(self.children)
+            if not indexKeyRelation and self.childFactory is None:
+                self.numValues = len(self._children or ())
 
             self.indexKeyRelation[ index ] = indexFunc( index )
             return self.indexKeyRelation[ index ]
@@ -279,44 +424,189 @@ class Context( dict ):
             raise SyntaxError('Context %s has no children supporting indexing' % self.path)
 
     def clear( self, force=False ):
+        # the children are not the ones of the outcome any more
+        self._lastOutcome = None
         if not self.isValidated and not force:
             return
 
+        self._forgetErrors( True )
+        self._clearState()
+        self._children = None
+        self._keptChildren = None
+
+    def reset( self, value=MISSING ):
+        """ Prepares a validated context for a new value.
+
+        Unlike setting context.value, the children with their paths are
+        kept and only values, results and errors are reset. A child comes
+        back when the new value reaches it again, children the new value
+        does not have are left out. Meant for reusing the context tree of a
+        fixed-shape form.
+        """
+        self._forgetErrors( True )
+        stack = [ self ]
+        while stack:
+            context = stack.pop()
+            context._clearState()
+            context.__value__ = MISSING
+            context.cache = None
+            context.params = None
+            context.indexFunc = None
+            context.indexKeyRelation = None
+
+            # kept aside until the new value asks for them again, so
+            # children the new value does not have are not shown
+            children = context._children
+            kept = context._keptChildren
+            if children:
+                if kept:
+                    kept.update( children )
+                else:
+                    kept = context._keptChildren = children
+            context._children = None
+
+            if kept:
+                stack.extend( kept.values() )
+
+        if value is not MISSING and value == '':
+            value = None
+
+        self.__value__ = value
+        return self
+
+    def _clearState( self ):
+        self._forgetResult()
+
+        self._errorlist = None
+        self._errorpaths = None
+        self._updates = None
+        self.childFactory = None
+        self._lastOutcome = None
+
+    def _forgetResult( self ):
         dict.clear( self )
+        if self.parent is None:
+            dict.__setitem__( self, 'path', self.key )
 
-        if self.parent is not None and self.parent.path:
-            self['path'] = '%s.%s' % (self.parent.path,self.key)
-        else:
-            self['path'] = self.key
+        self._updatedValue = MISSING
+        self._error = None
 
         self.isValidated = False
 
         self.__result__ = MISSING
         self.__error__ = MISSING
 
+    # drops this context ( deep: and its descendants ) from the root's
+    # errorlist and updates
+    def _forgetErrors( self, deep ):
+        root = self.root
+        if not root._errorlist and not root._updates:
+            return
+
+        location = self.location
+        size = len( location )
+
+        def keep( locations ):
+            return\
+                [ other for other in locations
+                    if other[ :size ] != location or ( not deep and len( other ) != size )
+                ]
+
+        if root._errorlist:
+            errorlist = keep( root._errorlist )
+            if len( errorlist ) != len( root._errorlist ):
+                root._errorlist = errorlist
+                root._errorpaths = set( errorlist )
+
+        if root._updates:
+            root._updates = keep( root._updates )
+
+    # where the root's errorlist and updates end, see _regroup
+    def _entryMarks( self ):
+        root = self.root
+        return ( len( root._errorlist or () ), len( root._updates or () ) )
+
+    # puts the errorlist and updates entries below children added after
+    # marks in the order of children, e.g. after validating them
+    # concurrently. Other entries keep their places
+    def _regroup( self, marks, children ):
+        root = self.root
+        location = self.location
+        depth = len( location )
+        ranks = dict( ( child.key, rank ) for ( rank, child ) in enumerate( children ) )
+
+        for ( locations, start ) in zip( ( root._errorlist, root._updates ), marks ):
+            if not locations or len( locations ) - start < 2:
+                continue
+
+            positions = [ pos for pos in range( start, len( locations ) )\
+                if len( locations[ pos ] ) > depth\
+                and locations[ pos ][ :depth ] == location\
+                and locations[ pos ][ depth ] in ranks ]
+            ordered = sorted\
+                ( [ locations[ pos ] for pos in positions ]
+                , key=lambda found: ranks[ found[ depth ] ]
+                )
+            for ( pos, found ) in zip( positions, ordered ):
+                locations[ pos ] = found
+
+    # drops children which are not in keep, e.g. left over by a longer value
+    def _pruneChildren( self, keep ):
+        children = self._children
+        if children is not None and len( children ) > len( keep ):
+            self._children = dict( ( child.key, child ) for child in keep )
+
+    # moves a context which is not in its parent's children to another key
+    def _rekey( self, key ):
+        self.key = key
+        stack = [ self ]
+        while stack:
+            context = stack.pop()
+            context._path = None
+            context._location = None
+            for children in ( context._children, context._keptChildren ):
+                if children:
+                    stack.extend( children.values() )
+
     def validate( self ):
+        result = self.check()
+        if isinstance( result, Invalid ):
+            raise result
+        return result
+
+    # like validate, but returns Invalid instead of raising it
+    def check( self ):
         if self.isValidated:
             if self.__error__ is not MISSING:
-                raise self.__error__
+                return self.__error__
             return self.__result__
 
         self.isValidating = True
 
-        if self.parent is not None:
+        try:
+            if self.parent is not None:
 
-            if not self.parent.isValidated and not self.parent.isValidating:
-                self.parent.validate()
+                if not self.parent.isValidated and not self.parent.isValidating:
+                    result = self.parent.check()
 
-        if self.validator is None:
-            raise AttributeError("No validator set for context '%s'" % self.path )
+                    # validated along with the parent
+                    if self.isValidated:
+                        if self.__error__ is not MISSING:
+                            return self.__error__
+                        return self.__result__
 
-        try:
-            result = self.validator.validate( self, self.__value__)
+                    if isinstance( result, Invalid ):
+                        return result
+
+            if self.__validator__ is None:
+                raise AttributeError("No validator set for context '%s'" % self.path )
+
+            result = self.__validator__.check( self, self.__value__)
+
+            if isinstance( result, Invalid ):
+                self.error = result
+                return result
 
-        except Invalid as e:
-            self.error = e
-            raise e
-        else:
             if result is not PASS:
                 self.__result__ = result
             else:
@@ -330,28 +620,142 @@ class Context( dict ):
     def __call__( self, path ):
         if path.__class__ is int:
             if path < 0:
-                path = self.numValues+path
+                path = getattr( self, 'numValues', 0 )+path
 
             return self( self.getKeyByIndex( path ) )
         elif not path:
             raise SyntaxError('Path cannot be empty')
 
-        path = path.split('.',1)
+        keys = _pathCache.get( path )
+        if keys is None:
+            if path[-1] == '.':
+                raise SyntaxError('Path cannot be empty')
+            keys = splitPath( path )
 
-        try:
-            child = self.children[path[0]]
-        except KeyError:
-            child = self.children[path[0]] = Context( key=path[0], parent=self )
+        context = self
+        for key in keys:
+            children = context._children
+            if children is None:
+                children = context._children = {}
 
-        if len(path) == 1:
-            return child
-        else:
-            path=path[1]
+            try:
+                child = children[key]
+            except KeyError:
+                child = None
+                kept = context._keptChildren
+                if kept:
+                    # kept by reset, bound again like a new child
+                    child = kept.pop( key, None )
+                    if child is not None:
+                        child.__validator__ = None
+                if child is None and context.childFactory is not None:
+                    # a child which was validated without a context
+                    child = context.childFactory( key )
+                if child is None:
+                    child = Context( key=key, parent=context )
+                children[key] = child
+
+            context = child
+
+        if not self.root.isValidating:
+            # handed out for navigation, might get serialized on its own
+            context._updateView()
+        return context
+
+    # writes the state of this context into the dict view
+    def _updateView( self, deep=True ):
+        store = dict.__setitem__
+        store( self, 'path', self.path )
+
+        errorlist = self._errorlist
+        if errorlist is not None:
+            errorlist = self._renderPaths( errorlist )
+        updates = self._updates
+        if updates is not None:
+            updates = self._renderPaths( updates )
+
+        for key, item, empty in \
+            ( ( 'value', self._updatedValue, MISSING )
+            , ( 'error', self._error and self._error.data, None )
+            , ( 'children', self._children, None )
+            , ( 'errorlist', errorlist, None )
+            , ( 'updates', updates, None )
+            ):
+            if item is empty:
+                dict.pop( self, key, None )
+            else:
+                store( self, key, item )
+
+        if deep and self._children:
+            # the children must not look empty to json's C encoder either
+            for child in self._children.values():
+                child._updateView( False )
 
-        return child(path)
+    def __getitem__( self, key ):
+        self._updateView()
+        return dict.__getitem__( self, key )
 
+    def get( self, key, default=None ):
+        self._updateView()
+        return dict.get( self, key, default )
 
-from .util import varargs2kwargs
+    def __contains__( self, key ):
+        self._updateView()
+        return dict.__contains__( self, key )
+
+    def __iter__( self ):
+        self._updateView()
+        return dict.__iter__( self )
+
+    def __len__( self ):
+        self._updateView()
+        return dict.__len__( self )
+
+    # a context is never empty, also this avoids rendering the view
+    def __bool__( self ):
+        return True
+
+    __nonzero__ = __bool__
+
+    def __eq__( self, other ):
+        self._updateView()
+        if isinstance( other, Context ):
+            other._updateView()
+        return dict.__eq__( self, other )
+
+    def __ne__( self, other ):
+        return not self == other
+
+    __hash__ = None
+
+    def keys( self ):
+        self._updateView()
+        return dict.keys( self )
+
+    def values( self ):
+        self._updateView()
+        return dict.values( self )
+
+    def items( self ):
+        self._updateView()
+        return dict.items( self )
+
+    def copy( self ):
+        self._updateView()
+        return dict( dict.items( self ) )
+
+    def __repr__( self ):
+        self._updateView()
+        return dict.__repr__( self )
+
+# pprint only pretty prints dicts having dict's __repr__, the view is read
+# by items() there
+_pprintDispatch = getattr( pprint.PrettyPrinter, '_dispatch', None )
+if _pprintDispatch is not None and dict.__repr__ in _pprintDispatch:
+    _pprintDispatch[ Context.__repr__ ] = _pprintDispatch[ dict.__repr__ ]
+
+
+from .util import shiftArgs, getArgSpec
 # Some kind of 'clonable' object -
 # we reinitialize child objects with inherited kwargs merged with new ones.
 # This allows us to alter just a few specific parameters in child objects.
@@ -366,6 +770,8 @@ from .util import varargs2kwargs
 #   is defined. You can use it for attributes you only want to initialize
 #   once. It also allows you to 'name' *varargs in the function definition.
 # * __inherit__ specifies what attributes should be copied to child instances.
+# * class attributes named like parameters are their defaults, they are
+#   read along with the parameter names when the class is created.
 class Parameterized:
     __kwargs__ = {}
     __inherit__ = [ ]
@@ -373,13 +779,32 @@ class Parameterized:
 
     __ignoreClassParameters__ = []
 
+    __parameterNames__ = ()
+    __classParameters__ = {}
+
+    def __init_subclass__( cls, **kwargs ):
+        super().__init_subclass__( **kwargs )
+
+        names = ()
+        setParameters = getattr( cls, 'setParameters', None )
+        if setParameters is not None:
+            spec = getArgSpec( setParameters )
+            if spec.varargs:
+                raise SyntaxError('Cannot use *varargs in setParameters, please use %s.setArguments' % cls.__name__)
+            names = tuple( spec.args[1:] )
+
+        cls.__parameterNames__ = names
+        cls.__classParameters__ = dict\
+            ( ( key, getattr( cls, key ) ) for key in names
+                if hasattr( cls, key ) and not key in cls.__ignoreClassParameters__
+            )
+
     def __init__( self, *args, **kwargs ):
         parent = kwargs.pop( '_parent', None )
+        cls = self.__class__
 
-        if not hasattr( self, 'setArguments') and args:
-            func = getattr( self, 'setParameters', None)
-            if func is not None:
-                ( args, kwargs, shifted ) = varargs2kwargs( func, args, kwargs )
+        if args and cls.__parameterNames__ and not hasattr( cls, 'setArguments' ):
+            ( args, kwargs, shifted ) = shiftArgs( cls.__parameterNames__, args, kwargs )
 
         if parent is not None:
             self.__isRoot__ = False
@@ -387,29 +812,33 @@ class Parameterized:
             newkwargs.update(kwargs)
             kwargs = newkwargs
 
+            # most inherited attributes are set on the parent itself
+            parentAttributes = parent.__dict__
+            attributes = self.__dict__
             for key in self.__inherit__:
-                setattr(self, key, getattr(parent, key))
+                if key in parentAttributes:
+                    attributes[ key ] = parentAttributes[ key ]
+                else:
+                    setattr(self, key, getattr(parent, key))
         else:
-            for key in self.__getParameterNames__():
-                if hasattr(self.__class__,key)\
-                and not key in self.__ignoreClassParameters__\
-                and not key in kwargs:
-                    kwargs[key] = getattr(self.__class__, key)
+            for ( key, value ) in cls.__classParameters__.items():
+                if not key in kwargs:
+                    kwargs[key] = value
 
         if args or (parent is None):
-            if hasattr( self, 'setArguments' ):
+            if hasattr( cls, 'setArguments' ):
                 self.setArguments( *args )
             elif args:
-                raise SyntaxError('%s takes no further arguments' % self.__class__.__name__)
+                raise SyntaxError('%s takes no further arguments' % cls.__name__)
 
-        if hasattr( self, 'setParameters' ):
+        if hasattr( cls, 'setParameters' ):
             try:
                 self.setParameters( **kwargs )
             except TypeError as e:
-                raise TypeError(self.__class__.__name__+': '+e[0])
+                raise TypeError( '%s: %s' % ( cls.__name__, e ) )
 
         elif kwargs:
-            raise SyntaxError('%s takes no parameters' % self.__class__.__name__)
+            raise SyntaxError('%s takes no parameters' % cls.__name__)
 
         self.__kwargs__ = kwargs
 
@@ -420,18 +849,6 @@ class Parameterized:
 
     @classmethod
     def __getParameterNames__( cls ):
-        if not hasattr( cls, '__parameterNames__'):
-            if not hasattr( cls, 'setParameters'):
-                names = ()
-            else:
-                spec = inspect.getargspec( cls.setParameters )
-                if spec.varargs:
-                    raise SyntaxError('Cannot use *varargs in setParameters, please use %s.setArguments' % cls.__name__)
-                names = spec.args[1:]
-            setattr\
-                ( cls,'__parameterNames__'
-                , names
-                )
         return cls.__parameterNames__
 
 def inherit( *members ):
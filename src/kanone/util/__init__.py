@@ -1,26 +1,44 @@
+import collections
 import inspect
 
-def varargs2kwargs( function, args, kwargs, skipSelf=True ):
-    names = getParameterNames( function, skipSelf )
+ArgSpec = collections.namedtuple( 'ArgSpec', 'args varargs keywords defaults' )
+
+_positional = ( inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD )
 
-    realargs = list(args)
-    shifted = []
+def shiftArgs( names, args, kwargs ):
+    """ moves args to kwargs by names, returns ( args left, kwargs, shifted names ) """
+    count = min( len( names ), len( args ) )
+    shifted = names[ :count ]
 
-    for argpos in range(min(len( names ), len(args))):
-        key = names[ argpos ]
+    for key in shifted:
         if key in kwargs:
             raise SyntaxError('multiple kw args: %s' % key)
-        kwargs[ key ] = args[argpos]
-        shifted.append( key )
-        del realargs[0]
 
-    return realargs,kwargs,shifted
+    kwargs.update( zip( shifted, args ) )
+    return list( args[ count: ] ), kwargs, list( shifted )
+
+def varargs2kwargs( function, args, kwargs, skipSelf=True ):
+    return shiftArgs( getParameterNames( function, skipSelf ), args, kwargs )
 
 def getArgSpec( function ):
+    """ returns the ArgSpec of function, like the former inspect.getargspec """
     function = getattr( function, '__func__', function )
     spec = getattr( function, '__spec__', None)
     if spec is None:
-        function.__spec__ = spec = inspect.getargspec( function )
+        args = []
+        varargs = keywords = None
+        defaults = []
+        for parameter in inspect.signature( function, follow_wrapped=False ).parameters.values():
+            if parameter.kind in _positional:
+                args.append( parameter.name )
+                if parameter.default is not parameter.empty:
+                    defaults.append( parameter.default )
+            elif parameter.kind is parameter.VAR_POSITIONAL:
+                varargs = parameter.name
+            elif parameter.kind is parameter.VAR_KEYWORD:
+                keywords = parameter.name
+
+        function.__spec__ = spec = ArgSpec( args, varargs, keywords, tuple( defaults ) or None )
     return spec
 
 def getParameterNames( function, skipSelf=True ):
@@ -28,6 +46,5 @@ def getParameterNames( function, skipSelf=True ):
     names = getattr( function, '__parameterNames__', None)
     if names is None:
         spec = getArgSpec( function )
-        function.__parameterNames__ = names = skipSelf and spec.args[0] is 'self' and spec.args[1:] or spec.args
+        function.__parameterNames__ = names = skipSelf and spec.args[:1] == ['self'] and spec.args[1:] or spec.args
     return names
-
@@ -2,6 +2,7 @@ from .core import *
 from .basic import *
 from .check import *
 from .schema import *
+from .memoize import *
 
 from . import web
 from . import cache
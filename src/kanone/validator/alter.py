@@ -12,7 +12,7 @@ class Lower( Validator ):
         try:
             return value.lower()
         except Exception:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
 @messages\
     ( type = "Cannot format type %(value.type)s"
@@ -29,11 +29,11 @@ class Format( Validator ):
         parameters['value'] = value
 
         if not isinstance( self.formatter, str ):
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
         try:
             return self.formatter % parameters
         except Exception:
-            raise Invalid( value, self )
+            return Invalid( value, self )
 @messages\
     ( type = "Cannot update type %(value.type)s"
     )
@@ -46,12 +46,14 @@ class DictUpdate( Validator ):
         toUpdate = {}
         for (key,param) in self.parameters.items():
             if isinstance(param,ValidatorBase):
-                param = param.validate( context, value )
+                param = param.check( context, value )
+                if isinstance( param, Invalid ):
+                    return param
             toUpdate[key] = param
         try:
             value.update( toUpdate )
         except Exception:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
         return value
 
@@ -64,7 +66,7 @@ class EliminateWhiteSpace( Validator ):
         try:
             return ''.join(value.split())
         except AttributeError:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
 # TODO: don't set context.value to None when in fact "" is given, see lib
 @messages\
@@ -76,7 +78,7 @@ class Strip( Validator ):
         try:
             return value.strip()
         except AttributeError:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
     on_blank = on_value
 
@@ -93,7 +95,7 @@ class Split( Validator ):
         try:
             return value.split( self.separator, self.limit )
         except Exception:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
 @messages\
     ( type = "Can not join values of type %(value.type)s"
@@ -107,7 +109,7 @@ class Join( Validator):
         try:
             return self.separator.join( value )
         except Exception:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
 @messages\
     ( type = "Can not encode %(value.type)s to %(format)s"
@@ -120,12 +122,12 @@ class Encode( Validator ):
 
     def on_value( self, context, value ):
         if not hasattr( value,'encode') or not hasattr( value.encode,'__call__' ):
-            raise Invalid( value, self, 'type', format=self.format )
+            return Invalid( value, self, 'type', format=self.format )
 
         try:
             value = value.encode( self.format )
         except ValueError:
-            raise Invalid( value, self, format=self.format )
+            return Invalid( value, self, format=self.format )
 
         return value
 
@@ -140,12 +142,12 @@ class Decode( Validator ):
 
     def on_value( self, context, value ):
         if not hasattr( value,'decode') or not hasattr( value.decode,'__call__' ):
-            raise Invalid( value, self, 'type', format=self.format )
+            return Invalid( value, self, 'type', format=self.format )
 
         try:
             value = value.decode( self.format )
         except ValueError:
-            raise Invalid( value, self, format=self.format )
+            return Invalid( value, self, format=self.format )
 
         return value
 
@@ -170,10 +172,10 @@ class Insert( Validator ):
                 where = self.where
             return value[0:where] + self.what + value[where:None]
 
-        raise Invalid( value, self,'type' )
+        return Invalid( value, self,'type' )
 
 class UpdateValue( ValidatorBase ):
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         context.value = value
         return value
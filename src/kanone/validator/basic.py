@@ -1,4 +1,5 @@
-from .core import Validator, validator2parameter, messages
+from .core import ValidatorBase, Validator, validator2parameter, messages
+from .dateformat import parser as _dateParser
 
 from ..error import Invalid
 
@@ -19,10 +20,13 @@ class TypeValidator( Validator ):
 
     @classmethod
     def convert( cls, *args, **kwargs ):
-        if not cls.converter:
+        # per class, not inherited - Integer.convert() is no converter for
+        # subclasses of Integer
+        converter = cls.__dict__.get( 'converter', None )
+        if converter is None:
             kwargs['convert'] = True
-            cls.converter = cls( *args, **kwargs )
-        return cls.converter
+            converter = cls.converter = cls( *args, **kwargs )
+        return converter
 
 @messages\
     ( type="Invalid type (%(value.type)s), must be a dictionary"
@@ -34,11 +38,11 @@ class Dict( TypeValidator ):
 
         if not isinstance(value, dict):
             if  not self._convert:
-                raise Invalid( value, self, 'type' )
+                return Invalid( value, self, 'type' )
             try:
                 value = dict(value)
             except (ValueError,TypeError):
-                raise Invalid( value, self,'convert')
+                return Invalid( value, self,'convert')
 
         if len( value ) == 0:
             return self.on_blank( context, value )
@@ -57,12 +61,12 @@ class List( TypeValidator ):
 
         if not isinstance(value, list):
             if not self._convert:
-                raise Invalid( value, self,'type' )
+                return Invalid( value, self,'type' )
 
             try:
                 value = list(value)
             except (ValueError,TypeError):
-                raise Invalid( value, self,'convert' )
+                return Invalid( value, self,'convert' )
 
         if len( value ) == 0:
             return self.on_blank( context, value )
@@ -81,18 +85,18 @@ class Boolean( TypeValidator):
     def on_value(self, context, value):
         if not (isinstance( value, bool )):
             if not self._convert:
-                raise Invalid( value, self, 'type' )
+                return Invalid( value, self, 'type' )
             else:
                 try:
                     value = str(value).lower()
                 except Exception as e:
-                    raise Invalid( value, self, 'convert' )
+                    return Invalid( value, self, 'convert' )
                 if value in ('1', 'true', 'yes', 'on'):
                     value = True
                 elif value in ('0', 'false', 'no', 'off'):
                     value = False
                 else:
-                    raise Invalid( value, self, 'convert' )
+                    return Invalid( value, self, 'convert' )
         return value
 
 @messages\
@@ -107,24 +111,24 @@ class String( TypeValidator ):
     def on_value_py2( self, context, value ):
         if not isinstance( value, basestring):
             if not self._convert:
-                raise Invalid( value, self, 'type' )
+                return Invalid( value, self, 'type' )
             else:
                 try:
                     value = value.__str__()
                 except AttributeError:
-                    raise Invalid( value, self, 'convert' )
+                    return Invalid( value, self, 'convert' )
 
         return value
 
     def on_value(self, context, value):
         if not isinstance( value, str):
             if not self._convert:
-                raise Invalid( value, self, 'type' )
+                return Invalid( value, self, 'type' )
             else:
                 try:
                     value = value.__str__()
                 except AttributeError:
-                    raise Invalid( value, self, 'convert' )
+                    return Invalid( value, self, 'convert' )
 
 
         return value
@@ -141,11 +145,11 @@ class Integer( TypeValidator ):
     def on_value(self, context, value):
         if not isinstance( value, int ) and not isinstance( value, int):
             if not self._convert:
-                raise Invalid( value, self,'type' )
+                return Invalid( value, self,'type' )
             try:
                 value = int(value)
             except (TypeError, ValueError):
-                raise Invalid( value, self,'convert' )
+                return Invalid( value, self,'convert' )
 
         return value
 
@@ -158,11 +162,11 @@ class Float( TypeValidator ):
     def on_value(self, context, value):
         if not isinstance(value,float):
             if not self._convert:
-                raise Invalid( value, self,'type')
+                return Invalid( value, self,'type')
             try:
                 value = float(value)
             except (TypeError, ValueError):
-                raise Invalid( value, self,'convert' )
+                return Invalid( value, self,'convert' )
 
         return value
 
@@ -171,21 +175,34 @@ class Float( TypeValidator ):
     , convert='Could not convert "%(value)s"(%(value.type)s) to a date'
     )
 class Date( Validator ):
+    """
+    formatter is a strptime format or a list of them, the first one taking
+    the value is used.
+    """
 
     def setParameters( self, formatter="%Y-%m-%d", convert=False ):
         self._convert = convert
-        validator2parameter(self, 'formatter', formatter)
+        self._parse = None
+        if isinstance( formatter, ValidatorBase ):
+            validator2parameter(self, 'formatter', formatter)
+        else:
+            self._parse = _dateParser( formatter, True )
 
     def on_value(self, context, value ):
 
         if not isinstance( value, date):
             if not self._convert:
-                raise Invalid( value, self, 'type' )
+                return Invalid( value, self, 'type' )
+            elif self._parse is not None:
+                result = self._parse( value )
+                if result is None:
+                    return Invalid( value, self, 'convert' )
+                return result
             else:
                 try:
                     return datetime.strptime( value, context.params.formatter ).date()
                 except ValueError:
-                    raise Invalid( value, self, 'convert' )
+                    return Invalid( value, self, 'convert' )
             
         return value
 
@@ -199,21 +216,34 @@ class Date( Validator ):
     , convert='Could not convert "%(value)s"(%(value.type)s) to a datetime'
     )
 class DateTime( Validator ):
+    """
+    formatter is a strptime format or a list of them, the first one taking
+    the value is used.
+    """
 
     def setParameters( self, formatter="%Y-%m-%d", convert=False ):
         self._convert = convert
-        validator2parameter(self, 'formatter', formatter)
+        self._parse = None
+        if isinstance( formatter, ValidatorBase ):
+            validator2parameter(self, 'formatter', formatter)
+        else:
+            self._parse = _dateParser( formatter, False )
 
     def on_value(self, context, value ):
 
         if not isinstance( value, datetime):
             if not self._convert:
-                raise Invalid( value, self, 'type' )
+                return Invalid( value, self, 'type' )
+            elif self._parse is not None:
+                result = self._parse( value )
+                if result is None:
+                    return Invalid( value, self, 'convert' )
+                return result
             else:
                 try:
                     return datetime.strptime( value, context.params.formatter )
                 except ValueError:
-                    raise Invalid( value, self, 'convert' )
+                    return Invalid( value, self, 'convert' )
             
         return value
 
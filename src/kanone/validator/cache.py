@@ -20,7 +20,7 @@ class Set( CacheBase ):
         self.key = key
         self.value = value
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
 
         cache = self.getCache( context )
         val = value
@@ -31,14 +31,18 @@ class Set( CacheBase ):
         return value
 
 class Get( CacheBase ):
+
+    # reads what was set before, see kanone.validator.memoize
+    __pure__ = False
+
     def __init__( self, key ):
         self.key = key
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         cache = self.getCache( context )
         result = cache.get(self.key, MISSING)
         if result is MISSING:
-            raise Invalid( value, self )
+            return Invalid( value, self )
 
         return result
 
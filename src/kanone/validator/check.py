@@ -1,11 +1,13 @@
 from ..lib import PASS, MISSING
 from ..error import Invalid
 
-from .core import Validator, ValidatorBase, messages
+from .core import Validator, ValidatorBase, Compiled, messages, _compiledCopy
 
 from copy import copy
+from functools import partial as _partial
 
 import logging, sys
+import bisect as _bisect, mmap as _mmap, operator as _operator, os as _os
 
 _python3 = sys.version_info[0]>=3
 
@@ -21,7 +23,7 @@ class Missing( Validator ):
         self.default = default
 
     def on_value( self, context, value ):
-        raise Invalid( value, self )
+        return Invalid( value, self )
 
     def on_missing( self, context ):
         if self.default is PASS:
@@ -59,7 +61,7 @@ class Blank( Validator ):
             if n is MISSING:
                 return copy(self.default)
 
-        raise Invalid( value, self )
+        return Invalid( value, self )
 
     def on_blank( self, context, value ):
         if self.default is PASS:
@@ -94,23 +96,40 @@ class Match( Validator ):
         self.ignoreCase = ignoreCase
         self.criterion = criterion
 
+    # the type is compared by identity, unpickled it is a copy
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        for matchType in ( Match.RAW, Match.REGEX, Match.VALIDATOR ):
+            if self.type == matchType:
+                self.type = matchType
+
     def appendSubValidators( self, subValidators ):
         if self.type == Match.VALIDATOR:
             self.criterion.appendSubValidators( subValidators )
             subValidators.append( self.criterion )
 
+    def _compile( self, tags, opaque ):
+        if self.type is not Match.VALIDATOR:
+            return self._compileDispatch()
+
+        compiled = copy( self )
+        compiled.criterion = Compiled\
+            ( self.criterion
+            , self.criterion._compile( tags, opaque )
+            )
+        return _compiledCopy( self, compiled, compiled._compileDispatch() )
+
     def on_value(self, context, value ):
         if self.type is Match.REGEX:
             if _python3 and isinstance( value, bytes):
                 value = value.decode('utf8')
             if not self.criterion.match(value):
-                raise Invalid( value, self, matchType=self.type, criterion=self.criterion.pattern)
+                return Invalid( value, self, matchType=self.type, criterion=self.criterion.pattern)
             return value
         elif self.type is Match.VALIDATOR:
-            try:
-                compare = self.criterion.validate( context, value )
-            except Invalid as e:
-                raise Invalid( value, self, matchType=self.type, criterion=e )
+            compare = self.criterion.check( context, value )
+            if isinstance( compare, Invalid ):
+                return Invalid( value, self, matchType=self.type, criterion=compare )
         else:
             compare = self.criterion
 
@@ -120,7 +139,7 @@ class Match( Validator ):
             val = str(value).lower()
 
         if val != compare:
-            raise Invalid( value, self, matchType=self.type, criterion=compare )
+            return Invalid( value, self, matchType=self.type, criterion=compare )
 
         return value
 
@@ -151,12 +170,12 @@ class Len( Validator ):
         try:
             result = len(value)
         except Exception:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
 
         if result<self.min:
-            raise Invalid( value, self, 'min', min=self.min, max=self.max, len=result)
+            return Invalid( value, self, 'min', min=self.min, max=self.max, len=result)
         if self.max is not None and result > self.max:
-            raise Invalid( value, self, 'max', min=self.min, max=self.max, len=result)
+            return Invalid( value, self, 'max', min=self.min, max=self.max, len=result)
 
         if self.returnLen:
             return result
@@ -167,17 +186,187 @@ class Len( Validator ):
     ( fail="Value must be one of %(criteria)s"
     )
 class In( Validator ):
+    """
+    In( criteria )
+
+    Lists and tuples are indexed when In is built, so later changes to them
+    are not seen. Use SortedCriteria or MappedCriteria for huge criteria.
+    """
 
     def setParameters( self, criteria ):
         self.criteria = criteria
+        self._contains = _membership( criteria )
+
+    # the index is built again when unpickled
+    def __getstate__( self ):
+        state = dict( self.__dict__ )
+        del state['_contains']
+        return state
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        self._contains = _membership( self.criteria )
 
     def on_value(self, context, value):
-        if not value in self.criteria:
-            raise Invalid( value, self, criteria=self.criteria )
+        if not self._contains( value ):
+            return Invalid( value, self, criteria=self.criteria )
 
         return value
 
 
+# returns a function telling whether a value is in criteria
+def _membership( criteria ):
+    if not ( isinstance( criteria, list ) or isinstance( criteria, tuple ) ):
+        return _partial( _operator.contains, criteria )
+
+    unhashable = []
+    try:
+        index = frozenset( criteria )
+    except TypeError:
+        hashable = []
+        for item in criteria:
+            try:
+                hash( item )
+            except TypeError:
+                unhashable.append( item )
+            else:
+                hashable.append( item )
+        index = frozenset( hashable )
+
+    def contains( value ):
+        try:
+            if value in index:
+                return True
+        except TypeError:
+            # unhashable values are compared one by one
+            return value in criteria
+
+        return bool( unhashable ) and value in unhashable
+
+    return contains
+
+
+class SortedCriteria( object ):
+    """
+    SortedCriteria( values )
+
+    Criteria for In kept as a sorted tuple and searched by bisection, which
+    takes less memory than the hashed index of a list. The values have to
+    be comparable with each other, other values are never in it.
+    """
+
+    def __init__( self, values ):
+        self._values = tuple( sorted( set( values ) ) )
+
+    def __contains__( self, value ):
+        values = self._values
+        try:
+            pos = _bisect.bisect_left( values, value )
+        except TypeError:
+            return False
+        return pos < len( values ) and values[ pos ] == value
+
+    def __len__( self ):
+        return len( self._values )
+
+    def __iter__( self ):
+        return iter( self._values )
+
+    def __repr__( self ):
+        return 'SortedCriteria(%i values)' % len( self._values )
+
+
+class MappedCriteria( object ):
+    """
+    MappedCriteria( path )
+
+    String criteria for In read from a file of sorted utf8 lines, as
+    written by MappedCriteria.write( path, values ). The file is memory
+    mapped and searched by bisection, so processes using the same file share
+    one copy. Pickling only keeps the path.
+    """
+
+    def __init__( self, path ):
+        self.path = path
+        self._data = None
+
+    @classmethod
+    def write( cls, path, values ):
+        lines = set()
+        for value in values:
+            line = value.encode( 'utf8' )
+            if b'\n' in line:
+                raise ValueError( 'MappedCriteria values cannot contain line breaks: %r' % value )
+            lines.add( line )
+
+        tmpPath = path + '.tmp'
+        with open( tmpPath, 'wb' ) as f:
+            for line in sorted( lines ):
+                f.write( line + b'\n' )
+        _os.replace( tmpPath, path )
+
+        return cls( path )
+
+    def _map( self ):
+        data = self._data
+        if data is None:
+            with open( self.path, 'rb' ) as f:
+                if _os.fstat( f.fileno() ).st_size:
+                    data = _mmap.mmap( f.fileno(), 0, access=_mmap.ACCESS_READ )
+                else:
+                    data = b''
+            self._data = data
+        return data
+
+    def __contains__( self, value ):
+        if not isinstance( value, str ):
+            return False
+        key = value.encode( 'utf8' )
+        if b'\n' in key:
+            return False
+
+        data = self._map()
+        # lo and hi are line starts
+        lo = 0
+        hi = len( data )
+        while lo < hi:
+            mid = ( lo + hi ) // 2
+            start = data.rfind( b'\n', lo, mid ) + 1 or lo
+            end = data.find( b'\n', start, hi )
+            line = data[ start:end ]
+            if line == key:
+                return True
+            elif line < key:
+                lo = end + 1
+            else:
+                hi = start
+
+        return False
+
+    def __len__( self ):
+        data = self._map()
+        count = 0
+        pos = data.find( b'\n' )
+        while pos >= 0:
+            count += 1
+            pos = data.find( b'\n', pos + 1 )
+        return count
+
+    def __iter__( self ):
+        for line in bytes( self._map() ).splitlines():
+            yield line.decode( 'utf8' )
+
+    def __getstate__( self ):
+        return { 'path': self.path }
+
+    def __setstate__( self, state ):
+        self.path = state[ 'path' ]
+        self._data = None
+
+    def __repr__( self ):
+        return 'MappedCriteria(%r)' % self.path
+
+
 @messages\
     ( fail="Value must lower or equal to %(max)s"
     )
@@ -188,7 +377,7 @@ class Max( Validator ):
 
     def on_value(self, context, value):
         if value > self.max:
-            raise Invalid( value, self, max=self.max )
+            return Invalid( value, self, max=self.max )
 
         return value
 
@@ -204,7 +393,7 @@ class Min( Validator ):
 
     def on_value(self, context, value):
         if value < self.min:
-            raise Invalid( value, self, min=self.min )
+            return Invalid( value, self, min=self.min )
 
         return value
 
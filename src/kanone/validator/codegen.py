@@ -0,0 +1,182 @@
+"""
+Generated validation functions for Schema( ..., codegen=True ).
+
+The field loop of Schema is unrolled into a function made for the
+schema's index, validators, allowExtraFields and returnList, so keys,
+validators and settings are resolved while generating instead of on every
+validation. Results and errors are the same as with the regular loop.
+"""
+
+from ..lib import MISSING
+from ..error import Invalid
+from .core import Tag
+
+
+def generate( schema ):
+    """ returns a function( context, value ) doing what schema.on_value does """
+    if schema.createContextChildren:
+        lines = _childrenLines( schema )
+    else:
+        lines = _sharedLines( schema )
+
+    namespace =\
+        { 'MISSING': MISSING
+        , 'Invalid': Invalid
+        , 'schema': schema
+        , 'extraKeys': schema._extraKeys
+        }
+
+    for ( pos, key ) in enumerate( schema.index ):
+        validator = schema.validators[ key ]
+        namespace[ 'k%i' % pos ] = key
+        namespace[ 'v%i' % pos ] = validator
+        namespace[ 'c%i' % pos ] = _check( validator )
+
+    index = schema.index
+    namespace[ 'indexFunc' ] = lambda pos: index[ pos ]
+    namespace[ 'pool' ] = schema._pool
+    namespace[ 'presolveFields' ] = schema._presolveFields
+    if schema._pool is not None:
+        from .parallel import applyUpdates
+        namespace[ 'applyUpdates' ] = applyUpdates
+
+    source = '\n'.join( lines ) + '\n'
+    filename = '<kanone codegen %s>' % schema.__class__.__name__
+    exec( compile( source, filename, 'exec' ), namespace )
+
+    on_value = namespace[ 'on_value' ]
+    on_value.__source__ = source
+    return on_value
+
+
+# the compiled plan of validator, unless it depends on the tags of an
+# enclosing Compose
+def _check( validator ):
+    subValidators = [ validator ]
+    validator.appendSubValidators( subValidators )
+    for subValidator in subValidators:
+        if isinstance( subValidator, Tag ):
+            return validator.check
+
+    opaque = []
+    check = validator._compile( {}, opaque )
+    if opaque:
+        return validator.check
+    return check
+
+def _result( schema, key ):
+    count = len( schema.index )
+    if schema.returnList:
+        return '[ %s ]' % ', '.join( 'r%i' % pos for pos in range( count ) )
+    return '{ %s }' % ', '.join( ( key + ': r%i' ) % ( pos, pos ) for pos in range( count ) )
+
+def _extraInvalid( indent ):
+    return\
+        [ indent + 'if extraFields:'
+        , indent + "    return Invalid( value, schema, 'extraFields', extraFields=extraFields )"
+        ]
+
+# like Schema._on_value, the fields share the context
+def _sharedLines( schema ):
+    count = len( schema.index )
+    lines =\
+        [ 'def on_value( context, value ):'
+        , '    if not ( isinstance( value, list ) or isinstance( value, tuple ) or isinstance( value, set ) ):'
+        , '        if not isinstance( value, dict ):'
+        , "            return Invalid( value, schema, 'type' )"
+        , '        get = value.get'
+        ]
+
+    for pos in range( count ):
+        lines +=\
+            [ '        r%i = c%i( context, get( k%i, MISSING ) )' % ( pos, pos, pos )
+            , '        if isinstance( r%i, Invalid ):' % pos
+            , '            return r%i' % pos
+            ]
+
+    if not schema.allowExtraFields:
+        lines.append( '        extraFields = extraKeys( value )' )
+        lines += _extraInvalid( '        ' )
+
+    lines +=\
+        [ '        return ' + _result( schema, 'k%i' )
+        , '    numValues = len( value )'
+        ]
+
+    for pos in range( count ):
+        lines +=\
+            [ '    r%i = c%i( context, value[ %i ] if numValues > %i else MISSING )' % ( pos, pos, pos, pos )
+            , '    if isinstance( r%i, Invalid ):' % pos
+            , '        return r%i' % pos
+            ]
+
+    if not schema.allowExtraFields:
+        # the fields missing in value count as well
+        lines.append( '    extraFields = abs( numValues - %i )' % count )
+        lines += _extraInvalid( '    ' )
+
+    lines.append( '    return ' + _result( schema, 'k%i' ) )
+    return lines
+
+# like Schema._createContextChildren_on_value
+def _childrenLines( schema ):
+    count = len( schema.index )
+    lines =\
+        [ 'def on_value( context, value ):'
+        , '    isList = isinstance( value, list ) or isinstance( value, tuple ) or isinstance( value, set )'
+        , '    if not isList and not isinstance( value, dict ):'
+        , "        return Invalid( value, schema, 'type' )"
+        , '    if isList:'
+        , '        numValues = len( value )'
+        ]
+
+    for pos in range( count ):
+        lines +=\
+            [ '        x%i = context( k%i )' % ( pos, pos )
+            , '        x%i.validator = v%i' % ( pos, pos )
+            , '        x%i.__value__ = value[ %i ] if numValues > %i else MISSING' % ( pos, pos, pos )
+            ]
+
+    if not schema.allowExtraFields:
+        lines.append( '        extraFields = max( numValues - %i, 0 )' % count )
+
+    lines +=\
+        [ '    else:'
+        , '        get = value.get'
+        ]
+
+    for pos in range( count ):
+        lines +=\
+            [ '        x%i = context( k%i )' % ( pos, pos )
+            , '        x%i.validator = v%i' % ( pos, pos )
+            , '        x%i.__value__ = get( k%i, MISSING )' % ( pos, pos )
+            ]
+
+    if not schema.allowExtraFields:
+        lines.append( '        extraFields = extraKeys( value )' )
+        lines += _extraInvalid( '    ' )
+
+    lines.append( '    context.setIndexFunc( indexFunc )' )
+
+    if schema._pool is not None:
+        lines +=\
+            [ '    updates = None'
+            , '    if pool.accepts( context ):'
+            , '        updates = presolveFields( context, pool )'
+            ]
+
+    # fields referenced by siblings first
+    for pos in schema._fieldOrder or range( count ):
+        if schema._pool is not None:
+            # made in the pool, in order with the other fields
+            lines.append( '    if updates and %i in updates: applyUpdates( x%i, updates[ %i ] )' % ( pos, pos, pos ) )
+        lines.append( '    r%i = x%i.check()' % ( pos, pos ) )
+
+    results = ', '.join( 'r%i' % pos for pos in range( count ) )
+    lines +=\
+        [ '    errors = [ res.context.key for res in ( %s, ) if isinstance( res, Invalid ) ]' % results
+        , '    if errors:'
+        , '        return Invalid( value, schema, errors=errors )'
+        , '    return ' + _result( schema, 'x%i.key' )
+        ]
+    return lines
@@ -2,7 +2,7 @@ from ..lib import Context as __Context__, MISSING, PASS, inherit, Parameterized
 from ..error import Invalid
 
 import logging
-from functools import reduce
+from copy import copy
 
 log = logging.getLogger(__name__)
 
@@ -24,23 +24,17 @@ def validator2parameter( hostValidator, name, param, force=False ):
     if not paramWrapper:
         class ParamWrapper:
             def __init__( self, context, value ):
-                self.__context = context
-                self.__value = value
+                self._context = context
+                self._value = value
 
         hostValidator.__paramWrapper__ =\
             paramWrapper =\
             ParamWrapper
-
-        validate = hostValidator.validate
-        def wrapped( context, value ):
-            context.params = paramWrapper( context, value )
-            return validate( context, value )
-
-        hostValidator.validate = wrapped
+        hostValidator.__paramValidators__ = []
 
     if isinstance(param, ValidatorBase ):
         hostValidator.__paramValidators__.append( param )
-        prop = property(lambda self: param.validate( self.__context, self.__value ))
+        prop = property(lambda self: param.validate( self._context, self._value ))
     else:
         if force:
             raise SyntaxError('Parameter has to be a validator')
@@ -50,6 +44,8 @@ def validator2parameter( hostValidator, name, param, force=False ):
 
 
 # validators without messages and changeable parameters should derive from this
+# subclasses implement either validate, raising Invalid, or check, returning
+# Invalid - the other one is derived from it
 class ValidatorBase(object):
 
     def __new__( cls, *args, **kwargs ):
@@ -66,6 +62,18 @@ class ValidatorBase(object):
 
         return self
 
+    def validate( self, context, value ):
+        result = self.check( context, value )
+        if isinstance( result, Invalid ):
+            raise result
+        return result
+
+    def check( self, context, value ):
+        try:
+            return self.validate( context, value )
+        except Invalid as e:
+            return e
+
     def appendSubValidators( self, subValidators ):
         pass
 
@@ -88,10 +96,105 @@ class ValidatorBase(object):
     def context( self, value=MISSING ):
         return __Context__( self, value )
 
+    def validateMany( self, values, errorFormatter=None ):
+        """
+        validates each of values, yielding ( index, result ) for every one.
+        result is an Invalid instance if the value is invalid.
+        A single context is reset for every value instead of building a new
+        tree, so read what you need from error.context before advancing.
+        """
+        context = None
+
+        for index, value in enumerate( values ):
+            if context is None:
+                context = self.context( value )
+                if errorFormatter is not None:
+                    context.errorFormatter = errorFormatter
+            else:
+                context.reset( value )
+
+            yield index, context.check()
+
+    def compile( self ):
+        """
+        returns a Compiled validator, which behaves like this one but
+        runs a flat plan of pre-bound functions, with tags, Compose bindings
+        and method dispatch resolved once.
+        Compile finished validators only - later changes to the graph are
+        not reflected by the plan.
+        """
+        return Compiled( self )
+
+    def memoize( self, maxsize=1024, ttl=None ):
+        """
+        returns a Memoize validator, which caches the outcomes of this
+        one per input value. See kanone.validator.memoize.
+        """
+        from .memoize import Memoize
+        return Memoize( self, maxsize, ttl )
+
+    # returns a function( context, value ) doing the same as self.check
+    # tags are the tagged validators of the enclosing Compose, validators
+    # which cannot be compiled but might contain tags are added to opaque
+    def _compile( self, tags, opaque ):
+        subValidators = []
+        self.appendSubValidators( subValidators )
+        if subValidators:
+            opaque.append( self )
+        return self.check
+
     # just a passthrough for convinience
     def __call__( self ):
         return self
 
+
+class Compiled( ValidatorBase ):
+
+    def __init__( self, validator, check=None ):
+        self.validator = validator
+        if check is None:
+            check = validator._compile( {}, [] )
+        self.check = check
+
+    def _compile( self, tags, opaque ):
+        return self.check
+
+    def compile( self ):
+        return self
+
+
+def _passthrough( context, value ):
+    return value
+
+# errors of a compiled copy of a validator have to look like errors
+# of the original one, since tags identify their errors by the validator
+def _compiledCopy( validator, compiled, check ):
+    def copyCheck( context, value ):
+        result = check( context, value )
+        if isinstance( result, Invalid )\
+        and getattr( result, 'validator', None) is compiled:
+            result.validator = validator
+        return result
+
+    return copyCheck
+
+# variants kept per validator, all are dropped when full
+_maxVariants = 256
+
+# a hashable form of variant arguments, raises TypeError if there is none
+def _frozen( value ):
+    if isinstance( value, dict ):
+        return ( dict, tuple( sorted( ( key, _frozen( item ) ) for ( key, item ) in value.items() ) ) )
+    elif isinstance( value, list ) or isinstance( value, tuple ):
+        return ( value.__class__, tuple( _frozen( item ) for item in value ) )
+    elif isinstance( value, set ) or isinstance( value, frozenset ):
+        return ( value.__class__, frozenset( _frozen( item ) for item in value ) )
+
+    hash( value )
+    # 1, 1.0 and True are different arguments
+    return ( value.__class__, value )
+
+
 @messages\
     ( fail='Validation failed'
     , missing= 'Please provide a value'
@@ -102,30 +205,119 @@ class ValidatorBase(object):
     )
 class Validator( Parameterized, ValidatorBase ):
 
+    __paramWrapper__ = None
+
     def __init__( self, *args, **kwargs ):
         Parameterized.__init__( self, *args, **kwargs )
 
     def validate( self, context, value ):
-        if value is MISSING:
-            return self.on_missing( context )
-        elif value is None or (value == ''):
-            return self.on_blank( context, value )
+        if self.__class__.validate is Validator.validate:
+            result = self.check( context, value )
+        else:
+            # called by an overriding validate
+            result = self._dispatch( context, value )
+
+        if isinstance( result, Invalid ):
+            raise result
+        return result
 
-        return self.on_value( context, value )
+    def check( self, context, value ):
+        if self.__class__.validate is not Validator.validate:
+            return ValidatorBase.check( self, context, value )
+
+        return self._dispatch( context, value )
+
+    def _dispatch( self, context, value ):
+        if self.__paramWrapper__ is not None:
+            context.params = self.__paramWrapper__( context, value )
+
+        try:
+            if value is MISSING:
+                return self.on_missing( context )
+            elif value is None or (value == ''):
+                return self.on_blank( context, value )
+
+            return self.on_value( context, value )
+        except Invalid as e:
+            return e
 
     def messages( self, **messages):
         self.__messages__ = dict( self.__messages__ )
         self.__messages__.update( messages )
+        self.forgetVariants()
         return self
 
+    def variant( self, messages=None, **kwargs ):
+        """
+        returns self( **kwargs ).messages( **messages ), built once for the
+        same arguments and shared afterwards, so do not change a variant.
+        Variants are built again after messages(), paramAlias(),
+        messageAlias() or fastPath() was called on this validator, call
+        forgetVariants() if you change it another way.
+        """
+        try:
+            key = _frozen( ( kwargs, messages ) )
+        except TypeError:
+            key = None
+
+        variants = self.__dict__.get( '_variants' )
+        if key is not None and variants is not None:
+            found = variants.get( key )
+            if found is not None:
+                return found
+
+        found = self( **kwargs )
+        if messages:
+            found.messages( **messages )
+
+        if key is not None:
+            if variants is None:
+                variants = self._variants = {}
+            elif len( variants ) >= _maxVariants:
+                variants.clear()
+            variants[ key ] = found
+
+        return found
+
+    def forgetVariants( self ):
+        self.__dict__.pop( '_variants', None )
+
+    def _compile( self, tags, opaque ):
+        ValidatorBase._compile( self, tags, opaque )
+        return self._compileDispatch()
+
+    def _compileDispatch( self ):
+        klass = self.__class__
+        if klass.validate is not Validator.validate\
+        or klass.check is not Validator.check\
+        or self.__paramWrapper__ is not None:
+            return self.check
+
+        on_value = self.on_value
+        on_missing = self.on_missing
+        on_blank = self.on_blank
+
+        def check( context, value ):
+            try:
+                if value is MISSING:
+                    return on_missing( context )
+                elif value is None or (value == ''):
+                    return on_blank( context, value )
+
+                return on_value( context, value )
+            except Invalid as e:
+                return e
+
+        return check
+
     def on_value( self, context, value ):
         return value
 
     def on_missing(self, context):
-        raise Invalid( '', self, 'missing' )
+        return Invalid( '', self, 'missing' )
 
     def on_blank(self, context, value ):
-        raise Invalid( value, self, 'blank' )
+        return Invalid( value, self, 'blank' )
 
 
 class Tag( ValidatorBase ):
@@ -146,7 +338,7 @@ class Tag( ValidatorBase ):
         self.validator.appendSubValidators( subValidators )
         subValidators.append( self.validator )
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         validator = context.root.taggedValidators.get(self.tagID, None)
         if validator is None:
             validator = self.enabled and self.validator
@@ -154,12 +346,39 @@ class Tag( ValidatorBase ):
         if not validator:
             return value
 
-        try:
-            return validator.validate( context, value )
-        except Invalid as e:
-            if e.validator is validator or getattr(e,'composer',None) is validator:
-                e.tagName = self.tagName
-            raise e
+        result = validator.check( context, value )
+        if isinstance( result, Invalid ):
+            _tagError( result, validator, self.tagName )
+        return result
+
+    def _compile( self, tags, opaque ):
+        validator = tags.get( self.tagID, None )
+        if validator is None:
+            validator = self.enabled and self.validator
+
+        if not validator:
+            return _passthrough
+
+        check = validator._compile( tags, opaque )
+        tagName = self.tagName
+
+        def tagCheck( context, value ):
+            result = check( context, value )
+            if isinstance( result, Invalid ):
+                _tagError( result, validator, tagName )
+            return result
+
+        return tagCheck
+
+def _tagError( e, validator, tagName ):
+    if e.validator is validator or getattr(e,'composer',None) is validator:
+        e.tagName = tagName
+
+def _composeError( e, composer ):
+    if hasattr(e,'tagName'):
+        e.realkey = "%s_%s" % (e.tagName, getattr(e,'realkey',e.key))
+        e.composer = composer
+        del e.tagName
 
 def _setParsedKeywordArg( tagKwargs, key, value ):
     tagPath = key.split('_',1)
@@ -207,6 +426,7 @@ def _parseTaggedKeywords( kwargs, alias ):
     , 'taggedValidators'
     , 'currentTaggedValidators'
     , 'validator'
+    , '__fastPath__'
     )
 class Compose( Validator ):
 
@@ -227,6 +447,7 @@ class Compose( Validator ):
 
     __paramAlias__ = None
     __messageAlias__ = None
+    __fastPath__ = None
 
     taggedValidators = {}
 
@@ -290,19 +511,94 @@ class Compose( Validator ):
         if notFound:
             raise SyntaxError('setParameters: Tags %s not found' % str(notFound))
 
-    def validate( self, context, value ):
-        tmpTags = context.root.taggedValidators
-        context.root.taggedValidators = self.currentTaggedValidators
+    def check( self, context, value ):
+        fastPath = self._getFastPath()
+        if fastPath is not None:
+            result = fastPath( context, value )
+            if result is not MISSING:
+                return result
+
+        root = context.root
+        tmpTags = root.taggedValidators
+        root.taggedValidators = self.currentTaggedValidators
         try:
-            return self.validator.validate( context, value )
-        except Invalid as e:
-            if hasattr(e,'tagName'):
-                e.realkey = "%s_%s" % (e.tagName, getattr(e,'realkey',e.key))
-                e.composer = self
-                del e.tagName
-            raise e
+            result = self.validator.check( context, value )
         finally:
-            context.root.taggedValidators = tmpTags
+            root.taggedValidators = tmpTags
+
+        if isinstance( result, Invalid ):
+            _composeError( result, self )
+        return result
+
+    def fastPath( self, function ):
+        """
+        function( context, value ) validates the common case for this
+        validator and clones of it with the same parameters ( messages may
+        differ ), doing what the composed validators would do. It returns
+        MISSING for values the composed validators have to handle, e.g.
+        the ones which are invalid.
+        """
+        self.__fastPath__ = ( self, function )
+        self.__dict__.pop( '_fastPathFunction', None )
+        self.forgetVariants()
+        return self
+
+    def _getFastPath( self ):
+        fastPath = self.__fastPath__
+        if fastPath is None:
+            return None
+
+        function = self.__dict__.get( '_fastPathFunction', MISSING )
+        if function is MISSING:
+            ( root, function ) = fastPath
+            if not _sameParameters( self, root ):
+                function = None
+            self._fastPathFunction = function
+        return function
+
+    def _compile( self, tags, opaque ):
+        check = self._compileComposed( tags, opaque )
+
+        fastPath = self._getFastPath()
+        if fastPath is None:
+            return check
+
+        def fastCheck( context, value ):
+            result = fastPath( context, value )
+            if result is MISSING:
+                return check( context, value )
+            return result
+
+        return fastCheck
+
+    def _compileComposed( self, tags, opaque ):
+        currentTaggedValidators = self.currentTaggedValidators
+        innerOpaque = []
+        check = self.validator._compile( currentTaggedValidators, innerOpaque )
+
+        # tags are resolved already, we only have to swap them
+        # for validators we could not compile
+        if innerOpaque:
+            def composeCheck( context, value ):
+                root = context.root
+                tmpTags = root.taggedValidators
+                root.taggedValidators = currentTaggedValidators
+                try:
+                    result = check( context, value )
+                finally:
+                    root.taggedValidators = tmpTags
+
+                if isinstance( result, Invalid ):
+                    _composeError( result, self )
+                return result
+        else:
+            def composeCheck( context, value ):
+                result = check( context, value )
+                if isinstance( result, Invalid ):
+                    _composeError( result, self )
+                return result
+
+        return composeCheck
 
     def messages( self, **kwargs ):
         taggedKwargs = _parseTaggedKeywords( kwargs, self.__messageAlias__ )
@@ -331,17 +627,42 @@ class Compose( Validator ):
         if notFound:
             raise SyntaxError('messages: Tags %s not found' % str(notFound))
 
+        self.forgetVariants()
         return self
 
     def messageAlias( self, **alias ):
         self.__messageAlias__ = alias
+        self.forgetVariants()
         return self
 
     def paramAlias( self, **alias ):
         self.__paramAlias__ = alias
+        self.forgetVariants()
         return self
 
 
+# whether validator is root or a clone of it with the same parameters
+def _sameParameters( validator, root ):
+    if validator is root:
+        return True
+    if validator.__class__ is not root.__class__\
+    or getattr( validator, '__kwargs__', None ) != getattr( root, '__kwargs__', MISSING ):
+        return False
+
+    if isinstance( validator, Compose ):
+        if validator.validator is not root.validator:
+            return False
+        for ( tagID, tagged ) in root.currentTaggedValidators.items():
+            other = validator.currentTaggedValidators.get( tagID, False )
+            if not tagged or not other:
+                if tagged is not other:
+                    return False
+            elif not _sameParameters( other, tagged ):
+                return False
+
+    return True
+
+
 class Tmp( ValidatorBase ):
 
     def __init__( self, validator, raiseError=True ):
@@ -353,15 +674,29 @@ class Tmp( ValidatorBase ):
         self.validator.appendSubValidators( subValidators )
         return subValidators
 
-    def validate( self, context, value ):
-        try:
-            self.validator.validate( context, value )
-        except Invalid:
-            if self.raiseError:
-                raise
+    def check( self, context, value ):
+        result = self.validator.check( context, value )
+        if self.raiseError and isinstance( result, Invalid ):
+            return result
 
         return value
 
+    def _compile( self, tags, opaque ):
+        check = self.validator._compile( tags, opaque )
+
+        if self.raiseError:
+            def tmpCheck( context, value ):
+                result = check( context, value )
+                if isinstance( result, Invalid ):
+                    return result
+                return value
+        else:
+            def tmpCheck( context, value ):
+                check( context, value )
+                return value
+
+        return tmpCheck
+
 @messages\
     ( type='Unsupported type, must be list-like or dict'
     , notFound='Item %(key)s not found'
@@ -383,16 +718,18 @@ class Item( Validator ):
         subValidators.append( self.validator )
         self.validator.appendSubValidators( subValidators )
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         try:
             val = value[ self.key ]
         except TypeError:
-            raise Invalid( value, self, 'type' )
+            return Invalid( value, self, 'type' )
         except (KeyError, IndexError):
-            raise Invalid( value, self, 'notFound', key=self.key )
+            return Invalid( value, self, 'notFound', key=self.key )
         else:
             if self.validator is not None:
-                val = self.validator.validate( context, val )
+                val = self.validator.check( context, val )
+                if isinstance( val, Invalid ):
+                    return val
 
                 if self.alter:
                     value[self.key] = val
@@ -400,6 +737,17 @@ class Item( Validator ):
             else:
                 return val
 
+    def _compile( self, tags, opaque ):
+        if self.validator is None:
+            return self.check
+
+        compiled = copy( self )
+        compiled.validator = Compiled\
+            ( self.validator
+            , self.validator._compile( tags, opaque )
+            )
+        return _compiledCopy( self, compiled, compiled.check )
+
 
 class If( ValidatorBase ):
 
@@ -418,24 +766,37 @@ class If( ValidatorBase ):
             self._else.appendSubValidators( subValidators )
             subValidators.append( self._else )
 
-    def validate( self, context, value ):
-        try:
-            value = self.criterion.validate( context, value )
-        except Invalid:
+    def check( self, context, value ):
+        result = self.criterion.check( context, value )
+        if isinstance( result, Invalid ):
             if not self._else:
-                raise
-            value = self._else.validate( context, value)
-        else:
-            value = self._then.validate( context, value )
+                return result
+            return self._else.check( context, value )
 
-        return value
+        return self._then.check( context, result )
+
+    def _compile( self, tags, opaque ):
+        criterion = self.criterion._compile( tags, opaque )
+        _then = self._then._compile( tags, opaque )
+        _else = self._else and self._else._compile( tags, opaque )
+
+        def ifCheck( context, value ):
+            result = criterion( context, value )
+            if isinstance( result, Invalid ):
+                if not _else:
+                    return result
+                return _else( context, value )
+
+            return _then( context, result )
+
+        return ifCheck
 
 class Pass( Validator ):
 
     def setParameters( self, default=PASS):
         self.default = PASS
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         if self.default is PASS:
             return value
 
@@ -456,14 +817,22 @@ class Not( Validator ):
         self.validator.appendSubValidators( subValidators )
         subValidators.append( self.validator )
 
-    def validate(self, context, value ):
-        try:
-            self.validator.validate\
-                ( context, value )
-        except Invalid:
+    def check(self, context, value ):
+        if isinstance( self.validator.check( context, value ), Invalid ):
             return value
 
-        raise Invalid( value, self )
+        return Invalid( value, self )
+
+    def _compile( self, tags, opaque ):
+        check = self.validator._compile( tags, opaque )
+
+        def notCheck( context, value ):
+            if isinstance( check( context, value ), Invalid ):
+                return value
+
+            return Invalid( value, self )
+
+        return notCheck
 
 
 class And( ValidatorBase ):
@@ -472,14 +841,33 @@ class And( ValidatorBase ):
         assert len(validators)>=2
         self.validators = list(validators)
 
-    def validate( self, context, value ):
-        return reduce( lambda val, validator: validator.validate(context, val), self.validators, value)
+    def check( self, context, value ):
+        for validator in self.validators:
+            value = validator.check( context, value )
+            if isinstance( value, Invalid ):
+                break
+        return value
 
     def appendSubValidators( self, subValidators):
         for validator in self.validators:
             validator.appendSubValidators( subValidators )
             subValidators.append( validator )
 
+    def _compile( self, tags, opaque ):
+        validators = tuple\
+            ( validator._compile( tags, opaque )
+                for validator in self.validators
+            )
+
+        def andCheck( context, value ):
+            for check in validators:
+                value = check( context, value )
+                if isinstance( value, Invalid ):
+                    break
+            return value
+
+        return andCheck
+
     def __and__( self, other ):
         return And(*self.validators+[other])
 
@@ -494,32 +882,48 @@ class Or( ValidatorBase ):
             validator.appendSubValidators( subValidators )
             subValidators.append( validator )
 
-    def validate(self, context, value):
-        lastError = None
-
+    def check(self, context, value):
         for validator in self.validators:
-            try:
-                return validator.validate( context, value )
-            except Invalid as e:
-                lastError = e
+            result = validator.check( context, value )
+            if not isinstance( result, Invalid ):
+                break
 
-        if lastError is not None:
-            raise lastError
+        return result
 
-        return value
+    def _compile( self, tags, opaque ):
+        validators = tuple\
+            ( validator._compile( tags, opaque )
+                for validator in self.validators
+            )
+
+        def orCheck( context, value ):
+            for check in validators:
+                result = check( context, value )
+                if not isinstance( result, Invalid ):
+                    break
+
+            return result
+
+        return orCheck
 
     def __or__( self, other ):
         return Or(*self.validators+[other])
 
 class Call( Validator ):
 
+    # the function might read anything
+    __pure__ = False
+
     def setParameters( self, func ):
         self.__func__ = func
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         try:
-            return self.__func__( context, value )
+            result = self.__func__( context, value )
         except Invalid as e:
-            e.validator = self
-            raise e
+            result = e
+
+        if isinstance( result, Invalid ):
+            result.validator = self
+        return result
 
@@ -0,0 +1,234 @@
+"""
+Parsing of dates and datetimes with a list of strptime formats.
+
+The formats are translated into one regular expression, its alternatives
+are tried in the order of the formats, so a value is matched once instead
+of running strptime and catching its ValueError for every format. The
+result is the one of the first format strptime accepts. Formats using
+directives which are not translated are handed to strptime.
+
+Values like 2020-01-31 are parsed by fromisoformat, if no format before
+'%Y-%m-%d' could take them.
+"""
+
+from datetime import date, datetime
+
+import re
+
+# the patterns strptime uses, with the number of digits they take
+_directives =\
+    { 'd': ( r'3[01]|[12]\d|0[1-9]|[1-9]| [1-9]', 1, 2 )
+    , 'f': ( r'[0-9]{1,6}', 1, 6 )
+    , 'H': ( r'2[0-3]|[0-1]\d|\d', 1, 2 )
+    , 'm': ( r'1[0-2]|0[1-9]|[1-9]', 1, 2 )
+    , 'M': ( r'[0-5]\d|\d', 1, 2 )
+    , 'S': ( r'6[0-1]|[0-5]\d|\d', 1, 2 )
+    , 'y': ( r'\d\d', 2, 2 )
+    , 'Y': ( r'\d\d\d\d', 4, 4 )
+    }
+
+_time = frozenset( 'HMSf' )
+
+_iso = '%Y-%m-%d'
+
+_parsers = {}
+
+
+def parser( formats, returnDate ):
+    """ returns a function( value ) returning the date ( or datetime ) of
+    value or None if no format matches """
+    if isinstance( formats, str ):
+        formats = ( formats, )
+    key = ( tuple( formats ), returnDate )
+
+    found = _parsers.get( key )
+    if found is None:
+        found = _parsers[ key ] = DateParser( key[0], returnDate ).parse
+    return found
+
+
+# returns the list of literals and directives of format, None if strptime
+# has to parse it
+def _tokenize( format ):
+    tokens = []
+    directives = set()
+    pos = 0
+    while pos < len( format ):
+        char = format[ pos ]
+        if char != '%':
+            tokens.append( ( False, char ) )
+            pos += 1
+            continue
+
+        directive = format[ pos+1:pos+2 ]
+        if directive == '%':
+            tokens.append( ( False, '%' ) )
+        elif directive in _directives and directive not in directives:
+            directives.add( directive )
+            tokens.append( ( True, directive ) )
+        else:
+            return None
+        pos += 2
+
+    # strptime treats dates without a year differently
+    if not ( 'Y' in directives or 'y' in directives ):
+        return None
+    return tokens
+
+# whether a format might take all of a value like 2020-01-31
+def _takesISO( tokens ):
+    widths = [ 4, 2, 2 ]
+    runs = [ [ 0, 0 ] ]
+    for ( isDirective, token ) in tokens:
+        if isDirective:
+            ( pattern, least, most ) = _directives[ token ]
+            runs[-1][0] += least
+            runs[-1][1] += most
+        elif token == '-':
+            runs.append( [ 0, 0 ] )
+        else:
+            return False
+
+    if len( runs ) != len( widths ):
+        return False
+    for ( ( least, most ), width ) in zip( runs, widths ):
+        if not least <= width <= most:
+            return False
+    return True
+
+
+class DateParser( object ):
+
+    def __init__( self, formats, returnDate ):
+        self.formats = formats
+        self.returnDate = returnDate
+        self.entries = []
+
+        patterns = []
+        for ( pos, format ) in enumerate( formats ):
+            tokens = _tokenize( format )
+            if tokens is None:
+                self.entries.append( None )
+                continue
+
+            prefix = 'f%i' % pos
+            parts = []
+            fields = []
+            for ( isDirective, token ) in tokens:
+                if isDirective:
+                    name = prefix + token
+                    parts.append( '(?P<%s>%s)' % ( name, _directives[ token ][0] ) )
+                    fields.append( ( token, name ) )
+                elif token.isspace():
+                    if parts[-1:] != [ r'\s+' ]:
+                        parts.append( r'\s+' )
+                else:
+                    parts.append( re.escape( token ) )
+
+            pattern = ''.join( parts )
+            patterns.append( '(?P<%s>%s)' % ( prefix, pattern ) )
+            self.entries.append\
+                ( ( re.compile( pattern, re.IGNORECASE )
+                  , fields
+                  , not _time.intersection( token for ( token, name ) in fields )
+                  , tokens
+                  )
+                )
+
+        # one pattern for all formats, if strptime is not needed
+        self.regex = None
+        if None not in self.entries:
+            self.regex = re.compile( '|'.join( patterns ), re.IGNORECASE )
+
+        self.iso = False
+        if _iso in formats:
+            self.iso = True
+            for entry in self.entries[ :formats.index( _iso ) ]:
+                if entry is None or _takesISO( entry[3] ):
+                    self.iso = False
+
+    def parse( self, value ):
+        if value.__class__ is str:
+            if self.iso and len( value ) == 10 and value[4] == '-' and value[7] == '-':
+                try:
+                    if self.returnDate:
+                        return date.fromisoformat( value )
+                    return datetime.fromisoformat( value )
+                except ValueError:
+                    pass
+
+            if self.regex is not None:
+                match = self.regex.match( value )
+                if match is None:
+                    return None
+
+                pos = int( match.lastgroup[1:] )
+                if match.end() == len( value ):
+                    result = self._build( self.entries[ pos ], match )
+                    if result is not None:
+                        return result
+
+                # like strptime, the formats after it are tried
+                return self._parseFrom( value, pos + 1 )
+
+        return self._parseFrom( value, 0 )
+
+    def _parseFrom( self, value, start ):
+        for pos in range( start, len( self.formats ) ):
+            entry = self.entries[ pos ]
+            if entry is None or value.__class__ is not str:
+                try:
+                    result = datetime.strptime( value, self.formats[ pos ] )
+                except ValueError:
+                    continue
+                if self.returnDate:
+                    return result.date()
+                return result
+
+            match = entry[0].match( value )
+            if match is not None and match.end() == len( value ):
+                result = self._build( entry, match )
+                if result is not None:
+                    return result
+
+        return None
+
+    def _build( self, entry, match ):
+        ( regex, fields, dateOnly, tokens ) = entry
+        year = 1900
+        month = day = 1
+        hour = minute = second = microsecond = 0
+
+        for ( directive, name ) in fields:
+            part = match.group( name )
+            if directive == 'Y':
+                year = int( part )
+            elif directive == 'y':
+                year = int( part )
+                if year <= 68:
+                    year += 2000
+                else:
+                    year += 1900
+            elif directive == 'm':
+                month = int( part )
+            elif directive == 'd':
+                day = int( part )
+            elif directive == 'H':
+                hour = int( part )
+            elif directive == 'M':
+                minute = int( part )
+            elif directive == 'S':
+                second = int( part )
+            else:
+                microsecond = int( part + '0' * ( 6 - len( part ) ) )
+
+        try:
+            if dateOnly and self.returnDate:
+                return date( year, month, day )
+            result = datetime( year, month, day, hour, minute, second, microsecond )
+        except ValueError:
+            return None
+
+        if self.returnDate:
+            return result.date()
+        return result
@@ -2,9 +2,11 @@ from .core import ValidatorBase
 
 class Print( ValidatorBase ):
 
+    __pure__ = False
+
     def __init__( self, formatter):
         self.formatter=formatter
 
-    def validate( self, context, value):
+    def check( self, context, value):
         print(( self.formatter % {'value':value} ))
         return value
@@ -0,0 +1,232 @@
+"""
+Memoize( validator ) caches the outcome of validator per input value.
+
+Only validators whose outcome depends on the value alone can be memoized.
+Set __pure__ = False on a validator or its class to say it does not, this
+is done for Call, Field, cache.Get, MXLookup and debug.Print. Schema and
+ForEach creating child contexts are impure as well, and so are tags which
+are not resolved by a Compose inside the memoized validator.
+
+Writes to context.cache ( cache.Set ) and context.value ( UpdateValue )
+are recorded and done again when a cached outcome is used, so cache.Get
+is fine if the key is set inside the memoized validator.
+"""
+
+from ..lib import MISSING
+from ..error import Invalid
+
+from .core import ValidatorBase, Tag, Compose
+from .cache import Get, Set
+
+from collections import OrderedDict
+from copy import copy
+import threading
+import time
+
+__all__ = [ 'Memoize' ]
+
+
+# like appendSubValidators, but also walks into Compose
+def _subValidators( validator ):
+    found = []
+    seen = set()
+    stack = [ validator ]
+    while stack:
+        current = stack.pop()
+        if id( current ) in seen:
+            continue
+        seen.add( id( current ) )
+        found.append( current )
+
+        if isinstance( current, Compose ):
+            stack.append( current.validator )
+            stack.extend( tagged for tagged in current.currentTaggedValidators.values() if tagged )
+        else:
+            subValidators = []
+            current.appendSubValidators( subValidators )
+            stack.extend( subValidators )
+
+    return found
+
+def impurities( validator ):
+    """ returns the validators which keep validator from being memoized """
+    subValidators = _subValidators( validator )
+
+    tagIDs = set()
+    setKeys = set()
+    for subValidator in subValidators:
+        if isinstance( subValidator, Compose ):
+            for ids in subValidator.tagIDs.values():
+                tagIDs.update( ids )
+        elif isinstance( subValidator, Set ):
+            setKeys.add( subValidator.key )
+
+    found = []
+    for subValidator in subValidators:
+        if isinstance( subValidator, Get ):
+            if subValidator.key in setKeys:
+                continue
+        elif isinstance( subValidator, Tag ):
+            if subValidator.tagID in tagIDs:
+                continue
+        elif getattr( subValidator, '__pure__', True ):
+            continue
+
+        if subValidator not in found:
+            found.append( subValidator )
+
+    return found
+
+# errors get the context and message set by the context they end up in,
+# cached ones are handed out as fresh copies
+def _copyInvalid( invalid ):
+    result = copy( invalid )
+    result.__dict__.pop( 'context', None )
+    result._pending = None
+    result._data =\
+        { 'key': invalid._data[ 'key' ]
+        , 'extra': dict( invalid._data[ 'extra' ] )
+        }
+    return result
+
+
+class Memoize( ValidatorBase ):
+    """
+    Memoize( validator, maxsize=1024, ttl=None )
+
+    Caches results and Invalid outcomes of validator keyed on the input
+    value ( and its type ), the least recently used entry is dropped when
+    maxsize entries are cached. maxsize=None does not limit the cache,
+    entries older than ttl seconds are validated again.
+    Unhashable values are validated as usual. Cached results are shared,
+    do not modify them.
+    """
+
+    def __init__( self, validator, maxsize=1024, ttl=None ):
+        found = impurities( validator )
+        if found:
+            raise SyntaxError\
+                ( "Cannot memoize %s, its outcome does not only depend on the value ( %s )"
+                % ( validator.__class__.__name__, ', '.join( sorted( set( impure.__class__.__name__ for impure in found ) ) ) )
+                )
+
+        self.validator = validator
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.clearCache()
+
+    def clearCache( self ):
+        with self._lock:
+            self._entries = OrderedDict()
+            self._hits = 0
+            self._misses = 0
+            self._skipped = 0
+
+    def stats( self ):
+        """ returns a dict with hits, misses, skipped ( unhashable ), size,
+        maxsize and ttl """
+        with self._lock:
+            return\
+                { 'hits': self._hits
+                , 'misses': self._misses
+                , 'skipped': self._skipped
+                , 'size': len( self._entries )
+                , 'maxsize': self.maxsize
+                , 'ttl': self.ttl
+                }
+
+    # the lock and the entries are not pickled
+    def __getstate__( self ):
+        state = dict( self.__dict__ )
+        del state['_lock']
+        state['_entries'] = OrderedDict()
+        return state
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        self._lock = threading.Lock()
+
+    def appendSubValidators( self, subValidators ):
+        self.validator.appendSubValidators( subValidators )
+        subValidators.append( self.validator )
+
+    def check( self, context, value ):
+        return self._memoized( context, value, self.validator.check )
+
+    def _compile( self, tags, opaque ):
+        check = self.validator._compile( tags, opaque )
+
+        def memoizeCheck( context, value ):
+            return self._memoized( context, value, check )
+
+        return memoizeCheck
+
+    def _memoized( self, context, value, check ):
+        key = ( value.__class__, value )
+        try:
+            hash( key )
+        except TypeError:
+            with self._lock:
+                self._skipped += 1
+            return check( context, value )
+
+        with self._lock:
+            entry = self._entries.get( key )
+            if entry is not None and self.ttl is not None\
+            and time.monotonic() - entry[3] > self.ttl:
+                del self._entries[ key ]
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end( key )
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if entry is not None:
+            return self._replay( context, entry )
+
+        cacheBefore = context.cache and dict( context.cache )
+        valueBefore = context.value
+
+        result = check( context, value )
+
+        writes = None
+        if context.cache:
+            writes = dict\
+                ( ( name, item ) for ( name, item ) in context.cache.items()
+                    if not cacheBefore or cacheBefore.get( name, MISSING ) is not item
+                )
+
+        updatedValue = context.value
+        if updatedValue is valueBefore:
+            updatedValue = MISSING
+
+        stored = result
+        if isinstance( result, Invalid ):
+            stored = _copyInvalid( result )
+
+        with self._lock:
+            self._entries[ key ] = ( stored, writes, updatedValue, time.monotonic() )
+            self._entries.move_to_end( key )
+            if self.maxsize is not None:
+                while len( self._entries ) > self.maxsize:
+                    self._entries.popitem( last=False )
+
+        return result
+
+    def _replay( self, context, entry ):
+        ( result, writes, updatedValue, stamp ) = entry
+
+        if writes:
+            if context.cache is None:
+                context.cache = {}
+            context.cache.update( writes )
+
+        if updatedValue is not MISSING:
+            context.value = updatedValue
+
+        if isinstance( result, Invalid ):
+            return _copyInvalid( result )
+        return result
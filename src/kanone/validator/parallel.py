@@ -0,0 +1,218 @@
+"""
+Process pool support for ForEach( ..., parallel=n ) and Schema( ..., parallel=n ).
+
+The validators are pickled once and installed in every worker when the
+pool starts. Workers validate chunks of values in a context of their own and
+send back the results, the positions of invalid values and the updates of
+the valid ones ( values set by UpdateValue, Email, ... ). Invalid values are
+validated again in the parent context and the updates are made there, so
+errors, the errorlist and updates look the same as in a sequential run.
+"""
+
+from ..error import Invalid
+
+import pickle
+import threading
+import warnings
+import logging
+log = logging.getLogger(__name__)
+
+# the validators of the pool this worker belongs to
+_validators = None
+
+def _install( data ):
+    global _validators
+    _validators = pickle.loads( data )
+
+# the updates of a validated context as ( location, value ) pairs, None if
+# an updated context is gone ( e.g. a passed item of a lazy ForEach )
+def _updatesOf( context ):
+    updates = []
+    for location in context._updates or ():
+        target = context
+        for key in location:
+            target = ( target._children or {} ).get( key )
+            if target is None:
+                return None
+        updates.append( ( location, target._updatedValue ) )
+    return updates
+
+# validates value in context, adds the outcome to results, failed and updates
+def _checkValue( context, pos, results, failed, updates ):
+    result = context.check()
+    found = _updatesOf( context )
+    if isinstance( result, Invalid ) or found is None:
+        failed.append( pos )
+        result = None
+    elif found:
+        updates.append( ( pos, found ) )
+    results.append( result )
+
+def _checkChunk( key, values ):
+    results = []
+    failed = []
+    updates = []
+    context = None
+    for ( pos, value ) in enumerate( values ):
+        if context is None:
+            context = _validators[ key ].context( value )
+        else:
+            context.reset( value )
+        _checkValue( context, pos, results, failed, updates )
+    return results, failed, updates
+
+def _checkFields( pairs ):
+    results = []
+    failed = []
+    updates = []
+    for ( pos, ( key, value ) ) in enumerate( pairs ):
+        _checkValue( _validators[ key ].context( value ), pos, results, failed, updates )
+    return results, failed, updates
+
+def applyUpdates( context, updates ):
+    """ makes the updates a worker sent for a value validated in context,
+    as if it had been validated there """
+    for ( location, value ) in updates:
+        target = context
+        for key in location:
+            target = target( key )
+        target._update( value )
+
+
+class Pool( object ):
+    """ validates chunks of values with a set of validators in worker processes
+
+    validators is a dict, values are validated with validators[ key ].
+    Validators reading other fields ( Field ) are not run in the pool.
+    """
+
+    def __init__( self, validators, processes=None, chunkSize=1000 ):
+        if processes is True:
+            processes = None
+
+        self.validators = validators
+        self.processes = processes
+        self.chunkSize = chunkSize
+
+        self._executor = None
+        self._disabled = False
+        self._lock = threading.Lock()
+
+        from .schema import FieldValidator
+        from .core import Tag
+
+        self.usesFields = False
+        self.usesTags = False
+
+        for validator in validators.values():
+            subValidators = [ validator ]
+            validator.appendSubValidators( subValidators )
+            for subValidator in subValidators:
+                if isinstance( subValidator, FieldValidator ):
+                    self.usesFields = True
+                elif isinstance( subValidator, Tag ):
+                    self.usesTags = True
+
+    # workers get a disabled pool, they do not start pools of their own
+    def __getstate__( self ):
+        state = dict( self.__dict__ )
+        state.update( validators={}, _executor=None, _disabled=True )
+        del state['_lock']
+        return state
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        self._lock = threading.Lock()
+
+    def accepts( self, context ):
+        """ whether values validated in context can be sent to the pool """
+        if self._disabled or self.usesFields:
+            return False
+
+        # the tags of an enclosing Compose are not known to the workers
+        if self.usesTags and context.root.taggedValidators:
+            return False
+
+        return True
+
+    def map( self, key, values ):
+        """ validates values with validators[ key ]
+
+        returns ( results, failed positions, updates ), or None if the pool
+        is not available. results of failed positions are None, updates maps
+        the positions of valid values to the updates for applyUpdates.
+        """
+        return self._run( _checkChunk, key, values )
+
+    def mapFields( self, pairs ):
+        """ like map, but validates a list of ( key, value ) pairs """
+        return self._run( _checkFields, None, pairs )
+
+    def _run( self, func, key, values ):
+        executor = self._getExecutor()
+        if executor is None:
+            return None
+
+        chunkSize = self.chunkSize
+        chunks = [ values[ pos:pos+chunkSize ]\
+            for pos in range( 0, len( values ), chunkSize ) ]
+
+        if key is None:
+            futures = [ executor.submit( func, chunk ) for chunk in chunks ]
+        else:
+            futures = [ executor.submit( func, key, chunk ) for chunk in chunks ]
+
+        results = []
+        failed = []
+        updates = {}
+        for ( chunkPos, future ) in enumerate( futures ):
+            offset = chunkPos*chunkSize
+            try:
+                ( chunkResults, chunkFailed, chunkUpdates ) = future.result()
+            except Exception as e:
+                # not picklable or raised - the parent decides
+                log.debug('chunk %s failed in worker: %r' % ( chunkPos, e ))
+                chunkResults = [ None ] * len( chunks[ chunkPos ] )
+                chunkFailed = range( len( chunkResults ) )
+                chunkUpdates = ()
+
+            results.extend( chunkResults )
+            failed.extend( offset+pos for pos in chunkFailed )
+            updates.update( ( offset+pos, found ) for ( pos, found ) in chunkUpdates )
+
+        return results, failed, updates
+
+    def _getExecutor( self ):
+        if self._executor is None and not self._disabled:
+            with self._lock:
+                if self._executor is None and not self._disabled:
+                    self._startExecutor()
+
+        return self._executor
+
+    def _startExecutor( self ):
+        try:
+            from concurrent.futures import ProcessPoolExecutor
+        except ImportError:
+            warnings.warn('Parallel validation disabled. Please install futures to enable it.', ImportWarning, stacklevel=4)
+            self._disabled = True
+            return
+
+        try:
+            data = pickle.dumps( self.validators, pickle.HIGHEST_PROTOCOL )
+        except Exception as e:
+            warnings.warn('Parallel validation disabled, validators cannot be pickled: %s' % e, RuntimeWarning, stacklevel=4)
+            self._disabled = True
+            return
+
+        self._executor = ProcessPoolExecutor\
+            ( self.processes
+            , initializer=_install
+            , initargs=( data, )
+            )
+
+    def shutdown( self ):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
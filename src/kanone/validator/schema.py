@@ -1,15 +1,61 @@
 # -*- coding: utf-8 -*-
 
-from ..lib import PASS, MISSING, inherit
+from ..lib import PASS, MISSING, inherit, Context, parseFieldPath as _parseFieldPath
 from ..error import Invalid
 
-from .core import ValidatorBase, Validator, messages
+from .core import ValidatorBase, Validator, Compiled, Tag, messages, _compiledCopy
 from .check import Match
+from .memoize import _subValidators, impurities as _impurities
 
+from copy import copy
 
 import logging
+import warnings as _warnings
 log = logging.getLogger(__name__)
 
+# whether the result of validator might depend on other contexts, through
+# Field, tags of an enclosing Compose or impure validators like Call. Schema
+# and ForEach with children are impure for their errors only
+def _readsOthers( validator ):
+    for impure in _impurities( validator ):
+        if not getattr( impure, 'createContextChildren', False ):
+            return True
+    return False
+
+# sets validator and value of a child context. After a value further down
+# changed, a validated child keeps its result if neither of them changed
+def _placeChild( childContext, validator, value, reusable ):
+    if childContext.__validator__ is validator and childContext.__value__ is value\
+    and ( reusable or not childContext.isValidated ):
+        return
+
+    childContext.validator = validator
+    childContext.__value__ = value
+
+# the state validator kept in context._lastOutcome and the keys of the
+# children set since, None if there is nothing to validate incrementally
+def _changedSince( context, validator ):
+    outcome = context._lastOutcome
+    if outcome is None or outcome[0] is not validator or not outcome[2]:
+        return None
+    return outcome[1], outcome[2]
+
+# maps each key to all keys reaching it in reads, and returns it along
+# with volatile and the keys reaching those
+def _closeDependencies( reads, volatile ):
+    def reached( keys ):
+        found = set()
+        stack = list( keys )
+        while stack:
+            for other in reads.get( stack.pop(), () ):
+                if other not in found:
+                    found.add( other )
+                    stack.append( other )
+        return found
+
+    dependents = dict( ( key, frozenset( reached( [ key ] ) ) ) for key in reads )
+    return dependents, frozenset( volatile ).union( reached( volatile ) )
+
 @inherit\
     ( 'validators'
     , 'keyIndexRelation'
@@ -47,6 +93,8 @@ class Schema( Validator ):
         , allowExtraFields=False
         , returnList=False
         , createContextChildren=True
+        , parallel=False
+        , codegen=False
         ):
 
         self.returnList = returnList
@@ -54,6 +102,50 @@ class Schema( Validator ):
         self.createContextChildren = createContextChildren
         self.allowExtraFields = allowExtraFields
 
+        # errors of the fields go to the child contexts
+        self.__pure__ = not createContextChildren
+
+        # fields share the context without children, so only with children
+        self.parallel = parallel
+        self._pool = None
+        if parallel and createContextChildren:
+            from .parallel import Pool
+            self._pool = Pool( self.validators, parallel, 1 )
+
+        self._fieldOrder = None
+        self._fieldRank = None
+        self._reusable = frozenset()
+        self._dependencies = None
+        if createContextChildren:
+            self._fieldOrder = self._orderFields()
+            self._fieldRank = dict\
+                ( ( self.index[ pos ], rank )
+                    for ( rank, pos ) in enumerate( self._fieldOrder or range( len( self.index ) ) )
+                )
+            self._reusable = frozenset\
+                ( key for key in self.index
+                    if not _readsOthers( self.validators[ key ] )
+                )
+            self._dependencies = self._fieldDependencies()
+
+        self.codegen = codegen
+        self._generated = None
+        if codegen:
+            from .codegen import generate
+            self._generated = generate( self )
+
+
+    # generated functions cannot be pickled, they are generated again
+    def __getstate__( self ):
+        state = dict( self.__dict__ )
+        state['_generated'] = None
+        return state
+
+    def __setstate__( self, state ):
+        self.__dict__.update( state )
+        if self._generated is None and self.codegen:
+            from .codegen import generate
+            self._generated = generate( self )
 
     def appendSubValidators( self, subValidators ):
         for validator in list(self.validators.values()):
@@ -62,23 +154,37 @@ class Schema( Validator ):
 
     def on_value( self, context, value ):
         if self.createContextChildren:
-            self.on_value = self._createContextChildren_on_value
-        else:
-            self.on_value = self._on_value
-
-        return self.on_value( context, value )
+            return self._createContextChildren_on_value( context, value )
+        return self._on_value( context, value )
+
+    def _compile( self, tags, opaque ):
+        compiled = copy( self )
+        compiled.on_value = self.createContextChildren\
+            and compiled._createContextChildren_on_value\
+            or compiled._on_value
+        compiled.validators = dict\
+            ( ( key, Compiled( validator, validator._compile( tags, opaque ) ) )
+                for (key, validator) in self.validators.items()
+            )
+        if self._generated is not None:
+            from .codegen import generate
+            compiled._generated = generate( compiled )
+        return _compiledCopy( self, compiled, compiled._compileDispatch() )
 
     def _on_value( self, context, value ):
+        if self._generated is not None:
+            return self._generated( context, value )
+
         isList = isinstance(value, list) or isinstance(value,tuple) or isinstance(value,set)
         if not isList and not isinstance( value, dict ):
-            raise Invalid( value, self, 'type')
+            return Invalid( value, self, 'type')
 
         extraFields = None
         if not self.allowExtraFields:
             if isList:
                 extraFields = max( len(value), len(self.index) )
             else:
-                extraFields = list(value.keys())
+                extraFields = self._extraKeys( value )
 
         if self.returnList:
             result = []
@@ -98,95 +204,361 @@ class Schema( Validator ):
                     val = MISSING
             else:
                 val = value.get( key, MISSING)
-                if not self.allowExtraFields and val is not MISSING:
-                    try: extraFields.remove(key)
-                    except: pass
 
-            res = self.validators[ key ].validate( context, val )
+            res = self.validators[ key ].check( context, val )
+            if isinstance( res, Invalid ):
+                return res
+
             if self.returnList:
                 result.append( res )
             else:
                 result[ key ] = res
 
         if extraFields:
-            raise Invalid( value, self, 'extraFields',extraFields=extraFields)
+            return Invalid( value, self, 'extraFields',extraFields=extraFields)
 
         return result
 
 
     def _createContextChildren_on_value( self, context, value ):
+        if self._generated is not None:
+            return self._generated( context, value )
+
+        changed = _changedSince( context, self )
+        if changed is not None:
+            result = self._revalidate( context, value, *changed )
+            if result is not None:
+                return result
+
+        invalid = self._populate( context, value )
+        if invalid is not None:
+            return invalid
+
+        pool = self._pool
+        updates = None
+        if pool is not None and pool.accepts( context ):
+            updates = self._presolveFields( context, pool )
+
+        # validate
+        children = context._children
+        children = [ children[ key ] for key in self.index ]
+        order = self._fieldOrder
+        if order is None and not updates:
+            results = [ childContext.check() for childContext in children ]
+        else:
+            if updates:
+                from .parallel import applyUpdates
+            results = [ None ] * len( children )
+            for pos in order or range( len( children ) ):
+                # made in the pool, in order with the other fields
+                if updates and pos in updates:
+                    applyUpdates( children[ pos ], updates[ pos ] )
+                results[ pos ] = children[ pos ].check()
+
+        context._lastOutcome = ( self, ( results, None ), set() )
+        return self._collect( value, children, results )
+
+    # validates the changed children again, the fields reading them by Field
+    # and those which might read anything, the other children keep their
+    # results. None if the last outcome cannot be used
+    def _revalidate( self, context, value, state, changed ):
+        keys = self.keyIndexRelation
+        children = context._children
+        if children is None:
+            return None
+
+        # a Schema below the root reads absolute paths from somewhere else
+        ( dependents, volatile ) = self._dependencies[ context.parent is None ]
+        forced = set( volatile )
+        for key in changed:
+            if key not in keys:
+                return None
+            forced.update( dependents.get( key, () ) )
+
+        stale = forced.union( changed )
+        for key in stale:
+            if key not in children:
+                return None
+
+        ( results, errors ) = state
+        if errors is None:
+            errors = set\
+                ( key for ( key, res ) in zip( self.index, results )
+                    if isinstance( res, Invalid )
+                )
+        results = list( results )
+        errors = set( errors )
+
+        isList = not isinstance( value, dict )
+        for key in sorted( stale, key=self._fieldRank.__getitem__ ):
+            pos = keys[ key ]
+            if not isList:
+                val = value.get( key, MISSING )
+            elif pos < len( value ):
+                val = value[ pos ]
+            else:
+                val = MISSING
+
+            childContext = children[ key ]
+            _placeChild( childContext, self.validators[ key ], val, key not in forced )
+            res = results[ pos ] = childContext.check()
+            if isinstance( res, Invalid ):
+                errors.add( key )
+            else:
+                errors.discard( key )
+
+        context._lastOutcome = ( self, ( results, errors ), set() )
+
+        if errors:
+            return Invalid( value, self, errors=sorted( errors, key=keys.__getitem__ ) )
+        if self.returnList:
+            return list( results )
+        return dict( zip( self.index, results ) )
+
+    # creates the children of context, returns Invalid if value does not fit
+    def _populate( self, context, value ):
         isList = isinstance(value, list) or isinstance(value,tuple) or isinstance(value,set)
 
         if not isList and not isinstance( value, dict ):
-            raise Invalid( value, self, 'type')
+            return Invalid( value, self, 'type')
 
         extraFields = None
         if not self.allowExtraFields:
             if isList:
                 extraFields = max( len(value), len(self.index) )
             else:
-                extraFields = list(value.keys())
-
-        errors = []
-
-
-        if self.returnList:
-            result = []
-        else:
-            result = {}
+                extraFields = self._extraKeys( value )
 
         len_value = len(value)
         len_index = len(self.index)
+        existing = context._children or {}
 
-        # populate
         for pos in range(len_index):
             key = self.index[pos]
-            childContext = context( key )
+            childContext = existing.get( key ) or context( key )
             try:
-                childContext.validator = self.validators[ key ]
+                validator = self.validators[ key ]
             except KeyError:
                 raise SyntaxError("No validator set for %s" % childContext.path)
 
             if isList:
                 if len_value<=pos:
-                    childContext.__value__ = MISSING
+                    val = MISSING
                 else:
-                    childContext.__value__ = value[ pos ]
+                    val = value[ pos ]
             else:
-                childContext.__value__ = value.get( key, MISSING )
+                val = value.get( key, MISSING )
 
-            if not self.allowExtraFields:
-                if isList:
-                    extraFields-=1
-                else:
-                    try: extraFields.remove(key)
-                    except: pass
+            _placeChild( childContext, validator, val, key in self._reusable )
+
+            if isList and not self.allowExtraFields:
+                extraFields-=1
 
         if extraFields:
-            raise Invalid( value, self, 'extraFields',extraFields=extraFields)
+            return Invalid( value, self, 'extraFields',extraFields=extraFields)
 
         context.setIndexFunc( lambda index: self.index[index] )
+        return None
 
-        # validate
-        for key in self.index:
+    # builds the result from the results of the children
+    def _collect( self, value, children, results ):
+        errors = []
 
-            try:
-                res = context( key ).result
-            except Invalid as e:
-                errors.append( e.context.key )
-            else:
-                if self.returnList:
-                    result.append( res )
-                else:
-                    result[ key ] = res
+        if self.returnList:
+            result = []
+        else:
+            result = {}
 
+        for ( childContext, res ) in zip( children, results ):
+            if isinstance( res, Invalid ):
+                errors.append( res.context.key )
+            elif self.returnList:
+                result.append( res )
+            else:
+                result[ childContext.key ] = res
 
         if errors:
-            raise Invalid( value, self, errors=errors )
+            return Invalid( value, self, errors=errors )
 
         return result
 
 
+    # validates the fields in the pool, only invalid ones are left over.
+    # Returns the updates of the valid ones by position, None if the pool
+    # was not available
+    def _presolveFields( self, context, pool ):
+        children = [ context( key ) for key in self.index ]
+        presolved = pool.mapFields\
+            ( [ ( child.key, child.__value__ ) for child in children ]
+            )
+        if presolved is None:
+            return None
+
+        ( results, failed, updates ) = presolved
+        failed = set( failed )
+        for ( pos, child ) in enumerate( children ):
+            if pos not in failed:
+                child.__result__ = results[ pos ]
+                child.isValidated = True
+
+        return updates
+
+    # the positions of the fields, ordered so that fields come after the
+    # siblings they reference by Field( ..., useResult=True ), None if
+    # there are no such references
+    def _orderFields( self ):
+        references = dict\
+            ( ( key, self._fieldReferences( self.validators[ key ] ) )
+                for key in self.index
+            )
+        if not any( references.values() ):
+            return None
+
+        order = []
+        done = set()
+
+        def visit( key, trail ):
+            if key in done:
+                return
+            if key in trail:
+                cycle = trail[ trail.index( key ): ] + [ key ]
+                raise SyntaxError( "Field reference cycle in %s: %s" % ( self.__class__.__name__, ' -> '.join( cycle ) ) )
+
+            trail.append( key )
+            for reference in references[ key ]:
+                visit( reference, trail )
+            trail.pop()
+
+            done.add( key )
+            order.append( self.keyIndexRelation[ key ] )
+
+        for key in self.index:
+            visit( key, [] )
+
+        return order
+
+    # ( dependents, volatile ) for validating children again after some of
+    # them changed, for a Schema below the root and one of the root. They
+    # map a key to the keys of the fields reading it by Field, directly or
+    # through other fields, volatile fields might read anything else
+    def _fieldDependencies( self ):
+        siblings = {}
+        roots = {}
+        volatile = []
+        absolute = []
+
+        for key in self.index:
+            ( readSiblings, readRoots, unknown ) = self._readKeys( self.validators[ key ] )
+            if unknown:
+                volatile.append( key )
+            if readRoots:
+                absolute.append( key )
+            for other in readSiblings:
+                siblings.setdefault( other, [] ).append( key )
+                roots.setdefault( other, [] ).append( key )
+            for other in readRoots:
+                if other is not None:
+                    roots.setdefault( other, [] ).append( key )
+
+        return\
+            ( _closeDependencies( siblings, volatile + absolute )
+            , _closeDependencies( roots, volatile )
+            )
+
+    # the keys of the siblings and of the root's fields validator reads by
+    # Field ( None for other contexts ) and whether it might read anything
+    # else. Paths above this Schema are left out, it gets validated again as
+    # a whole when they change
+    def _readKeys( self, validator ):
+        subValidators = _subValidators( validator )
+
+        unknown = False
+        for impure in _impurities( validator ):
+            if not isinstance( impure, Field )\
+            and not getattr( impure, 'createContextChildren', False ):
+                unknown = True
+
+        # paths below these are relative to other contexts
+        nested = set()
+        criteria = set()
+        for subValidator in subValidators:
+            if getattr( subValidator, 'createContextChildren', False ):
+                nested.update( id( below ) for below in _subValidators( subValidator )[1:] )
+            elif isinstance( subValidator, Field ):
+                criteria.update( id( below ) for below in _subValidators( subValidator )[1:] )
+
+        siblings = set()
+        roots = set()
+        for subValidator in subValidators:
+            if not isinstance( subValidator, Field ):
+                continue
+            if id( subValidator ) in criteria:
+                unknown = True
+                continue
+
+            ( absolute, ups, keys ) = _parseFieldPath( subValidator.path )
+            if absolute:
+                roots.add( self._fieldKey( keys ) )
+            elif id( subValidator ) in nested:
+                if ups > 1:
+                    unknown = True
+            elif ups == 1:
+                key = self._fieldKey( keys )
+                if key is not None:
+                    siblings.add( key )
+
+        return siblings, roots, unknown
+
+    # the field a path of keys starts with, None if it is none of ours
+    def _fieldKey( self, keys ):
+        if not keys:
+            return None
+
+        key = keys[0]
+        if key.__class__ is int:
+            if not -len( self.index ) <= key < len( self.index ):
+                return None
+            return self.index[ key ]
+
+        if key in self.validators:
+            return key
+        return None
+
+    # the sibling fields whose results validator reads by Field
+    def _fieldReferences( self, validator ):
+        subValidators = [ validator ]
+        validator.appendSubValidators( subValidators )
+
+        # fields below have contexts of their own
+        hidden = set()
+        for subValidator in subValidators:
+            if getattr( subValidator, 'createContextChildren', False )\
+            or isinstance( subValidator, FieldValidator ):
+                nested = []
+                subValidator.appendSubValidators( nested )
+                hidden.update( id( nestedValidator ) for nestedValidator in nested )
+
+        references = []
+        for subValidator in subValidators:
+            if not isinstance( subValidator, Field ) or not subValidator.useResult\
+            or id( subValidator ) in hidden:
+                continue
+
+            ( absolute, ups, keys ) = _parseFieldPath( subValidator.path )
+            if absolute or ups != 1:
+                continue
+
+            key = self._fieldKey( keys )
+            if key is not None and key not in references:
+                references.append( key )
+
+        return references
+
+    # the keys of value which are not in the schema, in the order of value
+    def _extraKeys( self, value ):
+        keys = self.keyIndexRelation
+        return [ key for key in value if key not in keys ]
+
     @classmethod
     def getValidators( cls, _fieldset  ):
         if not _fieldset:
@@ -218,7 +590,11 @@ class ForEach( Validator ):
         , criterion
         , numericKeys=True
         , returnList=True
-        , createContextChildren=True ):
+        , createContextChildren=True
+        , vectorize=False
+        , parallel=False
+        , chunkSize=1000
+        , lazyChildren=False ):
 
         if not isinstance( criterion, ValidatorBase ):
             criterion = Match( criterion )
@@ -227,20 +603,93 @@ class ForEach( Validator ):
         self.numericKeys = numericKeys
         self.validator = criterion
         self.createContextChildren = createContextChildren
+        self.lazyChildren = lazyChildren
+        self.__pure__ = not createContextChildren
+        self._reusable = not _readsOthers( criterion )
+        self.vectorize = vectorize
+
+        self._vectorChain = None
+        if vectorize:
+            # numpy is only imported when it is used
+            from . import vector
+            if vector.numpy is None:
+                _warnings.warn('Vectorized ForEach disabled. Please install numpy to enable it.', ImportWarning, stacklevel=2)
+            else:
+                self._vectorChain = vector.plan( criterion )
+
+        self.parallel = parallel
+        self.chunkSize = chunkSize
+        self._pool = None
+        if parallel:
+            from .parallel import Pool
+            self._pool = Pool( { 0: criterion }, parallel, chunkSize )
 
     def on_value( self, context, value ):
         if self.createContextChildren:
-            self.on_value = self._createContextChildren_on_value
-        else:
-            self.on_value = self._on_value
-
-        return self.on_value( context, value )
+            return self._createContextChildren_on_value( context, value )
+        return self._on_value( context, value )
 
     def appendSubValidators( self, subValidators ):
         self.validator.appendSubValidators( subValidators )
         subValidators.append( self.validator )
 
+    def _compile( self, tags, opaque ):
+        compiled = copy( self )
+        compiled.on_value = self.createContextChildren\
+            and compiled._createContextChildren_on_value\
+            or compiled._on_value
+        compiled.validator = Compiled\
+            ( self.validator
+            , self.validator._compile( tags, opaque )
+            )
+        return _compiledCopy( self, compiled, compiled._compileDispatch() )
+
+    # returns ( results, fallback positions, updates by position ) if value
+    # could be validated in bulk, by vectorizing or in the process pool
+    def _presolve( self, context, value ):
+        if not ( isinstance( value, list ) or isinstance( value, tuple ) ):
+            return None
+
+        if self._vectorChain is not None:
+            from . import vector
+            vectorized = vector.run( self._vectorChain, value )
+            if vectorized is not None:
+                ( results, fallback ) = vectorized
+                if results is value:
+                    results = list( results )
+
+                return results, fallback.nonzero()[0].tolist(), {}
+
+        pool = self._pool
+        if pool is not None and len( value ) > self.chunkSize\
+        and pool.accepts( context ):
+            return pool.map( 0, value )
+
+        return None
+
     def _on_value( self, context, value ):
+        presolved = self._presolve( context, value )
+        if presolved is not None:
+            ( results, fallback, updates ) = presolved
+            if updates:
+                from .parallel import applyUpdates
+                fallback = sorted( set( fallback ).union( updates ) )
+
+            for pos in fallback:
+                # made in the pool, in order with the other items
+                if pos in updates:
+                    applyUpdates( context, updates[ pos ] )
+                    continue
+
+                res = self.validator.check( context, value[pos] )
+                if isinstance( res, Invalid ):
+                    return res
+                results[pos] = res
+
+            if self.returnList:
+                return results
+            return dict( enumerate( results ) )
+
         if self.returnList:
             result = []
         else:
@@ -249,18 +698,20 @@ class ForEach( Validator ):
         isList = isinstance( value, list) or isinstance(value, tuple) or isinstance(value, set)
         if not isList:
             if not isinstance(value, dict ):
-                raise Invalid( value, self,'type' )
+                return Invalid( value, self,'type' )
 
         if isList or self.numericKeys:
             for pos in range( len( value ) ):
                 if not isList:
                     val = value.get(str(pos),MISSING)
                     if val is MISSING:
-                        raise Invalid( value, self, 'numericKeys', keys=list(value.keys()) )
+                        return Invalid( value, self, 'numericKeys', keys=list(value.keys()) )
                 else:
                     val = value[pos]
 
-                res = self.validator.validate( context, val )
+                res = self.validator.check( context, val )
+                if isinstance( res, Invalid ):
+                    return res
 
                 if self.returnList:
                     result.append( res )
@@ -269,7 +720,9 @@ class ForEach( Validator ):
         else:
             for (key, val) in value.items():
 
-                res = self.validator.validate( context, val )
+                res = self.validator.check( context, val )
+                if isinstance( res, Invalid ):
+                    return res
 
                 if self.returnList:
                     result.append( res )
@@ -279,20 +732,199 @@ class ForEach( Validator ):
         return result
 
     def _createContextChildren_on_value( self, context, value ):
+        changed = _changedSince( context, self )
+        if changed is not None:
+            result = self._revalidate( context, value, *changed )
+            if result is not None:
+                return result
+
+        presolved = self._presolve( context, value )
+        if presolved is not None:
+            # only items which did not pass in bulk get a context, or
+            # were updated
+            ( results, fallback, updates ) = presolved
+            children = []
+            errors = []
+            context.setIndexFunc( lambda index: str(index) )
+
+            for pos in fallback:
+                contextChild = context( str( pos ) )
+                contextChild.validator = self.validator
+                contextChild.__value__ = value[ pos ]
+                children.append( contextChild )
+
+            context._pruneChildren( children )
+            context.numValues = len( value )
+            context.childFactory = self._childFactory( context, value )
+
+            fallbackChildren = dict( zip( fallback, children ) )
+            if updates:
+                from .parallel import applyUpdates
+                fallback = sorted( set( fallback ).union( updates ) )
+
+            for pos in fallback:
+                childContext = fallbackChildren.get( pos )
+                if pos in updates:
+                    # made in the pool, in order with the other items
+                    childContext = context( str( pos ) )
+                    childContext.__result__ = results[ pos ]
+                    childContext.isValidated = True
+                    applyUpdates( childContext, updates[ pos ] )
+                    continue
+
+                res = results[ pos ] = childContext.check()
+                if isinstance( res, Invalid ):
+                    errors.append( childContext.key )
+
+            self._keepOutcome( context, results )
+            return self._listResult( value, results, errors )
+
+        if self.lazyChildren and ( isinstance( value, list ) or isinstance( value, tuple ) ):
+            return self._lazyChildren_on_value( context, value )
+
+        children = self._populate( context, value )
+        if isinstance( children, Invalid ):
+            return children
+
+        #validate
+        results = [ childContext.check() for childContext in children ]
+        if isinstance( value, list ) or isinstance( value, tuple ):
+            self._keepOutcome( context, results )
+
+        return self._collect( value, children, results )
+
+    # keeps the results of the items for validating changed ones again
+    def _keepOutcome( self, context, results ):
+        if self._reusable:
+            context._lastOutcome = ( self, ( list( results ), None ), set() )
+
+    # validates the changed items again, the others keep their results.
+    # None if the last outcome cannot be used
+    def _revalidate( self, context, value, state, changed ):
+        ( results, errors ) = state
+        children = context._children
+        if not ( isinstance( value, list ) or isinstance( value, tuple ) )\
+        or children is None or len( results ) != len( value ):
+            return None
+
+        stale = []
+        for key in changed:
+            if key not in children or not key.isdigit() or str( int( key ) ) != key\
+            or int( key ) >= len( value ):
+                return None
+            stale.append( int( key ) )
+
+        if errors is None:
+            errors = set\
+                ( pos for ( pos, res ) in enumerate( results )
+                    if isinstance( res, Invalid )
+                )
+        results = list( results )
+        errors = set( errors )
+
+        for pos in sorted( stale ):
+            childContext = children[ str( pos ) ]
+            _placeChild( childContext, self.validator, value[ pos ], True )
+            res = results[ pos ] = childContext.check()
+            if isinstance( res, Invalid ):
+                errors.add( pos )
+            else:
+                errors.discard( pos )
+
+        if context.childFactory is not None:
+            context.childFactory = self._childFactory( context, value )
+        context._lastOutcome = ( self, ( results, errors ), set() )
+
+        return self._listResult\
+            ( value
+            , list( results )
+            , [ str( pos ) for pos in sorted( errors ) ]
+            )
+
+    # validates the items in one reused context, which is only kept as a
+    # child if the item fails
+    def _lazyChildren_on_value( self, context, value ):
+        validator = self.validator
+        results = []
+        errors = []
+        probe = None
+
+        context.setIndexFunc( lambda index: str(index) )
+        context._pruneChildren( () )
+        context.numValues = len( value )
+        context.childFactory = self._childFactory( context, value )
+
+        for pos in range( len( value ) ):
+            key = str( pos )
+            children = context._children
+            if children and key in children:
+                # already created, a Field asked for it
+                res = children[ key ].check()
+            else:
+                if probe is None:
+                    probe = Context( key=key, parent=context )
+                    probe.__validator__ = validator
+                else:
+                    # the updates of the passed items are kept
+                    root = context.root
+                    updates = root._updates
+                    root._updates = None
+                    probe.reset()
+                    root._updates = updates
+                    probe._rekey( key )
+
+                probe.__value__ = value[ pos ]
+                res = probe.check()
+
+                if isinstance( res, Invalid ):
+                    if children is None:
+                        children = context._children = {}
+                    children[ key ] = probe
+                    probe = None
+
+            if isinstance( res, Invalid ):
+                errors.append( key )
+            results.append( res )
+
+        self._keepOutcome( context, results )
+        return self._listResult( value, results, errors )
+
+    # creates the contexts of items which were validated without one
+    def _childFactory( self, context, value ):
+        validator = self.validator
+
+        def childFactory( key ):
+            if not key.isdigit():
+                return None
+            pos = int( key )
+            if pos >= len( value ) or str( pos ) != key:
+                return None
+
+            child = Context( key=key, parent=context )
+            child.__validator__ = validator
+            child.__value__ = value[ pos ]
+            return child
+
+        return childFactory
+
+    def _listResult( self, value, results, errors ):
+        if errors:
+            return Invalid( value, self, errors=errors )
+
+        if self.returnList:
+            return results
+        return dict( ( str( pos ), res ) for ( pos, res ) in enumerate( results ) )
+
+    # returns the children of context, or Invalid if value does not fit
+    def _populate( self, context, value ):
         isList = isinstance( value, list) or isinstance(value, tuple) or isinstance(value, set)
 
         if not isList:
             if not isinstance(value, dict ):
-                raise Invalid( value, self,'type' )
-
-        if self.returnList:
-            result = []
-        else:
-            result = {}
-        errors = []
+                return Invalid( value, self,'type' )
 
-        # populate
         children = []
+
         if isList or self.numericKeys:
             context.setIndexFunc( lambda index: str(index) )
 
@@ -301,68 +933,76 @@ class ForEach( Validator ):
                     val = value.get(str(pos),MISSING)
                     if value.get(str(pos),MISSING) is MISSING:
                         context.setIndexFunc( None )
-                        raise Invalid( value, self, 'numericKeys',keys=list(value.keys()))
+                        return Invalid( value, self, 'numericKeys',keys=list(value.keys()))
 
                 else:
                     val = value[ pos ]
 
                 contextChild = context( str( pos ) )
-                contextChild.validator = self.validator
-                contextChild.__value__ = val
+                _placeChild( contextChild, self.validator, val, self._reusable )
                 children.append( contextChild )
 
         else:
             context.setIndexFunc( None )
 
             if self.returnList:
-                raise Invalid( value, self, 'listType' )
+                return Invalid( value, self, 'listType' )
             for (key,val) in value.items():
                 contextChild = context( key )
-                contextChild.validator = self.validator
-                contextChild.__value__ = val
+                _placeChild( contextChild, self.validator, val, self._reusable )
                 children.append( contextChild )
 
-        #validate
-        for childContext in children:
-            try:
-                res = childContext.result
-            except Invalid:
+        context._pruneChildren( children )
+        return children
+
+    # builds the result from the results of the children
+    def _collect( self, value, children, results ):
+        errors = []
+
+        if self.returnList:
+            result = []
+        else:
+            result = {}
+
+        for ( childContext, res ) in zip( children, results ):
+            if isinstance( res, Invalid ):
                 errors.append( childContext.key )
+            elif self.returnList:
+                result.append( res )
             else:
-                if self.returnList:
-                    result.append( res )
-                else:
-                    result[ childContext.key ] =  res
+                result[ childContext.key ] =  res
 
         if errors:
-            raise Invalid( value, self, errors=errors )
+            return Invalid( value, self, errors=errors )
 
         return result
 
 
 class FieldValidator( Validator ):
 
+    # reads other contexts
+    __pure__ = False
+
     def setParameters(self):
         raise SyntaxError( "FieldValidator cannot be used directly" )
 
     def getField( self, context, path):
-        pathSplit = path.split('.')
+        ( absolute, ups, keys ) = _parseFieldPath( path )
 
-        if pathSplit[0].startswith('/'):
-            pathSplit[0] = pathSplit[0][1:]
+        if absolute:
             fieldcontext = context.root
         else:
             fieldcontext = context
 
-            while fieldcontext.parent and pathSplit and pathSplit[0] is '':
+            while ups and fieldcontext.parent:
                 fieldcontext = fieldcontext.parent
-                del pathSplit[0]
+                ups -= 1
 
-        for part in pathSplit:
-            if part.startswith('(') and part.endswith(')'):
-                part = int(part[1:-1])
+            if ups:
+                raise SyntaxError('Path cannot be empty')
 
-            fieldcontext = fieldcontext( part )
+        for key in keys:
+            fieldcontext = fieldcontext( key )
 
         if fieldcontext is context:
             raise SyntaxError( "Cannot reference myself. Nice try, though :)" )
@@ -388,24 +1028,39 @@ class Field( FieldValidator ):
         self.validator  = criterion
 
     def appendSubValidators( self, subValidators ):
+        if self.validator is None:
+            return
+
         self.validator.appendSubValidators( subValidators )
         subValidators.append( self.validator )
 
-    def validate(self, context, value):
+    def _compile( self, tags, opaque ):
+        if self.validator is None:
+            return self.check
+
+        compiled = copy( self )
+        compiled.validator = Compiled\
+            ( self.validator
+            , self.validator._compile( tags, opaque )
+            )
+        return _compiledCopy( self, compiled, compiled.check )
+
+    def check(self, context, value):
         fieldcontext = self.getField( context, self.path )
 
         if not self.useResult:
             result = fieldcontext.value
 
         else:
-            try:
-                result = fieldcontext.result
-            except Invalid:
+            result = fieldcontext.check()
+            if isinstance( result, Invalid ):
                 result = PASS
 
         if self.validator is not None:
             if result is not PASS:
-                result = self.validator.validate( fieldcontext, result )
+                result = self.validator.check( fieldcontext, result )
+                if isinstance( result, Invalid ):
+                    return result
 
         if self.writeToContext:
             fieldcontext.__result__ = result
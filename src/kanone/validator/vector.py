@@ -0,0 +1,208 @@
+"""
+Vectorized execution of simple chains for ForEach( ..., vectorize=True ).
+
+Chains of Integer, Float, Min, Max, Len and In are run over a whole list
+at once, using numpy for the numeric comparisons. Items which fail or can
+not be decided exactly are reported back as fallback indices, ForEach runs
+the regular validator on those, so errors are the same as without
+vectorization.
+"""
+
+from .core import And
+from .basic import Integer, Float
+from .check import Min, Max, Len, In
+
+from itertools import repeat
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# exact classes only, subclasses may behave differently
+_types =\
+    { Integer: ( int, ( int, bool ) )
+    , Float: ( float, ( float, ) )
+    }
+
+_scalars = ( int, bool, float, str )
+
+# numbers up to this magnitude compare exactly as float64
+_exactFloat = 2**53
+
+
+def plan( validator ):
+    """ returns the flattened chain if validator can be vectorized, else None """
+    if numpy is None:
+        return None
+
+    chain = []
+    stack = [ validator ]
+    while stack:
+        validator = stack.pop( 0 )
+        if validator.__class__ is And:
+            stack[0:0] = validator.validators
+        else:
+            chain.append( validator )
+
+    for validator in chain:
+        klass = validator.__class__
+        if validator.__paramWrapper__ is not None:
+            return None
+        elif klass is Min or klass is Max:
+            if klass is Min:
+                bound = validator.min
+            else:
+                bound = validator.max
+            if bound.__class__ not in ( int, float ):
+                return None
+        elif klass is Len:
+            if validator.returnLen:
+                return None
+        elif klass is not In and klass not in _types:
+            return None
+
+    return chain
+
+
+def run( chain, values ):
+    """ returns ( results, fallback ) for a list of values
+
+    results holds the result of each value where fallback is False, fallback
+    is a numpy bool array of the items the regular validator has to decide.
+    Returns None if the values are not suitable at all.
+    """
+    kinds = set( map( type, values ) )
+    if not kinds.issubset( _scalars ):
+        return None
+
+    count = len( values )
+    fallback = numpy.zeros( count, dtype=bool )
+
+    if str in kinds:
+        # blank values are handled by on_blank
+        fallback |= numpy.fromiter\
+            ( map( operator.eq, values, repeat( '' ) )
+            , dtype=bool, count=count
+            )
+
+    array = None
+
+    for validator in chain:
+        klass = validator.__class__
+
+        if klass in _types:
+            values, kinds = _convert( validator, values, kinds, fallback )
+            array = None
+
+        elif klass is Len:
+            lengths = _apply( len, values, fallback, numpy.int64, 0 )
+            fallback |= lengths < validator.min
+            if validator.max is not None:
+                fallback |= lengths > validator.max
+
+        elif klass is In:
+            fallback |= ~_apply\
+                ( validator._contains
+                , values, fallback, bool, True
+                )
+
+        else:
+            if array is None:
+                array = _numbers( values, kinds )
+
+            if klass is Min:
+                compare, bound = operator.lt, validator.min
+            else:
+                compare, bound = operator.gt, validator.max
+
+            if array is not None and _isExact( array, bound ):
+                fallback |= compare( array, bound )
+            else:
+                fallback |= _apply\
+                    ( lambda value: compare( value, bound )
+                    , values, fallback, bool, True
+                    )
+
+    return values, fallback
+
+
+def _convert( validator, values, kinds, fallback ):
+    converter, accepted = _types[ validator.__class__ ]
+
+    if kinds.issubset( accepted ):
+        return values, kinds
+
+    # items which fail are replaced by a harmless value of the right type
+    # to keep the following steps on the fast path, they are fallbacks anyway
+    if not validator._convert:
+        wrongType = numpy.fromiter\
+            ( ( value.__class__ not in accepted for value in values )
+            , dtype=bool, count=len( values )
+            )
+        fallback |= wrongType
+        values = [ converter() if wrong else value\
+            for ( value, wrong ) in zip( values, wrongType.tolist() ) ]
+        return values, set( map( type, values ) )
+
+    def convert( value ):
+        if isinstance( value, converter ):
+            return value
+        return converter( value )
+
+    try:
+        values = list( map( convert, values ) )
+    except Exception:
+        result = []
+        for pos, value in enumerate( values ):
+            try:
+                value = convert( value )
+            except Exception:
+                fallback[ pos ] = True
+                value = converter()
+            result.append( value )
+        values = result
+
+    return values, set( map( type, values ) )
+
+
+# maps func over values, items raising an exception are marked as fallback
+def _apply( func, values, fallback, dtype, failed ):
+    count = len( values )
+    try:
+        return numpy.fromiter( map( func, values ), dtype=dtype, count=count )
+    except Exception:
+        result = numpy.empty( count, dtype=dtype )
+        for pos, value in enumerate( values ):
+            try:
+                result[ pos ] = func( value )
+            except Exception:
+                fallback[ pos ] = True
+                result[ pos ] = failed
+        return result
+
+
+def _numbers( values, kinds ):
+    if kinds.issubset( ( int, bool ) ):
+        dtype = numpy.int64
+    elif kinds.issubset( ( float, ) ):
+        dtype = numpy.float64
+    else:
+        return None
+
+    try:
+        return numpy.array( values, dtype=dtype )
+    except OverflowError:
+        return None
+
+
+# whether numpy compares array and bound like python would
+def _isExact( array, bound ):
+    if array.dtype == numpy.int64:
+        if bound.__class__ is int:
+            return -2**63 <= bound < 2**63
+        return not len( array )\
+            or ( array.min() >= -_exactFloat and array.max() <= _exactFloat )
+
+    return bound.__class__ is float or abs( bound ) <= _exactFloat
@@ -1,4 +1,4 @@
-from ..lib import Invalid
+from ..lib import Invalid, MISSING
 
 from .core import ValidatorBase, Validator, Compose, Tmp, Item, Call, If, messages
 from .basic import String, Dict, Date, DateTime
@@ -8,37 +8,297 @@ from .schema import Schema, ForEach
 
 from . import cache
 
+from collections import OrderedDict
 import re
+import threading
+import time
 import warnings
 
+
+class DNSResolver( object ):
+    """
+    Looks up MX records with dnspython.
+
+    A resolver is any object with lookup( domain ), returning ( found, ttl )
+    or None if the lookup failed for now ( e.g. timed out ). ttl is None for
+    domains which do not exist or have no MX record, found tells whether
+    there is a mail server. nameservers and port point it to other servers,
+    e.g. a stub server for testing.
+    """
+
+    def __init__( self, timeout=5.0, nameservers=None, port=None ):
+        import dns.resolver
+        import dns.exception
+
+        self._resolver = dns.resolver.Resolver()
+        self._resolver.lifetime = timeout
+        if nameservers is not None:
+            self._resolver.nameservers = list( nameservers )
+        if port is not None:
+            self._resolver.port = port
+
+        # dnspython < 2 only has query
+        self._query = getattr( self._resolver, 'resolve', None ) or self._resolver.query
+        self._missing = ( dns.resolver.NXDOMAIN, dns.resolver.NoAnswer )
+        self._failed = ( dns.exception.Timeout, dns.resolver.NoNameservers )
+
+    def lookup( self, domain ):
+        try:
+            answer = self._query( domain, 'MX' )
+        except self._missing:
+            return False, None
+        except self._failed:
+            return None
+
+        if not len( answer ):
+            return False, None
+        return True, answer.rrset.ttl
+
+_defaultResolver = None
+
+# the shared DNSResolver
+def defaultResolver():
+    global _defaultResolver
+    if _defaultResolver is None:
+        _defaultResolver = DNSResolver()
+    return _defaultResolver
+
+
+class MXCache( object ):
+    """
+    MX lookup results by domain, kept as long as the ttl of the answer says
+    ( at most maxTtl seconds ). Missing domains and domains without MX
+    record are kept negativeTtl seconds. The least recently used domain is
+    dropped when maxsize domains are cached.
+    """
+
+    def __init__( self, maxsize=10000, negativeTtl=300, maxTtl=86400 ):
+        self.maxsize = maxsize
+        self.negativeTtl = negativeTtl
+        self.maxTtl = maxTtl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get( self, domain ):
+        """ returns whether domain has a mail server, None if unknown """
+        with self._lock:
+            entry = self._entries.get( domain )
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[ domain ]
+                return None
+            self._entries.move_to_end( domain )
+            return entry[0]
+
+    def set( self, domain, found, ttl=None ):
+        if ttl is None:
+            ttl = self.negativeTtl
+        ttl = min( ttl, self.maxTtl )
+
+        with self._lock:
+            self._entries[ domain ] = ( found, time.monotonic() + ttl )
+            self._entries.move_to_end( domain )
+            while len( self._entries ) > self.maxsize:
+                self._entries.popitem( last=False )
+
+    def clear( self ):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__( self ):
+        return len( self._entries )
+
+    # the default cache stays the default one, others are pickled empty
+    def __reduce__( self ):
+        if self is defaultMXCache:
+            return 'defaultMXCache'
+        return ( MXCache, ( self.maxsize, self.negativeTtl, self.maxTtl ) )
+
+# shared by all MXLookup validators without a cache of their own
+defaultMXCache = MXCache()
+
+
 @messages\
     ( fail='Domain offers no mailserver'
+    , unknown='The mailserver of the domain could not be looked up, please try again later'
     )
 class MXLookup( Validator ):
-    def setArguments( self ):
-        try:
-            import dns.resolver
-        except:
-            warnings.warn('MX lookup disabled. Please install dnspython to enable dns lookups.', ImportWarning, stacklevel=2)
-            self.on_value = self.resolveDisabled
-        else:
-            self.resolver = dns.resolver
+    """
+    MXLookup( resolver=None, cache=None, rejectUnknown=False )
+
+    resolver defaults to a shared DNSResolver, created on the first lookup.
+    cache defaults to defaultMXCache, cache=False does not cache.
+    Domains the resolver could not look up for now ( e.g. timed out ) are
+    not cached and pass, with rejectUnknown=True they fail as 'unknown'.
+    """
+
+    # asks the dns
+    __pure__ = False
+
+    def setParameters( self, resolver=None, cache=None, rejectUnknown=False ):
+        self.__dict__.pop( 'on_value', None )
+
+        if resolver is None:
+            try:
+                import dns.resolver
+            except ImportError:
+                warnings.warn('MX lookup disabled. Please install dnspython to enable dns lookups.', ImportWarning, stacklevel=2)
+                self.on_value = self.resolveDisabled
+
+        if cache is None:
+            cache = defaultMXCache
+        elif cache is False:
+            cache = None
+
+        self.resolver = resolver
+        self.cache = cache
+        self.rejectUnknown = rejectUnknown
 
     def resolveDisabled( self, context, value ):
         warnings.warn('MX lookup failed for domain %s. Please install dnspython to enable dns lookups.', RuntimeWarning, stacklevel=2)
         return value
 
     def on_value( self, context, value ):
-        r = None
-        try:
-            r = self.resolver.query(value, 'MX')
-        except self.resolver.NXDOMAIN:
-            pass
-        if not r:
-            raise Invalid( value, self )
+        return self._outcome( value, self.resolve( value ) )
+
+    # the result for value, by what resolve found
+    def _outcome( self, value, found ):
+        if found is None:
+            if self.rejectUnknown:
+                return Invalid( value, self, 'unknown' )
+            return value
+
+        if not found:
+            return Invalid( value, self )
 
         return value
 
+    def resolve( self, domain ):
+        """ whether domain has a mail server, using the cache. None if the
+        resolver could not tell for now """
+        cache = self.cache
+        if cache is not None:
+            found = cache.get( domain )
+            if found is not None:
+                return found
+
+        return self._answered( domain, ( self.resolver or defaultResolver() ).lookup( domain ) )
+
+    # caches the answer of the resolver, returns what resolve returns
+    def _answered( self, domain, answer ):
+        if answer is None:
+            return None
+
+        ( found, ttl ) = answer
+        if self.cache is not None:
+            self.cache.set( domain, found, ttl )
+        return found
+
+    def prefetch( self, domains, workers=16 ):
+        """ resolves the domains which are not cached yet in up to workers
+        threads, so the validations to come find them in the cache """
+        if 'on_value' in self.__dict__ or self.cache is None:
+            return
+
+        pending = []
+        for domain in domains:
+            if domain not in pending and self.cache.get( domain ) is None:
+                pending.append( domain )
+
+        if len( pending ) < 2 or workers < 2:
+            for domain in pending:
+                self.resolve( domain )
+            return
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor( min( workers, len( pending ) ) ) as executor:
+            list( executor.map( self.resolve, pending ) )
+
+
+def emailDomains( value ):
+    """ returns the domains of the email addresses in value ( and lists,
+    tuples, sets and dict values in it ) the way MXLookup gets them """
+    domains = []
+    stack = [ value ]
+    while stack:
+        item = stack.pop()
+        if isinstance( item, dict ):
+            stack.extend( item.values() )
+        elif isinstance( item, list ) or isinstance( item, tuple ) or isinstance( item, set ):
+            stack.extend( item )
+        elif isinstance( item, str ) and '@' in item:
+            domain = ''.join( item.split( '@', 1 )[1].split() ).lower()
+            try:
+                domain = domain.encode( 'idna' ).decode( 'ascii' )
+            except UnicodeError:
+                continue
+            if domain:
+                domains.append( domain )
+    return domains
+
+class PrefetchMX( ValidatorBase ):
+    """
+    PrefetchMX( validator, domains=emailDomains, workers=16 )
+
+    Resolves the distinct domains of the value in parallel before validator
+    runs, so its MXLookups find them in their cache, e.g.
+    PrefetchMX( ForEach( Email( resolve=True ) ) ).
+    domains( value ) returns the domains to resolve.
+    """
+
+    def __init__( self, validator, domains=emailDomains, workers=16 ):
+        self.validator = validator
+        self.domains = domains
+        self.workers = workers
+        self._mxLookups = None
+
+    def appendSubValidators( self, subValidators ):
+        self.validator.appendSubValidators( subValidators )
+        subValidators.append( self.validator )
+
+    # the enabled MXLookups of validator, one for each resolver and cache
+    def _lookups( self ):
+        if self._mxLookups is None:
+            from .memoize import _subValidators
+
+            lookups = {}
+            for subValidator in _subValidators( self.validator ):
+                if isinstance( subValidator, MXLookup )\
+                and 'on_value' not in subValidator.__dict__:
+                    key = ( id( subValidator.resolver ), id( subValidator.cache ) )
+                    lookups.setdefault( key, subValidator )
+            self._mxLookups = list( lookups.values() )
+
+        return self._mxLookups
+
+    def prefetch( self, value ):
+        """ resolves the domains of value in the caches of the MXLookups """
+        lookups = self._lookups()
+        if not lookups:
+            return
+
+        domains = self.domains( value )
+        for lookup in lookups:
+            lookup.prefetch( domains, self.workers )
+
+    def check( self, context, value ):
+        self.prefetch( value )
+        return self.validator.check( context, value )
+
+    def _compile( self, tags, opaque ):
+        check = self.validator._compile( tags, opaque )
+
+        def prefetchCheck( context, value ):
+            self.prefetch( value )
+            return check( context, value )
+
+        return prefetchCheck
+
+
+_labelSymbols = re.compile(r'^((([a-z][0-9])|([0-9][a-z])|([a-z0-9][a-z0-9\-]{1,2}[a-z0-9])|([a-z0-9][a-z0-9\-](([a-z0-9\-][a-z0-9])|([a-z0-9][a-z0-9\-]))[a-z0-9\-]*[a-z0-9]))|([a-z0-9]{1,2})|(xn\-\-[\-a-z0-9]*[a-z0-9]))$')
+
+_localPartSymbols = re.compile(r'^[a-z0-9!#$%&\'\*\+\-\/\=\?\^_`\{\|\}~]+(\.[a-z0-9!#$%&\'\*\+\-\/\=\?\^_`\{\|\}~]+)*$', re.I)
 
 CommonDomainPreValidaton =\
     ( String.convert().tag('string')\
@@ -56,7 +316,7 @@ ComposedDomainLabel = Compose\
             ).tag('idna')
     & cache.Set('domainLabel')
     & Len(max=63).tag('length')
-    & Match(re.compile(r'^((([a-z][0-9])|([0-9][a-z])|([a-z0-9][a-z0-9\-]{1,2}[a-z0-9])|([a-z0-9][a-z0-9\-](([a-z0-9\-][a-z0-9])|([a-z0-9][a-z0-9\-]))[a-z0-9\-]*[a-z0-9]))|([a-z0-9]{1,2})|(xn\-\-[\-a-z0-9]*[a-z0-9]))$')).tag('validSymbols')
+    & Match(_labelSymbols).tag('validSymbols')
     #& create.List( cache.Get('domainLabel'), cache.Get('domainLabelUnicode') )
     & cache.Get('domainLabelUnicode').tag('returnUnicode')
     ).paramAlias\
@@ -108,6 +368,43 @@ def __domain_save_nonidna( context, value ):
     context.cache['domainName'] = domainName
     return value
 
+# the labels of valid domains without idna labels, None for the others
+def __asciiLabels( domain ):
+    labels = domain.split('.')
+    if len( labels ) < 2:
+        return None
+
+    for label in labels:
+        if len( label ) > 63 or label.startswith('xn--')\
+        or not _labelSymbols.match( label ):
+            return None
+    return labels
+
+# the cache entries ComposedDomainLabel leaves for ascii labels
+def __cacheLabels( context, labels ):
+    cache = getattr( context, 'cache', None )
+    if cache is None:
+        cache = context.cache = {}
+
+    for label in labels:
+        cache['domainLabel'] = label
+        cache['domainLabelUnicode'] = label
+        __domain_save_nonidna( context, label )
+
+# Domain for plain ascii names, the others take the composed way
+def __domainFastPath( context, value ):
+    if value.__class__ is not str or not value.isascii():
+        return MISSING
+
+    domain = ''.join( value.split() ).lower()
+    labels = __asciiLabels( domain )
+    if labels is None:
+        return MISSING
+
+    context.value = domain
+    __cacheLabels( context, labels )
+    return '.'.join( labels )
+
 Domain = Compose\
     ( CommonDomainPreValidaton
     & Split('.').tag('split')
@@ -133,6 +430,7 @@ Domain = Compose\
         , eliminateWhiteSpace='eliminateWhiteSpace_enabled'
         , toLower='toLower_enabled'
         , resolve='resolve_enabled'
+        , rejectUnknown='mxLookup_rejectUnknown'
         , restrictToTLD= __restrictToTLDSetter
     ).messageAlias\
         ( blank=('string_blank','toLower_blank')
@@ -143,12 +441,13 @@ Domain = Compose\
         , restrictToTLD= 'restrictToTLD_fail'
         , invalidSymbols='domainLabel_invalidSymbols'
         , resolve='mxLookup_fail'
+        , resolveUnknown='mxLookup_unknown'
     ).messages\
         ( blank="Please provide a value"
         , format='Invalid domain name format, try my.domain.com'
         , restrictToTLD= 'TLD not allowed. Allowed TLDs are %(criteria)s'
         , tooLong="A domain label cannot exceed %(max)i characters"
-        )
+        ).fastPath( __domainFastPath )
 
 
 EmailLocalPart = Compose\
@@ -157,7 +456,7 @@ EmailLocalPart = Compose\
         & UpdateValue().tag('update')
         ).tag('prevalidation')
     & Len(max=64).tag('length')
-    & Match(re.compile(r'^[a-z0-9!#$%&\'\*\+\-\/\=\?\^_`\{\|\}~]+(\.[a-z0-9!#$%&\'\*\+\-\/\=\?\^_`\{\|\}~]+)*$', re.I)).tag('validSymbols')
+    & Match(_localPartSymbols).tag('validSymbols')
     ).paramAlias\
         ( convertToString='string_convert'
         , updateValue='update_enabled'
@@ -174,6 +473,35 @@ EmailLocalPart = Compose\
         )
 
 
+# Email for plain ascii addresses, the others take the composed way
+def __emailFastPath( context, value ):
+    if value.__class__ is not str or not value.isascii():
+        return MISSING
+
+    parts = ''.join( value.split() ).split( '@', 1 )
+    if len( parts ) != 2:
+        return MISSING
+
+    ( localPart, domain ) = parts
+    domain = domain.lower()
+    if len( localPart ) > 64 or not _localPartSymbols.match( localPart ):
+        return MISSING
+
+    labels = __asciiLabels( domain )
+    if labels is None:
+        return MISSING
+
+    context.value = localPart + '@' + domain
+
+    cache = getattr( context, 'cache', None )
+    if cache is None:
+        cache = context.cache = {}
+    cache['localPart'] = localPart
+    cache['domainPart'] = domain
+    __cacheLabels( context, labels )
+
+    return localPart + '@' + '.'.join( labels )
+
 Email = Compose\
     ( String.convert().tag('string')
     & EliminateWhiteSpace().tag('eliminateWhiteSpace')
@@ -214,17 +542,13 @@ Email = Compose\
         , domainPart_tooLong="Domain part is too long. Max %(max)s characters allowed per domain label"
         , domainPart_format="Invalid domain name format: %(domainPart)s"
         , domainPart_invalidSymbols="Domain part contains invalid characters: %(domainLabel)s"
-        )
+        ).fastPath( __emailFastPath )
 
 
 DateField = Compose\
     ( String.convert()
     & EliminateWhiteSpace()
-    &   ( Date.convert( '%y-%m-%d' )
-        | Date.convert( '%Y-%m-%d' )
-        | Date.convert( '%d.%m.%y' )
-        | Date.convert( '%d.%m.%Y' ).tag('dateConverter')
-        )
+    & Date.convert( [ '%y-%m-%d', '%Y-%m-%d', '%d.%m.%y', '%d.%m.%Y' ] ).tag('dateConverter')
     ).messageAlias\
         ( format='dateConverter_convert'
     ).messages\
@@ -234,11 +558,7 @@ DateField = Compose\
 DateTimeField = Compose\
     ( String.convert()
     & EliminateWhiteSpace()
-    &   ( DateTime.convert( '%y-%m-%d' )
-        | DateTime.convert( '%Y-%m-%d' )
-        | DateTime.convert( '%d.%m.%y' )
-        | DateTime.convert( '%d.%m.%Y' ).tag('dateTimeConverter')
-        )
+    & DateTime.convert( [ '%y-%m-%d', '%Y-%m-%d', '%d.%m.%y', '%d.%m.%Y' ] ).tag('dateTimeConverter')
     ).messageAlias\
         ( format='dateTimeConverter_convert'
     ).messages\
@@ -249,7 +569,7 @@ DateTimeField = Compose\
 class NestedPostConverter( ValidatorBase ):
 
 
-    def validate( self, context, value ):
+    def check( self, context, value ):
         resultset = {}
 
         for (key, val) in value.items():
@@ -0,0 +1,98 @@
+"""
+Validators and values shared by the tests which compare a faster path
+against the plain one.
+"""
+
+from kanone import *
+
+import json
+
+
+def outcome( context ):
+    """ returns what validating context shows: its result or error, the
+    context as json, errorlist and updates """
+    try:
+        result = repr( context.result )
+    except Invalid:
+        result = ( 'invalid', context.error )
+    except Exception as e:
+        return ( 'exception', type( e ).__name__ )
+
+    view = json.dumps( context, sort_keys=True, default=str )
+    return ( result, view, sorted( context.errorlist ), sorted( context.updates ) )
+
+
+def form():
+    return Schema\
+        ( 'email', web.Email()
+        , 'confirm', Match( Field('.email'), ignoreCase=True )
+        , 'age', Integer.convert() & Min(0) & Max(150)
+        , 'tags', ForEach( String() & Len( max=5 ) )
+        , 'range', Compose\
+            ( Integer.convert()
+            & Field( '/age', Integer.convert() & Max(99) ).tag('age')
+            )
+        )
+
+def cases():
+    """ returns a new list of ( validator, value ) """
+    numbers = Schema\
+        ( 'a', Integer.convert() & Min(0) & Max(10)
+        , 'b', String()
+        , 'c', Match( Field('.b') )
+        )
+    hello = String()\
+        & Tmp( alter.Lower() & In( [ 'world', 'bob' ] ) )\
+        & alter.Format( 'Hello %(value)s !' )
+
+    return\
+        [ ( web.Email(), 'Foo.Bar@Example.COM' )
+        , ( web.Email(), 'foo@bar' )
+        , ( web.Email(), 'foo@@bar.com' )
+        , ( web.Email(), '' )
+        , ( web.Email(), 42 )
+        , ( web.Domain( restrictToTLD=[ 'com', 'de' ] ), 'example.org' )
+        , ( web.Domain( restrictToTLD=[ 'com', 'de' ] ), 'example.de' )
+        , ( web.DateField(), '2020-01-31' )
+        , ( web.DateField(), '31.1.2020' )
+        , ( web.DateField(), '2020-13-01' )
+        , ( web.DateTimeField(), 'nope' )
+        , ( numbers, { 'a': '5', 'b': 'x', 'c': 'x' } )
+        , ( numbers, { 'a': '50', 'b': 'x', 'c': 'y', 'd': 1 } )
+        , ( numbers, { 'b': 'x' } )
+        , ( numbers, 42 )
+        , ( Schema( 'a', Integer(), 'b', String(), returnList=True ), [ 1, 'x' ] )
+        , ( Schema( 'a', Integer(), 'b', String(), allowExtraFields=True, createContextChildren=False ), { 'a': 1, 'b': 'x', 'z': 3 } )
+        , ( Schema( 'a', Integer(), 'b', String(), createContextChildren=False ), { 'a': 1, 'b': 'x', 'z': 3 } )
+        , ( ForEach( Integer.convert() & Min(0) & Max(1000) ), [ '1', '2', '3000', 'x' ] )
+        , ( ForEach( Integer.convert() & Min(0) & Max(1000) ), [ '1', '2', '300' ] )
+        , ( ForEach( Integer.convert() & Min(0), returnList=False, numericKeys=False ), { 'a': '1', 'b': '-1' } )
+        , ( ForEach( Integer.convert() & Min(0), createContextChildren=False ), [ '1', '-2' ] )
+        , ( ForEach( Len( min=2, max=3 ) & In( [ 'ab', 'abc', 'abcd' ] ) ), [ 'ab', 'abcd', 'a', 'zz' ] )
+        , ( ForEach( Float.convert() & Min(0.5) ), [ '1.5', 0.1, 'a' ] )
+        , ( ForEach( web.Email() ), [ 'Bob@Some.Domain.Org', 'bad', 'jack@some.domain.org' ] )
+        , ( Empty('') | String(), None )
+        , ( Empty('') | String(), 5 )
+        , ( ~In( [ 1, 2 ] ), 1 )
+        , ( ~In( [ 1, 2 ] ), 3 )
+        , ( If( Integer(), Min(3), String() ), 2 )
+        , ( If( Integer(), Min(3), String() ), 'x' )
+        , ( Tmp( Integer(), False ), 'x' )
+        , ( Tmp( Integer() ), 'x' )
+        , ( hello, 'World' )
+        , ( hello, 'Worl' )
+        , ( Item( 0, Integer() ), [ 1 ] )
+        , ( Item( 3, Integer() ), [ 1 ] )
+        , ( Call( lambda context, value: value * 2 ), 3 )
+        , ( Boolean.convert(), 'yes' )
+        , ( List.convert(), ( 1, 2 ) )
+        , ( Missing(), MISSING )
+        , ( Blank(''), None )
+        , ( Len( min=2 ), 'a' )
+        , ( In( [ [1], [2] ] ), [2] )
+        , ( In( [ [1], [2] ] ), [3] )
+        , ( web.NestedPost(), { 'a.b': 1, 'a.c': 2 } )
+        , ( form(), { 'email': 'Bob@Some.Domain.Org', 'confirm': 'bob@some.domain.org', 'age': '30', 'tags': [ 'a', 'b' ], 'range': '5' } )
+        , ( form(), { 'email': 'Bob@Some.Domain.Org', 'confirm': 'jack@some.domain.org', 'age': '120', 'tags': [ 'a', 'abcdefg', 3 ], 'range': 'x' } )
+        , ( form(), { 'email': 'bad', 'age': 'x' } )
+        ]
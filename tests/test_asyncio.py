@@ -0,0 +1,154 @@
+"""
+kanone.adapter.asyncio against the synchronous path.
+"""
+
+from kanone import *
+from kanone.adapter import asyncio as kasyncio
+from kanone.adapter import native
+
+from cases import cases, outcome
+
+from copy import deepcopy
+import asyncio, gc, pickle, pytest, random, weakref
+
+
+async def asyncIdentity( context, value ):
+    return value
+
+def asyncSchema():
+    return Schema\
+        ( 'a', Integer()
+        , 'b', Call( asyncIdentity )
+        , 'c', ForEach( String() & Call( asyncIdentity ) )
+        )
+
+
+def test_plans_freed():
+    refs = []
+
+    async def perRequest():
+        for run in range( 20 ):
+            validator = asyncSchema()
+            refs.append( weakref.ref( validator ) )
+            assert await kasyncio.result( validator.context( { 'a': 1, 'b': 2, 'c': [ 'x' ] } ) ) \
+                == { 'a': 1, 'b': 2, 'c': [ 'x' ] }
+
+    asyncio.run( perRequest() )
+    gc.collect()
+    assert [ ref for ref in refs if ref() is not None ] == []
+
+def test_plans_kept():
+    validator = asyncSchema()
+    value = { 'a': 1, 'b': 2, 'c': [ 'x' ] }
+    asyncio.run( kasyncio.check( validator.context( value ) ) )
+    plans = list( validator._asyncPlans )
+    asyncio.run( kasyncio.check( validator.context( value ) ) )
+    assert validator._asyncPlans == plans
+
+    # pickles and copies make plans of their own
+    validator = Schema( 'a', Integer() )
+    asyncio.run( kasyncio.check( validator.context( { 'a': 1 } ) ) )
+    unpickled = pickle.loads( pickle.dumps( validator ) )
+    assert asyncio.run( kasyncio.check( unpickled.context( { 'a': 1 } ) ) ) == { 'a': 1 }
+    assert unpickled._asyncPlans[0][1] is not validator._asyncPlans[0][1]
+
+
+def syncOutcome( validator, value ):
+    context = validator.context( value )
+    return ( repr( context.check() ), outcome( context ) )
+
+def asyncOutcome( validator, value ):
+    context = validator.context( value )
+    result = asyncio.run( kasyncio.check( context ) )
+    return ( repr( result ), outcome( context ) )
+
+def compareCases():
+    mismatches = []
+    for ( validator, value ) in cases():
+        expected = syncOutcome( validator, deepcopy( value ) )
+        got = asyncOutcome( validator, deepcopy( value ) )
+        if got != expected:
+            mismatches.append( ( validator, value, expected, got ) )
+    return mismatches
+
+def test_same_as_sync():
+    assert compareCases() == []
+
+def test_async_leaves_same_as_sync( monkeypatch ):
+    # every validator without subvalidators takes the asynchronous path and
+    # gives way to the others a few times, so they finish in another order
+    isAsync = kasyncio._isAsync
+    def leafAsync( validator ):
+        subValidators = []
+        validator.appendSubValidators( subValidators )
+        return isAsync( validator ) or not subValidators
+
+    asyncValidator = kasyncio._asyncValidator
+    rand = random.Random( 10 )
+    def yielding( validator ):
+        check = asyncValidator( validator )
+        async def yieldingCheck( context, value ):
+            for run in range( rand.randint( 0, 3 ) ):
+                await asyncio.sleep( 0 )
+            return await check( context, value )
+        return yieldingCheck
+
+    monkeypatch.setattr( kasyncio, '_isAsync', leafAsync )
+    monkeypatch.setattr( kasyncio, '_asyncValidator', yielding )
+    for run in range( 3 ):
+        assert compareCases() == []
+
+
+def test_async_values_same_as_sync():
+    validator = Schema\
+        ( 'email', web.Email()
+        , 'confirm', Call( asyncIdentity ) & Match( Field('.email'), ignoreCase=True )
+        , 'items', ForEach( Call( asyncIdentity ) & Integer.convert() & Max(5) )
+        )
+    plain = Schema\
+        ( 'email', web.Email()
+        , 'confirm', Match( Field('.email'), ignoreCase=True )
+        , 'items', ForEach( Integer.convert() & Max(5) )
+        )
+
+    for value in\
+        ( { 'email': 'Bob@Some.Domain.Org', 'confirm': 'bob@some.domain.org', 'items': [ '1', 2 ] }
+        , { 'email': 'Bob@Some.Domain.Org', 'confirm': 'jack@some.domain.org', 'items': [ '1', 'x', 7 ] }
+        , { 'email': 'bad', 'items': 5 }
+        , 42
+        ):
+        assert asyncOutcome( validator, deepcopy( value ) ) == syncOutcome( plain, deepcopy( value ) )
+
+
+def test_decorator_same_as_native():
+    schema = Schema\
+        ( 'someString', Missing('bob') | String()
+        , 'someInt', Integer()
+        , 'numbers', Blank([]) | Len(min=3) & ForEach( Integer() )
+        )
+
+    def someFunc( skipMe, someString, someInt, *numbers ):
+        return ( skipMe, someString, someInt, numbers )
+
+    async def asyncFunc( skipMe, someString, someInt, *numbers ):
+        return ( skipMe, someString, someInt, numbers )
+
+    def onInvalid( error ):
+        return ( 'invalid', sorted( error.context.errorlist ) )
+
+    plain = native.validate( schema, exclude=( 'skipMe', ), onInvalid=onInvalid )( someFunc )
+    decorated = kasyncio.validate( schema, exclude=( 'skipMe', ), onInvalid=onInvalid )( someFunc )
+    awaited = kasyncio.validate( schema, exclude=( 'skipMe', ), onInvalid=onInvalid )( asyncFunc )
+
+    for ( args, kwargs ) in\
+        ( ( ( 'skipped', ), { 'someInt': 1 } )
+        , ( ( 'skipped', 'x', 2, 1, 2, 3 ), {} )
+        , ( ( 'skipped', 'x', 2, 1 ), {} )
+        , ( ( 'skipped', 5, 'y' ), {} )
+        ):
+        expected = plain( *args, **kwargs )
+        assert asyncio.run( decorated( *args, **kwargs ) ) == expected
+        assert asyncio.run( awaited( *args, **kwargs ) ) == expected
+
+    with pytest.raises( Invalid ):
+        asyncio.run( kasyncio.validate( schema, exclude=( 'skipMe', ) )( someFunc )( 'skipped', 5, 'y' ) )
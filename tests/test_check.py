@@ -0,0 +1,66 @@
+"""
+The returning protocol ( check ) against the raising one ( validate ).
+"""
+
+from kanone import *
+from kanone.validator.core import ValidatorBase
+
+from cases import cases, outcome
+
+from copy import deepcopy
+
+
+class Raising( ValidatorBase ):
+    """ implements validate only, like validators written before check """
+
+    def __init__( self, validator ):
+        self.validator = validator
+
+    def validate( self, context, value ):
+        return self.validator.validate( context, value )
+
+    def appendSubValidators( self, subValidators ):
+        subValidators.append( self.validator )
+
+
+def raisingOutcome( context ):
+    try:
+        return ( 'valid', context.validate() )
+    except Invalid as e:
+        return ( 'invalid', e )
+
+def test_context_check():
+    for ( validator, value ) in cases():
+        context = validator.context( deepcopy( value ) )
+        result = context.check()
+
+        expected = validator.context( deepcopy( value ) )
+        ( kind, raised ) = raisingOutcome( expected )
+        assert isinstance( result, Invalid ) == ( kind == 'invalid' )
+        assert repr( result ) == repr( raised )
+        assert outcome( context ) == outcome( expected )
+
+
+combinators =\
+    [ lambda validator: Or( validator, Integer() )
+    , lambda validator: Or( validator, validator )
+    , lambda validator: Not( validator )
+    , lambda validator: If( validator, Pass(), Integer() )
+    , lambda validator: If( validator, validator )
+    , lambda validator: Tmp( validator )
+    , lambda validator: Tmp( validator, False )
+    , lambda validator: And( validator, validator )
+    , lambda validator: ForEach( validator )
+    ]
+
+def test_combinators_same_as_raising():
+    mismatches = []
+
+    for combine in combinators:
+        for ( validator, value ) in cases():
+            expected = outcome( combine( Raising( validator ) ).context( deepcopy( value ) ) )
+            got = outcome( combine( validator ).context( deepcopy( value ) ) )
+            if got != expected:
+                mismatches.append( ( validator, value, expected, got ) )
+
+    assert mismatches == []
@@ -0,0 +1,113 @@
+"""
+Schema( ..., codegen=True ) against the interpreted field loop.
+"""
+
+from kanone import *
+
+from copy import deepcopy
+import json, pickle, random
+
+leaves =\
+    [ lambda: Integer.convert()
+    , lambda: String()
+    , lambda: Pass()
+    , lambda: Missing() | Integer()
+    , lambda: String() & Len(max=3)
+    , lambda: Integer.convert() & Min(3)
+    , lambda: web.Email()
+    ]
+
+def leafValue( rand ):
+    return rand.choice( [ '1', 'abc', 5, '', None, 'abcdef', 2, 'Bob@Some.Domain.Org' ] )
+
+
+def outcome( validator, value ):
+    context = validator.context( value )
+    try:
+        result = context.check()
+    except Exception as e:
+        return ( 'exception', type( e ).__name__ )
+
+    view = json.dumps( context, sort_keys=True, default=str )
+    if isinstance( result, Invalid ):
+        return ( 'invalid', context.error, view, context.errorlist )
+    return ( repr( result ), view, context.errorlist, context.updates )
+
+
+def corpus( rand, size ):
+    """ yields ( interpreted, generated, value ) with valid, invalid, missing
+    and extra fields """
+    for run in range( size ):
+        keys = [ 'f%i' % pos for pos in range( rand.randint( 1, 6 ) ) ]
+        fields = []
+        for key in keys:
+            fields += [ key, rand.choice( leaves )() ]
+
+        interpreted = Schema\
+            ( *fields
+            , allowExtraFields=rand.random() < .5
+            , returnList=rand.random() < .5
+            , createContextChildren=rand.random() < .6
+            )
+        generated = interpreted( codegen=True )
+
+        kind = rand.choice( [ 'dict', 'missing', 'extra', 'list', 'tuple', 'set', 'other', 'nested' ] )
+        if kind == 'dict':
+            value = dict( ( key, leafValue( rand ) ) for key in keys )
+        elif kind == 'missing':
+            value = dict( ( key, leafValue( rand ) ) for key in keys if rand.random() < .7 )
+        elif kind == 'extra':
+            value = dict( ( key, leafValue( rand ) ) for key in keys + [ 'x', 'y' ] )
+        elif kind in ( 'list', 'tuple' ):
+            value = [ leafValue( rand ) for pos in range( rand.randint( 0, len( keys )+2 ) ) ]
+            if kind == 'tuple':
+                value = tuple( value )
+        elif kind == 'set':
+            value = set( leafValue( rand ) for pos in range( rand.randint( 0, 2 ) ) )
+        elif kind == 'nested':
+            interpreted = Schema( 's', interpreted, 'z', Integer() )
+            generated = Schema( 's', generated, 'z', Integer() )
+            value = { 's': dict( ( key, leafValue( rand ) ) for key in keys ), 'z': 1 }
+        else:
+            value = 42
+
+        yield interpreted, generated, value
+
+
+def test_generated_same_as_interpreted():
+    rand = random.Random( 5 )
+    mismatches = []
+
+    for ( interpreted, generated, value ) in corpus( rand, 1500 ):
+        expected = outcome( interpreted, deepcopy( value ) )
+        for validator in ( generated, generated.compile() ):
+            got = outcome( validator, deepcopy( value ) )
+            if got != expected:
+                mismatches.append( ( value, expected, got ) )
+
+    assert mismatches == []
+
+
+def test_field_references():
+    fields =\
+        ( 'email', web.Email()
+        , 'confirm', Match( Field('.email'), ignoreCase=True )
+        , 'count', Integer.convert()
+        )
+    values =\
+        [ { 'email': 'Bob@Some.Domain.Org', 'confirm': 'bob@some.domain.org', 'count': '1' }
+        , { 'email': 'Bob@Some.Domain.Org', 'confirm': 'jack@some.domain.org', 'count': 'x' }
+        , { 'confirm': 'bob@some.domain.org' }
+        , { 'email': 'bob@some.org', 'confirm': 'bob@some.org', 'count': 1, 'extra': 2 }
+        ]
+
+    for createContextChildren in ( True, False ):
+        schema = Schema( *fields, createContextChildren=createContextChildren )
+        for value in values:
+            assert outcome( schema( codegen=True ), value ) == outcome( schema, value )
+
+
+def test_pickled():
+    schema = pickle.loads( pickle.dumps( Schema( 'a', Integer(), codegen=True ) ) )
+    assert schema._generated is not None
+    assert schema.context( { 'a': 1 } ).result == { 'a': 1 }
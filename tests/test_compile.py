@@ -0,0 +1,32 @@
+"""
+Compiled validators against the validators they were compiled from.
+"""
+
+from kanone import *
+
+from cases import cases, form, outcome
+
+from copy import deepcopy
+
+
+def test_compiled_same_as_plain():
+    mismatches = []
+
+    for ( validator, value ) in cases():
+        expected = outcome( validator.context( deepcopy( value ) ) )
+        compiled = validator.compile()
+        for run in range( 2 ):
+            got = outcome( compiled.context( deepcopy( value ) ) )
+            if got != expected:
+                mismatches.append( ( validator, value, expected, got ) )
+
+    assert mismatches == []
+
+
+def test_compiled_child():
+    value = { 'form': { 'email': 'Bob@Some.Domain.Org', 'confirm': 'jack@some.domain.org', 'age': '1', 'tags': [], 'range': '3' } }
+    plain = Schema( 'form', form() )
+    compiled = Schema( 'form', form().compile() )
+
+    assert outcome( compiled.context( deepcopy( value ) ) ) == outcome( plain.context( deepcopy( value ) ) )
+    assert outcome( plain.compile().context( deepcopy( value ) ) ) == outcome( plain.context( deepcopy( value ) ) )
@@ -0,0 +1,214 @@
+from kanone import *
+from kanone.validator import web
+
+from copy import deepcopy
+import json, pprint, random
+
+
+def people():
+    return Schema\
+        ( 'people'
+            , ForEach\
+                ( Schema
+                    ( 'email', web.Email()
+                    , 'confirm', Match( Field('.email'), ignoreCase=True )
+                    )
+                )
+        )
+
+peopleValue = \
+    { 'people':
+        [ { 'email': 'Bob@Some.Domain.Org', 'confirm': 'bob@some.domain.org' }
+        , { 'email': 'Jack@Some.Domain.Org', 'confirm': 'JACK@some.domain.org' }
+        ]
+    }
+
+peopleResult = \
+    { 'people':
+        [ { 'email': 'Bob@some.domain.org', 'confirm': 'bob@some.domain.org' }
+        , { 'email': 'Jack@some.domain.org', 'confirm': 'JACK@some.domain.org' }
+        ]
+    }
+
+
+def test_read_child_first():
+    context = people().context( peopleValue )
+    assert context( 'people.0.email' ).result == 'Bob@some.domain.org'
+    assert context( 'people.1.confirm' ).result == 'JACK@some.domain.org'
+    assert context.result == peopleResult
+    assert context.errorlist == []
+
+
+def test_read_child_first_updates():
+    context = people().context( peopleValue )
+    context( 'people.0.email' ).result
+    assert context.updates == [ '/people.0.email', '/people.1.email' ]
+
+    context = people().context( peopleValue )
+    context.result
+    assert context.updates == [ '/people.0.email', '/people.1.email' ]
+
+
+def test_flat_updates():
+    validator = Schema( 'e', web.Email(), 'n', String() )
+    value = { 'e': 'bob@Some.Domain.Org', 'n': 'bob' }
+
+    context = validator.context( value )
+    assert context( 'e' ).result == 'bob@some.domain.org'
+    assert context.updates == [ '/e' ]
+    assert context.result == { 'e': 'bob@some.domain.org', 'n': 'bob' }
+    assert context.updates == [ '/e' ]
+
+    context = validator.context( value )
+    assert context.result == { 'e': 'bob@some.domain.org', 'n': 'bob' }
+    assert context.updates == [ '/e' ]
+
+    # another field changes, the update of e is kept
+    context( 'n' ).value = 'jack'
+    assert context.result == { 'e': 'bob@some.domain.org', 'n': 'jack' }
+    assert context.updates == [ '/e' ]
+
+    # a new value for e replaces its update
+    context( 'e' ).value = 'jack@Some.Domain.Org'
+    assert context.result == { 'e': 'jack@some.domain.org', 'n': 'jack' }
+    assert context.updates == [ '/e' ]
+
+
+def test_update_child_value():
+    context = people().context( peopleValue )
+    context.result
+
+    context( 'people.1.confirm' ).value = 'jill@some.domain.org'
+    try:
+        context.result
+    except Invalid:
+        pass
+    else:
+        assert False, 'confirm must not match'
+    assert context.errorlist == [ '/people.1.confirm' ]
+
+    context( 'people.1.confirm' ).value = 'jack@some.domain.org'
+    assert context.result[ 'people' ][ 1 ][ 'confirm' ] == 'jack@some.domain.org'
+    assert context.errorlist == []
+
+
+def test_pprint():
+    context = people().context\
+        ( { 'people': [ { 'email': 'Bob@Some.Domain.Org', 'confirm': 'jack@some.domain.org' } ] }
+        )
+    try:
+        context.result
+    except Invalid:
+        pass
+
+    view = json.loads( json.dumps( context ) )
+    assert '\n' in pprint.pformat( context )
+    assert pprint.pformat( context ) == pprint.pformat( view )
+    assert repr( context ) == repr( context.copy() )
+
+
+def outcome( context ):
+    try:
+        result = repr( context.result )
+    except Invalid:
+        result = context.error
+    return result, sorted( context.errorlist ), sorted( context.updates )
+
+def form():
+    def sumA( context, value ):
+        a = context.parent( 'a' ).value
+        if isinstance( a, str ) and a.isdigit():
+            return int( a ) + int( value )
+        return value
+
+    return Schema\
+        ( 'a', Integer.convert()
+        , 'b', web.Email()
+        , 'c', Match( Field('.b'), ignoreCase=True )
+        , 'd', Compose( Integer.convert() & Field( '/a', Integer.convert() & Max(5) ).tag('a') )
+        , 'e', Integer.convert() & Call( sumA )
+        , 'f', Schema( 'p', Integer.convert(), 'q', Field( '/a', useResult=True ) )
+        , 'g', ForEach( Integer.convert() )
+        , 'h', Field( '.d', useResult=True, copy=True )
+        )
+
+formValue = \
+    { 'a': '1', 'b': 'bob@Some.Domain.Org', 'c': 'bob@some.domain.org', 'd': '4'
+    , 'e': '2', 'f': { 'p': '1', 'q': 0 }, 'g': [ '1', '2', '3' ], 'h': None
+    }
+
+def test_incremental_call():
+    validator = Schema( 'a', Integer(), 'b', Call( lambda context, value: context.parent( 'a' ).value + value ) )
+    context = validator.context( { 'a': 1, 'b': 2 } )
+    assert context.result == { 'a': 1, 'b': 3 }
+
+    context( 'a' ).value = 5
+    assert outcome( context ) == outcome( validator.context( { 'a': 5, 'b': 2 } ) )
+    assert context.result == { 'a': 5, 'b': 7 }
+
+def test_incremental_composed_field():
+    validator = Schema\
+        ( 'a', Compose( Integer() & Field( '/b', Integer() ).tag('b') )
+        , 'b', Integer.convert()
+        )
+    context = validator.context( { 'a': 1, 'b': 2 } )
+    context.result
+
+    context( 'b' ).value = 'x'
+    assert outcome( context ) == outcome( validator.context( { 'a': 1, 'b': 'x' } ) )
+    assert sorted( context.errorlist ) == [ '/a', '/b' ]
+
+def test_incremental_same_as_fresh():
+    rand = random.Random( 18 )
+    choices =\
+        { 'a': [ '1', '7', 'x' ]
+        , 'b': [ 'bob@Some.Domain.Org', 'jack@some.org', 'bad' ]
+        , 'c': [ 'bob@some.domain.org', 'JACK@some.org', 'jack' ]
+        , 'd': [ '4', '9', 'x' ]
+        , 'e': [ '2', 'x' ]
+        , 'f.p': [ '1', 'x' ]
+        , 'f.q': [ 0, 1 ]
+        , 'g.0': [ '1', 'x' ]
+        , 'g.2': [ '3', 'y' ]
+        , 'h': [ None, 3 ]
+        }
+    validator = form()
+    mismatches = []
+
+    for run in range( 30 ):
+        value = deepcopy( formValue )
+        context = validator.context( deepcopy( value ) )
+        outcome( context )
+
+        for change in range( 8 ):
+            path = rand.choice( sorted( choices ) )
+            new = rand.choice( choices[ path ] )
+            context( path ).value = new
+
+            keys = path.split( '.' )
+            container = value
+            for key in keys[ :-1 ]:
+                container = container[ key ]
+            if isinstance( container, list ):
+                container[ int( keys[-1] ) ] = new
+            else:
+                container[ keys[-1] ] = new
+
+            if rand.random() < .6:
+                expected = outcome( validator.context( deepcopy( value ) ) )
+                got = outcome( context )
+                if got != expected:
+                    mismatches.append( ( path, new, value, expected, got ) )
+
+    assert mismatches == []
+
+def test_incremental_foreach():
+    validator = ForEach( Integer.convert() )
+    context = validator.context( [ '1', '2', '3' ] )
+    assert context.result == [ 1, 2, 3 ]
+
+    context( '1' ).value = 'x'
+    assert outcome( context ) == outcome( validator.context( [ '1', 'x', '3' ] ) )
+    context( '1' ).value = '5'
+    assert context.result == [ 1, 5, 3 ]
+    assert context.errorlist == []
@@ -0,0 +1,113 @@
+from kanone import *
+from kanone.validator import check
+
+from cases import outcome
+
+from functools import partial
+import operator, pickle, random
+
+
+# unhashable, equal to hashable values
+class Like( object ):
+    __hash__ = None
+
+    def __init__( self, text ):
+        self.text = text
+
+    def __eq__( self, other ):
+        return isinstance( other, str ) and other.lower() == self.text
+
+    def __repr__( self ):
+        return 'Like(%r)' % self.text
+
+def randomItems( rand ):
+    pool =\
+        [ 0, 1, 2, 1.0, 2.5, True, False, None, '', 'a', 'b', 'ab', u'\xe4'
+        , ( 1, 2 ), ( 'a', ), [ 1 ], [ 1, 2 ], [], { 'a': 1 }, {}
+        , float( 'nan' ), b'a', Like( 'c' ), 'C'
+        ]
+    return [ rand.choice( pool ) for pos in range( rand.randint( 0, 8 ) ) ], pool
+
+def test_in_same_as_linear( monkeypatch ):
+    rand = random.Random( 21 )
+    mismatches = []
+
+    for run in range( 300 ):
+        ( items, pool ) = randomItems( rand )
+        criteria = rand.choice( [ list, tuple ] )( items )
+
+        indexed = In( criteria )
+        with monkeypatch.context() as patch:
+            # how In looked values up before the index
+            patch.setattr( check, '_membership', lambda criteria: partial( operator.contains, criteria ) )
+            linear = In( criteria )
+            notLinear = ~In( criteria )
+        notIndexed = ~In( criteria )
+
+        for value in pool + [ 3, 'c', ( 1, ), [ 2 ] ]:
+            for ( validator, plain ) in ( ( indexed, linear ), ( notIndexed, notLinear ) ):
+                expected = outcome( plain.context( value ) )
+                got = outcome( validator.context( value ) )
+                if got != expected:
+                    mismatches.append( ( criteria, value, expected, got ) )
+
+    assert mismatches == []
+
+def test_in_unpickled():
+    validator = pickle.loads( pickle.dumps( In( [ 1, [ 2 ], 'a' ] ) ) )
+    assert validator.context( [ 2 ] ).result == [ 2 ]
+    assert validator.context( 'a' ).result == 'a'
+    assert validator.context( 3 ).check().__class__ is Invalid
+
+def test_sorted_same_as_list():
+    rand = random.Random( 22 )
+    mismatches = []
+
+    for run in range( 300 ):
+        if rand.random() < .5:
+            items = [ rand.randint( -5, 5 ) for pos in range( rand.randint( 0, 10 ) ) ]
+        else:
+            items = [ rand.choice( [ '', 'a', 'ab', 'b', 'ba', u'\xe4' ] ) for pos in range( rand.randint( 0, 6 ) ) ]
+        criteria = SortedCriteria( items )
+
+        for value in [ -6, -5, 0, 1.0, 5, 6, True, '', 'a', 'ab', 'c', u'\xe4', None, [ 1 ] ]:
+            if ( value in criteria ) != ( value in items ):
+                mismatches.append( ( items, value ) )
+
+        if sorted( set( items ) ) != list( criteria ) or len( set( items ) ) != len( criteria ):
+            mismatches.append( ( items, list( criteria ) ) )
+
+    assert mismatches == []
+
+# the criteria differ in the error messages
+def verdict( validator, value ):
+    try:
+        return ( 'valid', validator.context( value ).result )
+    except Invalid as e:
+        return ( 'invalid', e.key )
+
+def test_mapped_same_as_list( tmp_path ):
+    rand = random.Random( 23 )
+    words = [ '', 'a', 'aa', 'ab', 'b', 'ba', 'bb', u'\xe4', u'\xe4b', 'a b', 'z' * 20 ]
+    mismatches = []
+
+    for run in range( 200 ):
+        items = [ rand.choice( words ) for pos in range( rand.randint( 0, 12 ) ) ]
+        path = str( tmp_path / ( 'criteria%i' % run ) )
+        criteria = MappedCriteria.write( path, items )
+
+        for value in words + [ 'c', 'a\n', 'a\nb', 1, None, b'a' ]:
+            if ( value in criteria ) != ( value in items ):
+                mismatches.append( ( items, value ) )
+
+        if sorted( set( items ) ) != sorted( criteria ) or len( set( items ) ) != len( criteria ):
+            mismatches.append( ( items, list( criteria ) ) )
+
+        validator = pickle.loads( pickle.dumps( In( criteria ) ) )
+        for value in words + [ 1, None ]:
+            expected = verdict( In( items ), value )
+            got = verdict( validator, value )
+            if got != expected:
+                mismatches.append( ( items, value, expected, got ) )
+
+    assert mismatches == []
@@ -0,0 +1,110 @@
+from kanone import *
+from kanone.validator import basic
+from kanone.validator.alter import EliminateWhiteSpace
+from kanone.validator.dateformat import DateParser
+
+from cases import outcome
+
+from datetime import date, datetime
+import random
+
+
+formats =\
+    [ '%y-%m-%d', '%Y-%m-%d', '%d.%m.%y', '%d.%m.%Y', '%Y%m%d', '%d/%m/%Y %H:%M'
+    , '%Y-%m-%dT%H:%M:%S.%f', '%m%d%y', '%H%M %Y', '%d %b %Y', '%Y-%m-%d %H'
+    , '%y%m%d%H'
+    ]
+
+# how dates were parsed before DateParser
+def strptimeParser( formats, returnDate ):
+    if isinstance( formats, str ):
+        formats = [ formats ]
+
+    def parse( value ):
+        for format in formats:
+            try:
+                result = datetime.strptime( value, format )
+            except ValueError:
+                continue
+            return returnDate and result.date() or result
+
+    return parse
+
+def randomValue( rand, formats ):
+    if rand.random() < .5:
+        return ''.join( rand.choice( '0123456789-. ' ) for pos in range( rand.randint( 1, 12 ) ) )
+
+    value = datetime\
+        ( rand.randint( 1, 9999 ), rand.randint( 1, 12 ), rand.randint( 1, 28 )
+        , rand.randint( 0, 23 ), rand.randint( 0, 59 ), rand.randint( 0, 59 )
+        , rand.randint( 0, 999999 )
+        ).strftime( rand.choice( formats ) )
+    if rand.random() < .3:
+        pos = rand.randrange( len( value ) + 1 )
+        value = value[ :pos ] + rand.choice( '0123456789- .' ) + value[ pos: ]
+    if rand.random() < .2:
+        value = value.replace( '0', '', 1 )
+    return value
+
+def test_parser_same_as_strptime():
+    rand = random.Random( 22 )
+    mismatches = []
+
+    for run in range( 80 ):
+        chosen = rand.sample( formats, rand.randint( 1, 5 ) )
+        for returnDate in ( True, False ):
+            parse = DateParser( tuple( chosen ), returnDate ).parse
+            reference = strptimeParser( chosen, returnDate )
+            for pos in range( 100 ):
+                value = randomValue( rand, chosen )
+                expected = reference( value )
+                got = parse( value )
+                if got != expected or type( got ) is not type( expected ):
+                    mismatches.append( ( chosen, value, expected, got ) )
+
+    assert mismatches == []
+
+def chainField( converter, tag ):
+    return Compose\
+        ( String.convert()
+        & EliminateWhiteSpace()
+        &   ( converter.convert( '%y-%m-%d' )
+            | converter.convert( '%Y-%m-%d' )
+            | converter.convert( '%d.%m.%y' )
+            | converter.convert( '%d.%m.%Y' ).tag( tag )
+            )
+        ).messageAlias\
+            ( format=tag + '_convert'
+        ).messages\
+            ( format='Invalid date format ( try YY(YY)-MM-DD or DD.MM.YY(YY) )'
+            )
+
+def test_fields_same_as_chain( monkeypatch ):
+    with monkeypatch.context() as patch:
+        patch.setattr( basic, '_dateParser', strptimeParser )
+        chains =\
+            [ ( web.DateField(), chainField( Date, 'dateConverter' ) )
+            , ( web.DateTimeField(), chainField( DateTime, 'dateTimeConverter' ) )
+            , ( web.DateField().messages( format='Bad %(value)s' ), chainField( Date, 'dateConverter' ).messages( format='Bad %(value)s' ) )
+            , ( Date.convert( [ '%d.%m.%Y', '%Y-%m-%d' ] ), Date.convert( '%d.%m.%Y' ) | Date.convert( '%Y-%m-%d' ) )
+            ]
+
+    rand = random.Random( 23 )
+    values =\
+        [ '2020-01-05', '20-01-05', '5.1.20', '05.01.2020', '2020-1-5', ' 2020 - 01 - 05 '
+        , '2020-02-30', '20-02-30', '1.2.69', '1.2.68', '2020-00-01', '0000-01-01'
+        , u'２０２０-01-05', 'abc', '', None, 5, date( 2020, 1, 2 )
+        , datetime( 2020, 1, 2, 3, 4 ), '2020-13-01', '31.4.2020', '29.2.2021'
+        , '29.2.2020', '2020-1-05x', '2020-01-05T10:00', '1.1.1', '99-9-9'
+        ]
+    values += [ randomValue( rand, formats[ :4 ] ) for pos in range( 300 ) ]
+
+    mismatches = []
+    for ( validator, chain ) in chains:
+        for value in values:
+            expected = outcome( chain.context( value ) )
+            got = outcome( validator.context( value ) )
+            if got != expected:
+                mismatches.append( ( value, expected, got ) )
+
+    assert mismatches == []
@@ -0,0 +1,41 @@
+"""
+Values in error messages are abbreviated and cut.
+"""
+
+from kanone import *
+from kanone.error import valueToString, MAX_VALUE_LENGTH
+
+import datetime, decimal
+
+
+def test_small_values():
+    for value in ( 'abc', 5, 1.5, None, [ 1, 2 ], { 'a': 1 }, datetime.date( 2020, 1, 2 ), decimal.Decimal( '1.5' ) ):
+        assert valueToString( value ) == str( value )
+    assert valueToString( b'caf\xc3\xa9' ) == u'caf\xe9'
+
+
+def test_long_string():
+    text = valueToString( 'x' * 10**6 )
+    assert len( text ) == MAX_VALUE_LENGTH + 3
+    assert text.endswith( 'x...' )
+
+    assert len( valueToString( b'x' * 10**6 ) ) == MAX_VALUE_LENGTH + 3
+
+
+def test_nested_values():
+    text = valueToString( { 'a': list( range( 10**6 ) ) } )
+    assert text.startswith( "{'a': [0, 1, 2" ) and text.endswith( ', ...]}' )
+    assert len( text ) < 100
+
+    text = valueToString( [ [ [ [ [ 1 ] ] ] ] ] )
+    assert '...' in text and '1' not in text
+
+    text = valueToString( [ 'y' * 10**6 ] * 10**6 )
+    assert len( text ) <= MAX_VALUE_LENGTH + 3 and text.endswith( '...' )
+
+
+def test_error_message():
+    validator = Integer().messages( type='not an integer: %(value)s' )
+    context = validator.context( [ 'x' * 10**6 ] * 1000 )
+    assert isinstance( context.check(), Invalid )
+    assert len( context.error ) < 2 * MAX_VALUE_LENGTH
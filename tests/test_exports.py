@@ -0,0 +1,33 @@
+import subprocess, sys
+
+
+# in a process of its own, the submodules other tests load are no names yet
+def exported():
+    output = subprocess.check_output\
+        ( [ sys.executable, '-c', 'from kanone import *; print( "\\n".join( dir() ) )' ]
+        , universal_newlines=True
+        )
+    return output.split()
+
+
+def test_memoize_exports():
+    namespace = exported()
+    assert 'Memoize' in namespace
+    for name in ( 'OrderedDict', 'threading', 'time', 'Set', 'Get', 'impurities' ):
+        assert name not in namespace, name
+
+
+def test_check_exports():
+    namespace = exported()
+    for name in ( 'In', 'SortedCriteria', 'MappedCriteria' ):
+        assert name in namespace, name
+    for name in ( 'os', 'mmap', 'bisect', 'operator', 'partial' ):
+        assert name not in namespace, name
+
+
+def test_schema_exports():
+    namespace = exported()
+    for name in ( 'Schema', 'ForEach', 'Field' ):
+        assert name in namespace, name
+    for name in ( 'Pool', 'parallel', 'generate', 'codegen', 'warnings', 'parseFieldPath' ):
+        assert name not in namespace, name
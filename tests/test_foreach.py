@@ -0,0 +1,99 @@
+from kanone import *
+from kanone.validator import web
+
+import json, pytest, random
+
+
+def outcome( validator, value ):
+    context = validator.context( value )
+    try:
+        result = context.result
+    except Invalid:
+        result = None
+    return ( result, context.errorlist, context.updates, context.error )
+
+
+def test_lazy_updates():
+    value = [ 'Bob@Some.Domain.Org', 'bad', 'Jack@Some.Domain.Org', 'jill@some.domain.org' ]
+
+    eager = outcome( ForEach( web.Email() ), value )
+    lazy = outcome( ForEach( web.Email(), lazyChildren=True ), value )
+
+    assert eager[2] == [ '/0', '/2', '/3' ]
+    assert lazy == eager
+
+
+def test_lazy_nested_updates():
+    item = Schema\
+        ( 'email', web.Email()
+        , 'confirm', Match( Field('.email'), ignoreCase=True )
+        )
+    value = \
+        [ { 'email': 'Bob@Some.Domain.Org', 'confirm': 'bob@some.domain.org' }
+        , { 'email': 'Jack@Some.Domain.Org', 'confirm': 'jill@some.domain.org' }
+        , { 'email': 'Jill@Some.Domain.Org', 'confirm': 'jill@some.domain.org' }
+        ]
+
+    eager = outcome( ForEach( item ), value )
+    lazy = outcome( ForEach( item, lazyChildren=True ), value )
+
+    assert eager[1] == [ '/1.confirm' ]
+    assert eager[2] == [ '/0.email', '/1.email', '/2.email' ]
+    assert lazy == eager
+
+
+def test_lazy_valid():
+    value = [ 'Bob@Some.Domain.Org', 'jack@some.domain.org' ]
+
+    eager = ForEach( web.Email() ).context( value )
+    lazy = ForEach( web.Email(), lazyChildren=True ).context( value )
+
+    assert lazy.result == eager.result
+    assert lazy.updates == eager.updates == [ '/0', '/1' ]
+    assert json.loads( json.dumps( lazy ) )[ 'updates' ] == [ '/0', '/1' ]
+
+
+vectorLinks =\
+    [ lambda: Integer()
+    , lambda: Integer.convert()
+    , lambda: Float()
+    , lambda: Float.convert()
+    , lambda: Min( 3 )
+    , lambda: Max( 1000 )
+    , lambda: Min( 2.5 )
+    , lambda: Max( 2**60 )
+    , lambda: Len( min=1, max=3 )
+    , lambda: In( [ 1, 5, 7.0, 'a', '12' ] )
+    ]
+
+vectorItems =\
+    [ 0, 1, 5, 7, 12, 2000, -3, 2**53 + 1, 2**70, True, False
+    , 2.5, 7.0, 1e300, float( 'nan' )
+    , '1', '12', 'a', 'abcd', '', ' 5', '2.5', '1e3'
+    ]
+
+def vectorOutcome( validator, value ):
+    try:
+        return outcome( validator, value )
+    except Exception as e:
+        return ( 'exception', type( e ).__name__ )
+
+def test_vectorize_same_as_regular():
+    pytest.importorskip( 'numpy' )
+    rand = random.Random( 7 )
+    mismatches = []
+
+    for run in range( 400 ):
+        links = [ rand.choice( vectorLinks ) for pos in range( rand.randint( 1, 3 ) ) ]
+        chain = And( *[ link() for link in links ] ) if len( links ) > 1 else links[0]()
+        if rand.random() < .5:
+            items = [ rand.choice( vectorItems[ :11 ] ) for pos in range( rand.randint( 0, 12 ) ) ]
+        else:
+            items = [ rand.choice( vectorItems ) for pos in range( rand.randint( 0, 12 ) ) ]
+
+        regular = vectorOutcome( ForEach( chain ), items )
+        vectorized = vectorOutcome( ForEach( chain, vectorize=True ), items )
+        if repr( regular ) != repr( vectorized ):
+            mismatches.append( ( chain, items, regular, vectorized ) )
+
+    assert mismatches == []
@@ -0,0 +1,51 @@
+"""
+validateMany against a new context per value.
+"""
+
+from kanone import *
+
+from cases import cases, outcome
+
+from copy import deepcopy
+
+
+def test_many_same_as_single():
+    corpus = cases()
+    values = [ value for ( validator, value ) in corpus ]
+    mismatches = []
+
+    for ( validator, first ) in corpus:
+        rows = [ first ] + [ value for value in values\
+            if outcome( validator.context( deepcopy( value ) ) )[0] != 'exception' ]
+
+        got = []
+        for ( index, result ) in validator.validateMany( deepcopy( rows ) ):
+            if isinstance( result, Invalid ):
+                got.append( ( index, repr( result ), outcome( result.context.root ) ) )
+            else:
+                got.append( ( index, repr( result ) ) )
+
+        expected = []
+        for ( index, value ) in enumerate( rows ):
+            context = validator.context( deepcopy( value ) )
+            result = context.check()
+            if isinstance( result, Invalid ):
+                expected.append( ( index, repr( result ), outcome( context ) ) )
+            else:
+                expected.append( ( index, repr( result ) ) )
+
+        if got != expected:
+            mismatches.append( ( validator, first, expected, got ) )
+
+    assert mismatches == []
+
+
+def test_many_error_formatter():
+    validator = Schema( 'a', Integer.convert() )
+    formatter = lambda context, error: 'at %s' % context.path
+
+    errors = [ result.context.root( 'a' ).error\
+        for ( index, result ) in validator.validateMany( [ { 'a': 'x' }, { 'a': '1' }, { 'a': 'y' } ], formatter )
+            if isinstance( result, Invalid )
+        ]
+    assert errors == [ 'at /a', 'at /a' ]
@@ -0,0 +1,137 @@
+from kanone import *
+from kanone.validator.web import MXLookup, MXCache
+
+import pytest
+import subprocess, sys, textwrap
+
+
+class StubResolver( object ):
+    """ answers like DNSResolver: missing* has no mail server, down* can
+    not be looked up for now """
+
+    def __init__( self ):
+        self.calls = []
+
+    def lookup( self, domain ):
+        self.calls.append( domain )
+        if domain.startswith( 'missing' ):
+            return False, None
+        if domain.startswith( 'down' ):
+            return None
+        return True, 60
+
+
+def outcome( validator, value ):
+    context = validator.context( value )
+    try:
+        return context.result
+    except Invalid:
+        return context.error
+
+
+def test_found_and_missing():
+    resolver = StubResolver()
+    lookup = MXLookup( resolver=resolver, cache=MXCache() )
+
+    assert outcome( lookup, 'some.org' ) == 'some.org'
+    assert outcome( lookup, 'missing.org' ) == 'Domain offers no mailserver'
+
+    # both are cached
+    assert outcome( lookup, 'some.org' ) == 'some.org'
+    assert outcome( lookup, 'missing.org' ) == 'Domain offers no mailserver'
+    assert resolver.calls == [ 'some.org', 'missing.org' ]
+
+
+def test_unknown_passes_uncached():
+    resolver = StubResolver()
+    cache = MXCache()
+    lookup = MXLookup( resolver=resolver, cache=cache )
+
+    assert lookup.resolve( 'down.org' ) is None
+    assert outcome( lookup, 'down.org' ) == 'down.org'
+    assert resolver.calls == [ 'down.org', 'down.org' ]
+    assert len( cache ) == 0
+
+
+def test_unknown_rejected():
+    lookup = MXLookup( resolver=StubResolver(), cache=False, rejectUnknown=True )
+    assert outcome( lookup, 'down.org' ) == 'The mailserver of the domain could not be looked up, please try again later'
+    assert outcome( lookup, 'missing.org' ) == 'Domain offers no mailserver'
+
+
+def test_email_unknown():
+    email = web.Email\
+        ( domainPart_resolve=True
+        , domainPart_mxLookup_resolver=StubResolver()
+        , domainPart_mxLookup_cache=False
+        )
+    assert outcome( email, 'bob@down.org' ) == 'bob@down.org'
+    assert outcome( email, 'bob@missing.org' ) == 'Domain offers no mailserver'
+
+
+_twistedScript = textwrap.dedent\
+    ( '''
+    import sys
+    sys.path[0:0] = sys.argv[1:]
+
+    from twisted.internet import defer
+    from kanone import *
+    from kanone.adapter import tx
+    from kanone.validator.web import MXLookup, MXCache
+    from test_mx import StubResolver
+
+    tx.monkeyPatch()
+
+    class DeferredResolver( StubResolver ):
+        def lookup( self, domain ):
+            return defer.succeed( StubResolver.lookup( self, domain ) )
+
+    def outcome( validator, value ):
+        context = validator.context( value )
+        results = []
+        context.result.addCallbacks\\
+            ( results.append
+            , lambda failure: results.append( context.error )
+            )
+        return results[0]
+
+    for resolver in ( StubResolver(), DeferredResolver() ):
+        lookup = MXLookup( resolver=resolver, cache=MXCache() )
+        strict = MXLookup( resolver=resolver, cache=False, rejectUnknown=True )
+        print( outcome( lookup, 'some.org' ) )
+        print( outcome( lookup, 'missing.org' ) )
+        print( outcome( lookup, 'missing.org' ) )
+        print( outcome( lookup, 'down.org' ) )
+        print( outcome( strict, 'down.org' ) )
+        print( resolver.calls )
+
+    from twisted.python.failure import Failure
+    from twisted.names import error
+
+    resolver = tx.TwistedResolver( servers=[ ( '127.0.0.1', 53 ) ] )
+    for exception in ( error.DNSNameError(), error.DNSQueryTimeoutError( None ), error.DNSServerError() ):
+        print( resolver._failed( Failure( exception ) ) )
+    ''' )
+
+def test_twisted_resolver():
+    pytest.importorskip( 'twisted' )
+
+    import kanone, os
+    # monkeyPatch changes kanone for good, so it runs in a process of its own
+    output = subprocess.check_output\
+        ( [ sys.executable, '-c', _twistedScript
+          , os.path.dirname( __file__ )
+          , os.path.dirname( os.path.dirname( kanone.__file__ ) )
+          ]
+        , universal_newlines=True
+        )
+
+    expected = \
+        [ 'some.org'
+        , 'Domain offers no mailserver'
+        , 'Domain offers no mailserver'
+        , 'down.org'
+        , 'The mailserver of the domain could not be looked up, please try again later'
+        , "['some.org', 'missing.org', 'down.org', 'down.org']"
+        ]
+    assert output.splitlines() == expected * 2 + [ '(False, None)', 'None', 'None' ]
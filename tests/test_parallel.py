@@ -0,0 +1,74 @@
+"""
+Validators with parallel= against the same validators run sequentially.
+"""
+
+from kanone import *
+
+import pytest
+
+
+def outcome( validator, value ):
+    context = validator.context( value )
+    try:
+        result = repr( context.result )
+    except Invalid:
+        result = context.error
+    return result, context.errorlist, context.updates
+
+emails = [ i % 7 and 'Bob%i@Some.Domain.Org' % i or 'bad%i' % i for i in range( 60 ) ]
+validEmails = [ email for email in emails if '@' in email ]
+people =\
+    [ { 'email': email, 'age': str( pos % 30 ) }
+        for ( pos, email ) in enumerate( emails )
+    ]
+
+@pytest.fixture
+def pools():
+    started = []
+    yield started
+    for validator in started:
+        validator._pool.shutdown()
+
+def compare( pools, sequential, parallel, values ):
+    pools.append( parallel )
+    for value in values:
+        assert outcome( parallel, value ) == outcome( sequential, value )
+    assert parallel._pool._executor is not None
+
+
+@pytest.mark.parametrize\
+    ( 'options'
+    , [ {}, { 'lazyChildren': True }, { 'createContextChildren': False } ]
+    )
+def test_foreach( pools, options ):
+    compare\
+        ( pools
+        , ForEach( web.Email(), **options )
+        , ForEach( web.Email(), parallel=2, chunkSize=10, **options )
+        , [ emails, validEmails ]
+        )
+
+def test_foreach_nested( pools ):
+    item = Schema( 'email', web.Email(), 'age', Integer.convert() & Max(25) )
+    compare\
+        ( pools
+        , ForEach( item )
+        , ForEach( item, parallel=2, chunkSize=10 )
+        , [ people, people[ 1:7 ] * 4 ]
+        )
+
+def test_schema( pools ):
+    fields = []
+    for pos in range( 6 ):
+        fields += [ 'f%i' % pos, pos % 2 and web.Email() or Integer.convert() ]
+
+    value = dict( ( 'f%i' % pos, pos % 2 and 'Bob@Some.Domain.Org' or str( pos ) ) for pos in range( 6 ) )
+    values = [ value, dict( value, f2='x', f3='bad' ) ]
+
+    compare( pools, Schema( *fields ), Schema( *fields, parallel=2 ), values )
+    compare( pools, Schema( *fields, codegen=True ), Schema( *fields, parallel=2, codegen=True ), values )
+
+    context = pools[0].context( value )
+    context.result
+    assert context( 'f1' ).value == 'Bob@some.domain.org'
+    assert context.updates == [ '/f1', '/f3', '/f5' ]
@@ -0,0 +1,39 @@
+"""
+Context.reset against new contexts.
+"""
+
+from kanone import *
+
+from cases import cases, outcome
+
+from copy import deepcopy
+
+
+def test_reset_same_as_new():
+    corpus = cases()
+    values = [ value for ( validator, value ) in corpus ]
+    mismatches = []
+
+    for ( validator, first ) in corpus:
+        context = validator.context( deepcopy( first ) )
+        outcome( context )
+
+        for value in values + [ first ]:
+            context.reset( deepcopy( value ) )
+            got = outcome( context )
+            expected = outcome( validator.context( deepcopy( value ) ) )
+            if got != expected:
+                mismatches.append( ( validator, value, expected, got ) )
+
+    assert mismatches == []
+
+
+def test_reset_keeps_children():
+    ( validator, value ) = cases()[ -3 ]
+    context = validator.context( deepcopy( value ) )
+    outcome( context )
+    email = context( 'email' )
+
+    context.reset( deepcopy( value ) )
+    assert context( 'email' ) is email
+    assert outcome( context ) == outcome( validator.context( deepcopy( value ) ) )
@@ -0,0 +1,125 @@
+"""
+Validators shared by threads must give the results of a single thread.
+"""
+
+from kanone import *
+from kanone.validator import web
+
+import json, random, sys, threading
+
+email = web.Email()
+
+person = Schema\
+    ( 'nick', String() & Len(max=20)
+    , 'email', web.Email()
+    , 'confirm', Match( Field('.email'), ignoreCase=True )
+    , 'age', Integer.convert() & Min(0)
+    )
+
+people = ForEach( person )
+
+validators =\
+    [ email
+    , web.Domain()
+    , web.DateField()
+    , person
+    , people
+    , email.compile()
+    , person.compile()
+    ]
+
+values =\
+    [ 'bob@some.domain.org'
+    , 'Bob@Some.Domain.Org'
+    , 'bad'
+    , 'x@bücher.de'
+    , '2020-01-02'
+    , '31.1.20'
+    , { 'nick': 'bob', 'email': 'Bob@Some.Domain.Org', 'confirm': 'bob@some.domain.org', 'age': '23' }
+    , { 'nick': 'jack', 'email': 'jack@some.org', 'confirm': 'jill@some.org', 'age': 'x' }
+    , { 'nick': 3, 'email': 'bad', 'age': '-1' }
+    , [ { 'nick': 'bob', 'email': 'bob@some.org', 'confirm': 'BOB@some.org', 'age': '1' }
+      , { 'nick': 'jill', 'email': 'jill@some', 'confirm': 'jill@some', 'age': '2' }
+      ]
+    , 5
+    , None
+    ]
+
+
+def outcome( validator, value ):
+    context = validator.context( value )
+    try:
+        return repr( ( 'ok', context.result ) )
+    except Invalid:
+        return json.dumps( context, sort_keys=True, default=str ) + context.error
+    except Exception as e:
+        return 'exception ' + type( e ).__name__
+
+
+def stress( threads=16, rounds=300 ):
+    expected = dict\
+        ( ( ( i, j ), outcome( validator, value ) )
+            for ( i, validator ) in enumerate( validators )
+            for ( j, value ) in enumerate( values )
+        )
+    mismatches = []
+
+    def work( seed ):
+        rand = random.Random( seed )
+        for run in range( rounds ):
+            i = rand.randrange( len( validators ) )
+            j = rand.randrange( len( values ) )
+            got = outcome( validators[ i ], values[ j ] )
+            if got != expected[ ( i, j ) ]:
+                mismatches.append( ( i, j, got ) )
+
+    interval = sys.getswitchinterval()
+    # switch threads as often as possible
+    sys.setswitchinterval( 1e-6 )
+    try:
+        workers = [ threading.Thread( target=work, args=( seed, ) ) for seed in range( threads ) ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        sys.setswitchinterval( interval )
+
+    return mismatches
+
+
+def test_shared_validators():
+    assert stress() == []
+
+
+def test_shared_context_reads():
+    # each thread reads a child of its context before the root
+    value = values[9]
+
+    def readChildFirst():
+        context = people.context( value )
+        try:
+            context( '1.email' ).result
+        except Invalid:
+            pass
+        try:
+            return repr( ( 'ok', context.result ) )
+        except Invalid:
+            return json.dumps( context, sort_keys=True, default=str ) + context.error
+
+    expected = readChildFirst()
+    mismatches = []
+
+    def work():
+        for run in range( 200 ):
+            got = readChildFirst()
+            if got != expected:
+                mismatches.append( got )
+
+    workers = [ threading.Thread( target=work ) for pos in range( 8 ) ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert mismatches == []
@@ -0,0 +1,88 @@
+"""
+kanone.adapter.tx against the synchronous path. The adapter patches Kanone
+for the whole process, so it runs in another one.
+"""
+
+import kanone
+
+import pytest
+import os, subprocess, sys, textwrap
+
+
+_twistedScript = textwrap.dedent\
+    ( '''
+    import sys
+    sys.path[0:0] = sys.argv[2:]
+
+    from twisted.internet import defer, task
+    from kanone import *
+    from kanone.adapter import tx
+    from cases import cases, outcome
+
+    from copy import deepcopy
+    import json
+
+    def succeed( context, value ):
+        return defer.succeed( value )
+
+    def corpus():
+        """ returns ( validator, validator without Deferreds, value ) """
+        found = [ ( validator, validator, value ) for ( validator, value ) in cases() ]
+
+        def pair( make ):
+            return make( Call( succeed ) & Pass() ), make( Pass() )
+
+        for ( validator, value ) in cases():
+            found.append( pair( lambda call: Schema( 'v', call & validator, 'w', Integer.convert() ) ) + ( { 'v': value, 'w': '1' }, ) )
+            found.append( pair( lambda call: ForEach( call & validator ) ) + ( [ value, value ], ) )
+            found.append( pair( lambda call: Or( call & validator, Integer() ) ) + ( value, ) )
+        return found
+
+    @defer.inlineCallbacks
+    def txOutcome( context ):
+        try:
+            result = repr( ( yield context.result ) )
+        except Invalid:
+            result = ( 'invalid', context.error )
+        except Exception as e:
+            return ( "exception", type( e ).__name__ )
+
+        view = json.dumps( context, sort_keys=True, default=str )
+        return ( result, view, sorted( context.errorlist ), sorted( context.updates ) )
+
+    @defer.inlineCallbacks
+    def main( reactor, mode ):
+        expected = [ outcome( plain.context( deepcopy( value ) ) ) for ( validator, plain, value ) in corpus() ]
+
+        if mode.startswith( 'cooperate' ):
+            tx.monkeyPatch( cooperate=True, window=2, chunkSize=1 )
+        else:
+            tx.monkeyPatch()
+        if mode.endswith( 'deferred' ):
+            # every validator returns a Deferred, like before sync subgraphs
+            tx.isAsync = lambda validator: True
+
+        mismatches = []
+        for ( ( validator, plain, value ), plainOutcome ) in zip( corpus(), expected ):
+            got = yield txOutcome( validator.context( deepcopy( value ) ) )
+            if got != plainOutcome:
+                mismatches.append( ( value, plainOutcome, got ) )
+
+        print( len( expected ) )
+        print( mismatches )
+
+    task.react( main, sys.argv[1:2] )
+    ''' )
+
+@pytest.mark.parametrize( 'mode', [ 'sync', 'deferred', 'cooperate', 'cooperate deferred' ] )
+def test_same_as_sync( mode ):
+    pytest.importorskip( 'twisted' )
+
+    output = subprocess.check_output\
+        ( [ sys.executable, '-c', _twistedScript, mode
+          , os.path.dirname( __file__ )
+          , os.path.dirname( os.path.dirname( kanone.__file__ ) )
+          ]
+        , universal_newlines=True
+        )
+    assert output.splitlines()[1:] == [ '[]' ]
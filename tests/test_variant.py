@@ -0,0 +1,108 @@
+from kanone import *
+from kanone.validator import web
+
+from cases import outcome
+
+import random
+
+
+def fresh( validator, messages=None, **kwargs ):
+    """ what variant() stands for """
+    found = validator( **kwargs )
+    if messages:
+        found.messages( **messages )
+    return found
+
+emails = [ 'Foo.Bar@Example.COM', 'foo@bar.de', 'foo@bar.org', 'foo@bar', 'bad', '', None, 42 ]
+domains = [ 'example.org', 'example.de', 'Example.COM', 'ex..de', '', 7 ]
+
+choices =\
+    [ ( web.Email, emails
+      , [ {}, { 'domainPart_restrictToTLD': [ 'com', 'de' ] }, { 'domainPart_restrictToTLD': [ 'org' ] }
+        , { 'domainPart_restrictToTLD': ( 'com', 'de' ) }, { 'messages': { 'format': 'F %(value)s' } }
+        , { 'domainPart_restrictToTLD': [ 'de' ], 'messages': { 'format': 'G' } }
+        ]
+      )
+    , ( web.Domain, domains
+      , [ {}, { 'restrictToTLD': [ 'com', 'de' ] }, { 'restrictToTLD': [ 'org' ] }
+        , { 'restrictToTLD': [ 'org' ], 'messages': { 'restrictToTLD': 'no %(criteria)s' } }
+        ]
+      )
+    , ( Len(), [ '', 'a', 'ab', [ 1 ], 3 ]
+      , [ { 'min': 1 }, { 'min': 1.0 }, { 'min': True }, { 'max': 1 }, { 'min': 1, 'max': 1 }
+        , { 'max': 1, 'messages': { 'max': 'long' } }
+        ]
+      )
+    , ( web.DateField, [ '2020-01-31', '31.1.2020', '2020-13-01', None ]
+      , [ {}, { 'messages': { 'format': 'date?' } } ]
+      )
+    ]
+
+def test_variant_same_as_fresh():
+    rand = random.Random( 24 )
+    mismatches = []
+
+    for run in range( 400 ):
+        ( validator, values, arguments ) = rand.choice( choices )
+        kwargs = dict( rand.choice( arguments ) )
+        value = rand.choice( values )
+
+        expected = outcome( fresh( validator, **kwargs ).context( value ) )
+        got = outcome( validator.variant( **kwargs ).context( value ) )
+        if got != expected:
+            mismatches.append( ( validator, kwargs, value, expected, got ) )
+
+    assert mismatches == []
+
+def test_variant_shared():
+    email = web.Email()
+    assert email.variant( domainPart_restrictToTLD=[ 'com' ] ) is email.variant( domainPart_restrictToTLD=[ 'com' ] )
+    assert email.variant( domainPart_restrictToTLD=[ 'com' ] ) is not email.variant( domainPart_restrictToTLD=( 'com', ) )
+    length = Len()
+    assert length.variant( min=1 ) is not length.variant( min=True )
+
+    # unhashable arguments give a new clone each time
+    criteria = [ 'a' ]
+    class Criteria( object ):
+        __hash__ = None
+        def __contains__( self, value ):
+            return value in criteria
+    inCriteria = In( [] )
+    first = inCriteria.variant( criteria=Criteria() )
+    assert first is not inCriteria.variant( criteria=Criteria() )
+    assert outcome( first.context( 'a' ) ) == outcome( In( criteria ).context( 'a' ) )
+
+def test_variant_after_change():
+    rand = random.Random( 25 )
+    mismatches = []
+
+    for run in range( 60 ):
+        base = web.Email()
+        plain = web.Email()
+        kwargs = { 'domainPart_restrictToTLD': rand.choice( [ [ 'de' ], [ 'org' ] ] ) }
+
+        for change in range( 4 ):
+            base.variant( **kwargs )
+
+            how = rand.choice( [ 'messages', 'paramAlias', 'forget' ] )
+            message = rand.choice( [ 'A %(value)s', 'B' ] )
+            if how == 'messages':
+                base.messages( format=message )
+                plain.messages( format=message )
+            elif how == 'paramAlias':
+                alias = dict( base.__paramAlias__, tld='domainPart_restrictToTLD' )
+                base.paramAlias( **alias )
+                plain.paramAlias( **alias )
+            else:
+                # a change variant() does not see
+                base.__messages__ = dict( base.__messages__, type='T' )
+                plain.__messages__ = dict( plain.__messages__, type='T' )
+                base.forgetVariants()
+
+            for value in emails:
+                expected = outcome( fresh( plain, **kwargs ).context( value ) )
+                got = outcome( base.variant( **kwargs ).context( value ) )
+                if got != expected:
+                    mismatches.append( ( how, kwargs, value, expected, got ) )
+
+    assert mismatches == []